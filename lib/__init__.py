@@ -7,6 +7,7 @@ Subpackages
 Using any of these subpackages requires an explicit import. For example,
 ``import openpiv_cxx.process``.
 
+ batch        --- Batch processing of image pairs
  filters      --- Filter PIV images and vectors
  inpaint_nans --- Replace NaNs in vector field
  interpolate  --- Interpolate and map images
@@ -27,6 +28,7 @@ except ImportError as e:
     raise ImportError(msg) from e
 
 submodules = [
+    "batch",
     "filters",
     "inpaint_nans",
     "interpolate",
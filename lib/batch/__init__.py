@@ -0,0 +1,23 @@
+"""
+===============
+Batch Execution
+===============
+
+Batch Processing
+================
+
+   find_pairs - Find image pairs from glob patterns
+   prefetch_pairs - Read image pairs ahead on background threads
+   process_pair - Evaluate an image pair and save the vector field
+   run_batch - Evaluate image pairs in parallel worker processes
+
+Command Line
+============
+
+   main - Command line interface, also available as openpiv-cxx-batch
+   
+"""
+
+from ._batch import find_pairs, prefetch_pairs, process_pair, run_batch, main
+
+__all__ = ["find_pairs", "prefetch_pairs", "process_pair", "run_batch", "main"]
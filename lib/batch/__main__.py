@@ -0,0 +1,7 @@
+from openpiv_cxx.batch import main
+
+import sys
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+from collections import deque
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+from glob import glob
+from os import cpu_count, makedirs, replace
+from os.path import basename, exists, join, splitext
+from openpiv_cxx.filters import estimate_background, subtract_background
+from openpiv_cxx.tools import imread
+from openpiv_cxx.windef import run_multipass
+
+import argparse
+import numpy as np
+
+
+__all__ = ["find_pairs", "prefetch_pairs", "process_pair", "run_batch", "main"]
+
+
+def find_pairs(pattern_a, pattern_b=None):
+    """Find image pairs
+
+    Match the files of two glob patterns into image pairs in sorted order. If
+    only one pattern is given, consecutive files form the pairs, which is the
+    usual layout of time-resolved recordings.
+
+    Parameters
+    ----------
+    pattern_a : str
+        Glob pattern of the first frames, e.g. 'images/vel_*a.bmp'.
+    pattern_b : str, optional
+        Glob pattern of the second frames, e.g. 'images/vel_*b.bmp'.
+
+    Returns
+    -------
+    pairs : list
+        A list of (file_a, file_b) tuples.
+
+    """
+    files_a = sorted(glob(str(pattern_a)))
+
+    if pattern_b is None:
+        return list(zip(files_a[:-1], files_a[1:]))
+
+    files_b = sorted(glob(str(pattern_b)))
+
+    if len(files_a) != len(files_b):
+        raise ValueError(
+            f"Found {len(files_a)} first frames and {len(files_b)} second frames"
+        )
+
+    return list(zip(files_a, files_b))
+
+
+def _load_pair(loader, file_a, file_b):
+    """Read both frames of an image pair."""
+    return loader(file_a), loader(file_b)
+
+
+def prefetch_pairs(pairs, depth=2, n_threads=1, loader=imread):
+    """Read image pairs ahead on background threads
+
+    Yield the frames of image pairs in order while the following pairs are read
+    and decoded on background threads, hiding disk and decoding latency behind
+    the evaluation of the current pair. At most depth pairs are read ahead, so
+    the memory held by the pipeline is bounded and reading pauses when the
+    consumer falls behind.
+
+    Parameters
+    ----------
+    pairs : iterable
+        An iterable of (file_a, file_b) tuples, see find_pairs.
+    depth : int
+        The number of pairs read ahead, [default: 2].
+    n_threads : int
+        The number of background reading threads, [default: 1].
+    loader : callable
+        The function reading a frame from a file, [default: tools.imread].
+
+    Yields
+    ------
+    file_a, file_b : str
+        The paths of the first and second frame.
+    frame_a, frame_b : ndarray
+        The first and second frame.
+
+    Examples
+    --------
+    >>> for file_a, file_b, frame_a, frame_b in prefetch_pairs(pairs, depth=4):
+    ...     x, y, u, v, *_ = openpiv_cxx.windef.run_multipass(frame_a, frame_b)
+
+    """
+    depth = max(int(depth), 1)
+    pairs = iter(pairs)
+    pending = deque()
+
+    executor = ThreadPoolExecutor(max_workers=max(int(n_threads), 1))
+
+    def submit():
+        for file_a, file_b in pairs:
+            pending.append(
+                (file_a, file_b, executor.submit(_load_pair, loader, file_a, file_b))
+            )
+            return
+
+    try:
+        for _ in range(depth):
+            submit()
+
+        while pending:
+            file_a, file_b, future = pending.popleft()
+
+            # keep the queue filled while the current pair is evaluated
+            submit()
+
+            frame_a, frame_b = future.result()
+
+            yield file_a, file_b, frame_a, frame_b
+
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+
+        executor.shutdown(wait=True)
+
+
+def _output_name(output_dir, file_a):
+    """Result file of an image pair."""
+    return join(output_dir, splitext(basename(file_a))[0] + ".npz")
+
+
+def process_pair(
+    file_a, file_b, output, passes=((64, 32), (32, 16)), background=None, **kwargs
+):
+    """Evaluate an image pair and save the vector field
+
+    Read an image pair, evaluate it with windef.run_multipass and save the
+    vector field to a NumPy (.npz) file. The file is written under a temporary
+    name and renamed once complete, so an interrupted batch never leaves
+    partial results behind.
+
+    Parameters
+    ----------
+    file_a, file_b : str
+        The paths of the first and second frame.
+    output : str
+        The path of the result file.
+    passes : sequence
+        A sequence of (window_size, overlap) tuples, one for each pass.
+    background : ndarray, optional
+        A background subtracted from both frames, see filters.estimate_background.
+    **kwargs
+        Additional keyword arguments passed to windef.run_multipass.
+
+    Returns
+    -------
+    output : str
+        The path of the result file.
+
+    """
+    return _evaluate_pair(
+        imread(file_a), imread(file_b), output, passes, background, **kwargs
+    )
+
+
+def _evaluate_pair(frame_a, frame_b, output, passes, background=None, **kwargs):
+    """Evaluate the frames of an image pair and save the vector field."""
+    if background is not None:
+        frame_a = subtract_background(frame_a, background)
+        frame_b = subtract_background(frame_b, background)
+
+    x, y, u, v, s2n, mask, _ = run_multipass(frame_a, frame_b, passes, **kwargs)
+
+    temporary = output + ".part"
+
+    with open(temporary, "wb") as f:
+        np.savez(f, x=x, y=y, u=u, v=v, s2n=s2n, mask=mask)
+
+    replace(temporary, output)
+
+    return output
+
+
+def run_batch(
+    pairs,
+    output_dir,
+    passes=((64, 32), (32, 16)),
+    n_workers=1,
+    thread_count=None,
+    prefetch=1,
+    background=None,
+    resume=True,
+    verbose=False,
+    **kwargs,
+):
+    """Evaluate image pairs in parallel
+
+    Distribute image pairs over a pool of worker processes, each evaluating
+    pairs with windef.run_multipass using a budget of native threads. Every
+    vector field is written to output_dir as soon as it is complete, named
+    after the first frame, so an interrupted batch resumes where it stopped.
+
+    Parameters
+    ----------
+    pairs : list
+        A list of (file_a, file_b) tuples, see find_pairs.
+    output_dir : str
+        The directory of the result files, created if needed.
+    passes : sequence
+        A sequence of (window_size, overlap) tuples, one for each pass.
+    n_workers : int
+        The number of worker processes, [default: 1]. With one worker, pairs are
+        evaluated in the calling process.
+    thread_count : int, optional
+        The number of native threads of every worker. Defaults to the number of
+        CPUs divided by n_workers.
+    prefetch : int
+        The number of pairs queued for every worker in addition to the pair being
+        evaluated, so workers start reading the next pair without waiting. With
+        one worker, this is the number of pairs read ahead on a background
+        thread, see prefetch_pairs.
+    background : ndarray or str, optional
+        A background subtracted from all frames before evaluation, either an
+        array or the method of filters.estimate_background ('min', 'mean' or
+        'median'), in which case the background is estimated in a first
+        streaming pass over all frames of pairs.
+    resume : bool
+        Skip pairs whose result file exists, [default: True].
+    verbose : bool
+        Print the progress of the batch.
+    **kwargs
+        Additional keyword arguments passed to windef.run_multipass.
+
+    Returns
+    -------
+    outputs : list
+        The paths of the result files of all pairs, in the order of pairs.
+
+    """
+    n_workers = max(int(n_workers), 1)
+
+    if thread_count is None:
+        thread_count = max((cpu_count() or 1) // n_workers, 1)
+
+    makedirs(output_dir, exist_ok=True)
+
+    outputs = [_output_name(output_dir, file_a) for file_a, _ in pairs]
+
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("First frames must have unique file names")
+
+    todo = [
+        (file_a, file_b, output)
+        for (file_a, file_b), output in zip(pairs, outputs)
+        if not (resume and exists(output))
+    ]
+
+    if verbose:
+        print(f"Processing {len(todo)} of {len(pairs)} pairs")
+
+    if isinstance(background, str) and len(todo) > 0:
+        files = sorted(set(file for pair in pairs for file in pair))
+
+        if verbose:
+            print(f"Estimating the {background} background of {len(files)} frames")
+
+        background = estimate_background((imread(f) for f in files), background)
+
+    options = dict(
+        kwargs, passes=passes, background=background, thread_count=thread_count
+    )
+
+    if n_workers == 1:
+        pairs_todo = [(file_a, file_b) for file_a, file_b, _ in todo]
+        frames = prefetch_pairs(pairs_todo, depth=max(int(prefetch), 1))
+
+        for k, (_, _, frame_a, frame_b) in enumerate(frames):
+            output = todo[k][2]
+
+            _evaluate_pair(frame_a, frame_b, output, **options)
+
+            if verbose:
+                print(f"[{k + 1}/{len(todo)}] {output}")
+
+        return outputs
+
+    # bound the number of queued pairs
+    max_pending = n_workers * (1 + max(int(prefetch), 0))
+    pending = set()
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        for file_a, file_b, output in todo:
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    done += 1
+
+                    # worker exceptions are raised here
+                    result = future.result()
+
+                    if verbose:
+                        print(f"[{done}/{len(todo)}] {result}")
+
+            pending.add(pool.submit(process_pair, file_a, file_b, output, **options))
+
+        for future in wait(pending).done:
+            done += 1
+
+            result = future.result()
+
+            if verbose:
+                print(f"[{done}/{len(todo)}] {result}")
+
+    return outputs
+
+
+def main(argv=None):
+    """Command line interface of run_batch."""
+    parser = argparse.ArgumentParser(
+        prog="openpiv-cxx-batch",
+        description="Evaluate a directory of PIV image pairs with window deformation.",
+    )
+    parser.add_argument("pattern_a", help="glob pattern of the first frames")
+    parser.add_argument(
+        "pattern_b",
+        nargs="?",
+        default=None,
+        help="glob pattern of the second frames, consecutive frames are paired if omitted",
+    )
+    parser.add_argument("-o", "--output", default="results", help="output directory")
+    parser.add_argument(
+        "-p",
+        "--passes",
+        default="64,32;32,16",
+        help="passes as 'window_size,overlap;...' [default: 64,32;32,16]",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("-t", "--threads", type=int, default=None, help="threads per worker")
+    parser.add_argument("--prefetch", type=int, default=1, help="queued pairs per worker")
+    parser.add_argument(
+        "--background",
+        choices=["min", "mean", "median"],
+        default=None,
+        help="subtract the background of all frames",
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="recompute existing results"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+
+    args = parser.parse_args(argv)
+
+    passes = [
+        tuple(int(value) for value in p.split(",")) for p in args.passes.split(";")
+    ]
+
+    pairs = find_pairs(args.pattern_a, args.pattern_b)
+
+    if len(pairs) == 0:
+        parser.error("no image pairs found")
+
+    run_batch(
+        pairs,
+        args.output,
+        passes=passes,
+        n_workers=args.workers,
+        thread_count=args.threads,
+        prefetch=args.prefetch,
+        background=args.background,
+        resume=not args.overwrite,
+        verbose=not args.quiet,
+    )
+
+    return 0
@@ -18,8 +18,16 @@ Spatial Filters
    sobel_filter - 2D Sobel filter
    threshold_binarization - Binarize image 
    variance_normalization_filter - 2D local variance normalization filter
+
+Background Filters
+==================
+
+   BackgroundEstimator - streaming background of an image sequence
+   estimate_background - background of an image sequence
+   subtract_background - subtract a background from a frame
 """
 
+from ._background import *
 from ._spatial_filters import *
 from ._kernels import *
 
@@ -0,0 +1,248 @@
+from openpiv_cxx.input_checker import check_nd as _check
+
+import numpy as np
+
+
+__all__ = [
+    "BackgroundEstimator",
+    "estimate_background",
+    "subtract_background"
+]
+
+
+_methods = ["min", "mean", "median"]
+
+
+class BackgroundEstimator:
+    """Streaming background estimator of an image sequence
+
+    Estimate the per-pixel background of an image sequence while frames are
+    consumed one (or a chunk) at a time, so the sequence never has to be held
+    in memory. The background is either the running minimum, the running mean
+    or an approximate median interpolated from a per-pixel histogram of the
+    grey levels, which is accurate to within one bin (one grey level for 8-bit
+    images with 256 bins). For an even number of frames, the lower of the two
+    middle grey levels is estimated.
+
+    Parameters
+    ----------
+    method : str
+        The background estimate, either 'min' (default), 'mean' or 'median'.
+    bins : int
+        The number of histogram bins of every pixel for method 'median',
+        [default: 256]. The histogram takes 4 * bins bytes per pixel.
+    max_value : float, optional
+        Upper limit of the grey levels binned for method 'median'. Defaults to
+        the maximum of the integer type of the first frames, e.g. 255 for uint8
+        and 65535 for uint16, or their maximum for floating point frames. Larger
+        grey levels are counted in the last bin.
+
+    Examples
+    --------
+    >>> estimator = openpiv_cxx.filters.BackgroundEstimator("median")
+    >>> for frame in frames:
+    ...     estimator.update(frame)
+    >>> frame_a = estimator.subtract(frame_a)
+
+    """
+
+    def __init__(self, method = "min", bins = 256, max_value = None):
+        if method not in _methods:
+            raise ValueError(
+                f"Unsupported background method: {method}. Supported methods are " +
+                "'min', 'mean', and 'median'"
+            )
+
+        if bins < 2:
+            raise ValueError("At least two histogram bins are required")
+
+        self.method = method
+        self.bins = int(bins)
+        self.max_value = max_value
+        self.shape = None
+        self.count = 0
+
+    def _allocate(self, frames):
+        self.shape = frames.shape[1:]
+
+        if self.method == "min":
+            self._state = np.full(self.shape, np.inf, dtype = "float32")
+
+        elif self.method == "mean":
+            self._state = np.zeros(self.shape, dtype = "float64")
+
+        else:
+            if self.max_value is None:
+                if np.issubdtype(frames.dtype, np.integer):
+                    self.max_value = np.iinfo(frames.dtype).max
+                else:
+                    self.max_value = float(frames.max())
+
+            self.max_value = max(float(self.max_value), 1e-12)
+
+            self._state = np.zeros(self.shape + (self.bins,), dtype = "uint32")
+
+    def update(self, frames):
+        """Add frames to the background
+
+        Parameters
+        ----------
+        frames : ndarray
+            A two dimensional (height, width) array of a single frame or a three
+            dimensional (n_frames, height, width) array of a chunk of frames.
+
+        Returns
+        -------
+        self : BackgroundEstimator
+            The updated estimator.
+
+        """
+        frames = np.asarray(frames)
+
+        if frames.ndim == 2:
+            frames = frames[np.newaxis]
+
+        _check(ndim=3, frames=frames)
+
+        if self.shape is None:
+            self._allocate(frames)
+
+        if frames.shape[1:] != self.shape:
+            raise ValueError(f"Frames must have the shape {self.shape}")
+
+        if self.method == "min":
+            for frame in frames:
+                np.fmin(self._state, frame, out = self._state, casting = "unsafe")
+
+        elif self.method == "mean":
+            for frame in frames:
+                np.add(self._state, frame, out = self._state)
+
+        else:
+            # flat histogram index of every pixel
+            pixel = np.arange(self._state.size // self.bins, dtype = "intp") * self.bins
+            histogram = self._state.reshape(-1)
+            scale = (self.bins - 1) / self.max_value
+
+            for frame in frames:
+                # bins are centred on multiples of max_value / (bins - 1)
+                index = np.multiply(frame.reshape(-1), scale, dtype = "float32")
+                index += 0.5
+                np.clip(index, 0, self.bins - 1, out = index)
+
+                # every pixel is counted once, so fancy indexing does not collide
+                histogram[pixel + index.astype("intp")] += 1
+
+        self.count += frames.shape[0]
+
+        return self
+
+    @property
+    def background(self):
+        """The current background estimate as float32 array."""
+        if self.count == 0:
+            raise ValueError("No frames were added")
+
+        if self.method == "min":
+            return self._state.copy()
+
+        if self.method == "mean":
+            return (self._state / self.count).astype("float32")
+
+        # the median is interpolated linearly inside the bin holding the middle frame
+        cumulative = np.cumsum(self._state, axis = -1)
+        half = 0.5 * self.count
+
+        index = np.argmax(cumulative >= half, axis = -1)[..., np.newaxis]
+
+        upper = np.take_along_axis(cumulative, index, axis = -1)[..., 0]
+        within = np.take_along_axis(self._state, index, axis = -1)[..., 0]
+
+        fraction = (half - (upper - within)) / np.maximum(within, 1)
+
+        median = (index[..., 0] + fraction - 0.5) * (self.max_value / (self.bins - 1))
+
+        return np.maximum(median, 0).astype("float32")
+
+    def subtract(self, img, clip_at_zero = True):
+        """Subtract the background from a frame
+
+        Parameters
+        ----------
+        img : ndarray
+            A two dimensional array containing pixel intensities.
+        clip_at_zero : bool
+            Set negative intensities to zero.
+
+        Returns
+        -------
+        new_img : ndarray
+            A float32 two dimensional array of the frame without background.
+
+        """
+        return subtract_background(img, self.background, clip_at_zero)
+
+
+def subtract_background(img, background, clip_at_zero = True):
+    """Subtract a background from a frame.
+
+    Parameters
+    ----------
+    img : ndarray
+        A two dimensional array containing pixel intensities.
+    background : ndarray
+        A two dimensional array of the background of the same shape.
+    clip_at_zero : bool
+        Set negative intensities to zero.
+
+    Returns
+    -------
+    new_img : ndarray
+        A float32 two dimensional array of the frame without background.
+
+    """
+    _check(ndim=2, img=img, background=background)
+
+    if img.shape != background.shape:
+        raise ValueError("img and background must have the same shape")
+
+    new_img = np.subtract(img, background, dtype = "float32")
+
+    if clip_at_zero == True:
+        np.maximum(new_img, 0, out = new_img)
+
+    return new_img
+
+
+def estimate_background(frames, method = "min", bins = 256, max_value = None):
+    """Estimate the background of an image sequence.
+
+    Parameters
+    ----------
+    frames : iterable
+        An iterable of two dimensional frames, or a three dimensional array
+        (e.g. a memory-mapped stack from tools.load_frames), consumed in a
+        single pass.
+    method : str
+        The background estimate, either 'min' (default), 'mean' or 'median'.
+    bins : int
+        The number of histogram bins of every pixel for method 'median'.
+    max_value : float, optional
+        Upper limit of the grey levels binned for method 'median'.
+
+    Returns
+    -------
+    background : ndarray
+        A float32 two dimensional array of the background.
+
+    See Also
+    --------
+    BackgroundEstimator
+
+    """
+    estimator = BackgroundEstimator(method, bins, max_value)
+
+    for frame in frames:
+        estimator.update(frame)
+
+    return estimator.background
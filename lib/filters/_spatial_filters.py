@@ -3,7 +3,9 @@ from ._spatial_filters_cpp import (
     _intensity_cap,
     _threshold_binarization,
     _lowpass_filter,
-    _highpass_filter
+    _lowpass_filter_separable,
+    _highpass_filter_separable,
+    _variance_normalization
 )
 from ._kernels import gaussian_kernel
 
@@ -24,7 +26,7 @@ __all__ = [
 kernel_size_error = "kernel_size must be an odd number"
 
 
-def intensity_cap(img, std_mult = 2.0, keep_dtype = True):
+def intensity_cap(img, std_mult = 2.0, keep_dtype = True, thread_count = 1):
     """Set pixels above threshold to threshold.
 
     Set pixels higher than calculated threshold to said threshold.
@@ -38,6 +40,9 @@ def intensity_cap(img, std_mult = 2.0, keep_dtype = True):
         Lower values yields a lower threshold.
     keep_dtype : bool
         Cast output to original dtype.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -53,7 +58,7 @@ def intensity_cap(img, std_mult = 2.0, keep_dtype = True):
     if img_dtype != "float32":
         img = img.astype("float32")
 
-    new_img = _intensity_cap(img, float(std_mult))
+    new_img = _intensity_cap(img, float(std_mult), int(thread_count))
 
     if img_dtype != "float32" and keep_dtype == True:
         new_img = new_img.astype(img_dtype)
@@ -109,7 +114,38 @@ def threshold_binarization(img, threshold = 0.5, keep_dtype = True):
     return new_img
 
 
-def _convolve_kernel(img, kernel, pad_type = "reflect", cval = 0.0):
+def _separate_kernel(kernel, rtol = 1e-6):
+    """Split a separable 2D kernel into its row and column kernels.
+
+    Parameters
+    ----------
+    kernel : ndarray
+        2D square kernel.
+    rtol : float
+        Relative tolerance of the singular values treated as zero.
+
+    Returns
+    -------
+    kernel_row, kernel_col : ndarray or None
+        The float32 1D kernels of the horizontal and vertical pass, so that
+        kernel = outer(kernel_col, kernel_row), or None if the kernel is
+        not separable.
+
+    """
+    u, s, vt = np.linalg.svd(np.asarray(kernel, dtype = "float64"))
+
+    if s[0] == 0 or np.any(s[1:] > rtol * s[0]):
+        return None, None
+
+    kernel_row = (vt[0] * np.sqrt(s[0])).astype("float32")
+    kernel_col = (u[:, 0] * np.sqrt(s[0])).astype("float32")
+
+    return kernel_row, kernel_col
+
+
+def _convolve_kernel(
+    img, kernel, pad_type = "reflect", cval = 0.0, thread_count = 1
+):
     """A simple sliding convolution filter.
 
     Parameters
@@ -122,6 +158,9 @@ def _convolve_kernel(img, kernel, pad_type = "reflect", cval = 0.0):
         Type of padding used on borders of image.
     cval : float
         If padding is constant, pad with user selected constant.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -156,9 +195,18 @@ def _convolve_kernel(img, kernel, pad_type = "reflect", cval = 0.0):
     # make sure array is float32
     if kernel.dtype != "float32":
         kernel = kernel.astype("float32")
-        
+    
+    # separable kernels (e.g. Gaussian and Sobel) are applied as a row and a
+    # column pass with 2k instead of k*k operations per pixel
+    kernel_row, kernel_col = _separate_kernel(kernel)
+    
     # extract filtered image
-    new_img = _lowpass_filter(buffer1, kernel)
+    if kernel_row is not None:
+        new_img = _lowpass_filter_separable(
+            buffer1, kernel_row, kernel_col, int(thread_count)
+        )
+    else:
+        new_img = _lowpass_filter(buffer1, kernel, int(thread_count))
 
     # remove padding
     new_img = new_img[pad : buffer1.shape[0] - pad, pad : buffer1.shape[1] - pad]
@@ -166,7 +214,9 @@ def _convolve_kernel(img, kernel, pad_type = "reflect", cval = 0.0):
     return new_img
 
 
-def gaussian_filter(img, sigma = 1.0, truncate = 2.0, keep_dtype = False):
+def gaussian_filter(
+    img, sigma = 1.0, truncate = 2.0, keep_dtype = False, thread_count = 1
+):
     """A simple sliding window gaussian low pass filter.
 
     Parameters
@@ -179,6 +229,9 @@ def gaussian_filter(img, sigma = 1.0, truncate = 2.0, keep_dtype = False):
         Truncate the kernel at specified standard deviations.
     keep_dtype : bool
         Cast output to original dtype.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -202,7 +255,7 @@ def gaussian_filter(img, sigma = 1.0, truncate = 2.0, keep_dtype = False):
     kernel = gaussian_kernel(sigma=sigma, truncate=truncate)
 
     # extract filtered image
-    new_img = _convolve_kernel(img, kernel)
+    new_img = _convolve_kernel(img, kernel, thread_count = thread_count)
 
     # if the image wasn't normalized beforehand, return original range
     if max_ > 1:
@@ -215,7 +268,12 @@ def gaussian_filter(img, sigma = 1.0, truncate = 2.0, keep_dtype = False):
 
 
 def highpass_filter(
-    img, sigma = 1.0, truncate = 2.0, clip_at_zero = True, keep_dtype = False
+    img,
+    sigma = 1.0,
+    truncate = 2.0,
+    clip_at_zero = True,
+    keep_dtype = False,
+    thread_count = 1
 ):
     """A simple sliding window gaussian high pass filter.
 
@@ -229,6 +287,9 @@ def highpass_filter(
         Truncate the kernel at specified standard deviations.
     keep_dtype : bool
         Cast output to original dtype.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -258,8 +319,12 @@ def highpass_filter(
         buffer1 = buffer1.astype("float32")
         buffer1 /= max_
 
-    # extract filtered image
-    new_img = _highpass_filter(buffer1, kernel, bool(clip_at_zero))
+    # extract filtered image, the Gaussian kernel is separable
+    kernel_row, kernel_col = _separate_kernel(kernel)
+    
+    new_img = _highpass_filter_separable(
+        buffer1, kernel_row, kernel_col, bool(clip_at_zero), int(thread_count)
+    )
 
     # remove padding
     new_img = new_img[pad : buffer1.shape[0] - pad, pad : buffer1.shape[1] - pad]
@@ -280,11 +345,16 @@ def variance_normalization_filter(
     sigma2 = 2.0,
     truncate = 2.0,
     clip_at_zero = True,
-    keep_dtype = False
-    
+    keep_dtype = False,
+    thread_count = 1
 ):
     """A simple gaussian variance normalization filter.
 
+    The image is high pass filtered with a Gaussian of sigma1, divided by the
+    local standard deviation (a Gaussian of sigma2 over the squared high pass
+    image) and scaled to the range of the image. All steps are fused into
+    separable native passes over the rows of the image.
+
     Parameters
     ----------
     img : ndarray
@@ -295,12 +365,17 @@ def variance_normalization_filter(
         Sigma of nxn gaussian convolution kernel.
     truncate : float
         Truncate the kernel at specified standard deviations.
+    clip_at_zero : bool
+        Set negative normalized intensities to zero.
     keep_dtype : bool
         Cast output to original dtype.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
-    den : ndarray
+    new_img : ndarray
         A two dimensional array containing pixel intenensities.
 
     """
@@ -310,33 +385,27 @@ def variance_normalization_filter(
     img_dtype = img.dtype
     max_ = img.max()
     
-    if img_dtype != "float32":
-        img = img.astype("float32")
-    
-    if max_ > 1:
-        img /= max_
-    
-    high_pass = highpass_filter(img, sigma1, truncate, False)
-    
-    den = gaussian_filter(high_pass * high_pass, sigma2, truncate)
-    
-    den = np.sqrt(den)
-    
-    new_img = np.divide( # stops image from being all black
-        high_pass, den,
-        where = (den != 0.0)
-    )  
-    
-    if clip_at_zero == True: 
-        new_img[new_img < 0] = 0 
-        
-    new_img = (new_img - new_img.min()) / (new_img.max() - new_img.min())
-    
-    if max_ > 1:
-        new_img *= max_
+    # the normalized image does not depend on the intensity scale, so only the
+    # output is scaled to the original range
+    scale = max_ if max_ > 1 else 1.0
+    
+    # get separable Gaussian kernels
+    kernel1, _ = _separate_kernel(gaussian_kernel(sigma=sigma1, truncate=truncate))
+    kernel2, _ = _separate_kernel(gaussian_kernel(sigma=sigma2, truncate=truncate))
+    
+    # high pass, local variance, normalization and min-max scaling in one
+    # native pass over the image
+    new_img = _variance_normalization(
+        img,
+        kernel1,
+        kernel2,
+        bool(clip_at_zero),
+        float(scale),
+        int(thread_count)
+    )
     
     if img_dtype != "float32" and keep_dtype == True:
-        new_img = den.astype(img_dtype)
+        new_img = new_img.astype(img_dtype)
     
     return new_img
 
@@ -344,7 +413,8 @@ def variance_normalization_filter(
 def sobel_filter(
     img,
     orientation=None,
-    keep_dtype = False
+    keep_dtype = False,
+    thread_count = 1
 ):
     """A simple sobel filter.
 
@@ -356,6 +426,9 @@ def sobel_filter(
         The orientation of the sobel filter.
     keep_dtype : bool
         Cast output to original dtype.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -404,12 +477,12 @@ def sobel_filter(
         img /= max_
     
     if orientation is None or orientation.lower() in ['h', "horizontal"]:   
-        out1 = _convolve_kernel(img, kernel1)
+        out1 = _convolve_kernel(img, kernel1, thread_count = thread_count)
         if orientation is not None:
             new_img = out1
         
     if orientation is None or orientation.lower() in ['v', "vertical"]:   
-        out2 = _convolve_kernel(img, kernel2)
+        out2 = _convolve_kernel(img, kernel2, thread_count = thread_count)
         if orientation is not None:
             new_img = out2
     
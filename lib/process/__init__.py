@@ -13,6 +13,7 @@ Correlation
 ===========
     correlation_to_displacement - Obtain displacements from correlation matrixes
     fft_correlate_images - Cross correlate two images to obtain a correlation matrix
+    fft_correlate_points - Cross correlate two images at arbitrary points
     fft_evaluate_images - Cross correlate two images to obtain x, y, u, v, s2n components
     
 """
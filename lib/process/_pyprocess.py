@@ -9,6 +9,7 @@ __all__ = [
     "get_coordinates",
     "get_rect_coordinates",
     "fft_correlate_images",
+    "fft_correlate_points",
     "correlation_to_displacement",
 ]
 
@@ -144,6 +145,8 @@ def fft_correlate_images(
     overlap=16,
     correlation_method="circular",
     thread_count=1,
+    error_correction=False,
+    mask=None,
 ):
     """Standard FFT based cross-correlation of two images.
 
@@ -164,6 +167,15 @@ def fft_correlate_images(
     thread_count : int
         The number of threads to use with values < 1 automatically setting thread_count
         to the maximum of concurrent threads - 1, [default: 1].
+    error_correction : bool
+        Apply error correlation-based correction (ECC) where each correlation matrix is
+        multiplied element-wise with the correlation matrix of its neighbouring window
+        in the same row to suppress noise peaks, [default: False].
+    mask : ndarray, optional
+        A two dimensional boolean array with the same shape as the images where True
+        marks masked pixels. Fully masked windows are skipped and return correlation
+        matrixes filled with NaNs, while partially masked windows are normalized by
+        their unmasked pixels only.
 
     Returns
     -------
@@ -171,6 +183,11 @@ def fft_correlate_images(
         A three dimensional array with axis 0 being the two dimensional correlation matrix
         of an interrogation window.
 
+    References
+    ----------
+    Hart, D. P. (2000). PIV error correction. Experiments in Fluids, 29(1), 13-22.
+    https://doi.org/10.1007/s003480050421
+
     """
     _check(ndim=2, image_a=image_a, image_b=image_b)
 
@@ -188,13 +205,115 @@ def fft_correlate_images(
     else:
         correlation_method = 1  # linear
 
-    return _proc._img2corr_standard(
+    if mask is None:
+        mask = np.empty((0, 0), dtype="uint8")  # empty mask disables masking
+    else:
+        _check(ndim=2, mask=mask)
+
+        if mask.shape != image_a.shape:
+            raise ValueError("mask must have the same shape as the images")
+
+        mask = (mask != 0).astype("uint8")
+
+    if error_correction == True:
+        correlator = _proc._img2corr_ecc
+    else:
+        correlator = _proc._img2corr_standard
+
+    return correlator(
         image_a,
         image_b,
         int(window_size),
         int(overlap),
         correlation_method,
         int(thread_count),
+        mask,
+    )
+
+
+def fft_correlate_points(
+    image_a,
+    image_b,
+    x,
+    y,
+    window_size=32,
+    correlation_method="circular",
+    thread_count=1,
+    mask=None,
+):
+    """Standard FFT based cross-correlation of windows centered at arbitrary points.
+
+    Parameters
+    ----------
+    frame_a : ndarray
+        A two dimensionional array containing grey levels of the first frame.
+    frame_b : ndarray
+        A two dimensionional array containing grey levels of the second frame.
+    x, y : ndarray
+        Arrays of the same size containing the x (column) and y (row) coordinates
+        of the interrogation window centers, in pixels. Window centers are rounded
+        to the nearest pixel.
+    window_size : int
+        The size of the (square) interrogation window, [default: 32 pix].
+    correlation_method : str
+        Which correlation method to use where 'circular' is periodic
+        (e.g. not padded) and 'linear' is padded to size 2*window_size.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
+    mask : ndarray, optional
+        A two dimensional boolean array with the same shape as the images where True
+        marks masked pixels. See fft_correlate_images.
+
+    Returns
+    -------
+    corr : ndarray
+        A three dimensional array with axis 0 being the two dimensional correlation matrix
+        of the interrogation window centered at the corresponding point. Windows that do
+        not fit inside the images or have non-finite centers are filled with NaNs.
+
+    """
+    _check(ndim=2, image_a=image_a, image_b=image_b)
+
+    if correlation_method not in ["circular", "linear"]:
+        raise ValueError(f"Unsupported correlation method: {correlation_method}.")
+
+    x = np.asarray(x, dtype="float64").ravel()
+    y = np.asarray(y, dtype="float64").ravel()
+
+    if x.size != y.size:
+        raise ValueError("x and y must have the same size")
+
+    if image_a.dtype != "float64":
+        image_a = image_a.astype("float64")
+
+    if image_b.dtype != "float64":
+        image_b = image_b.astype("float64")
+
+    if correlation_method == "circular":
+        correlation_method = 0  # circular
+    else:
+        correlation_method = 1  # linear
+
+    if mask is None:
+        mask = np.empty((0, 0), dtype="uint8")  # empty mask disables masking
+    else:
+        _check(ndim=2, mask=mask)
+
+        if mask.shape != image_a.shape:
+            raise ValueError("mask must have the same shape as the images")
+
+        mask = (mask != 0).astype("uint8")
+
+    return _proc._pts2corr_standard(
+        image_a,
+        image_b,
+        x,
+        y,
+        int(window_size),
+        correlation_method,
+        int(thread_count),
+        mask,
     )
 
 
@@ -7,6 +7,7 @@ Image Tools
 ===========
    
    imread - load an image
+   read_frames - decode a stack of frames natively
    imsave - save an image
    negative - flip an 8-bit image
 
@@ -17,10 +18,25 @@ Vector Tools
    save - save a vector field
    transform_coordinates - convert image to physical coordinate system
    uniform_scaling - apply uniform scaling
+   FieldStatistics - streaming statistics of vector fields
+
+
+Storage Tools
+=============
+
+   load_frames - memory-map a stack of frames
+   open_field_store - open a memory-mapped vector field store
+   save_fields - save a vector field to a binary container
+   load_fields - lazily read vector fields from a binary container
+   FieldWriter - append vector fields to a binary container
+   FieldReader - lazily read vector fields from a binary container
+   FieldStack - lazily loaded (n_frames, ny, nx) array of a component
    
 """
 
 from ._image_tools import *
+from ._statistics_tools import *
+from ._store_tools import *
 from ._vector_tools import *
 
 __all__ = [s for s in dir() if not s.startswith("_")]
@@ -1,18 +1,36 @@
 from imageio import imread as _imread, imsave as _imsave
+from os.path import getsize
+from ._store_tools import _tiff_pages
+from ._tools_cpp import _decode_pages_uint16, _decode_pages_float32
 
 import numpy as np
+import struct
 
 
-__all__ = ["imread", "imsave", "negative", "rgb2gray"]
+__all__ = ["imread", "imsave", "negative", "read_frames", "rgb2gray"]
 
 
-def rgb2gray(rgb):
+# sample types of the native decoder
+_SAMPLE_TYPES = {"u1": 0, "u2": 1, "i2": 2, "u4": 3, "i4": 4, "f4": 5, "f8": 6}
+
+
+# ITU-R BT.601 luma weights
+_LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+
+def rgb2gray(rgb, dtype="float64"):
     """Convert RGB to grayscale
 
+    Weight the red, green and blue channels in a single pass that only
+    allocates the output, so no float64 copy of the colour image is made.
+
     Parameters
     ----------
     rgb : ndarray
-        2D RGB image
+        2D RGB image, an alpha channel is ignored.
+    dtype : str
+        Data type of the grayscale image, [default: 'float64']. Integer types
+        are rounded and clipped to their range.
 
     Returns
     -------
@@ -21,13 +39,33 @@ def rgb2gray(rgb):
         2D grayscale image
 
     """
-    return np.dot(rgb[..., :3], [0.299, 0.587, 0.144])
+    dtype = np.dtype(dtype)
+
+    # integer images are weighted in single precision and rounded afterwards
+    work_dtype = dtype if dtype.kind == "f" else np.dtype("float32")
+
+    img = np.einsum(
+        "...c,c->...",
+        rgb[..., :3],
+        np.asarray(_LUMA_WEIGHTS, dtype=work_dtype),
+        dtype=work_dtype,
+        casting="unsafe",
+    )
+
+    if dtype != work_dtype:
+        info = np.iinfo(dtype)
+        img = np.clip(np.rint(img, out=img), info.min, info.max, out=img)
+        img = img.astype(dtype)
+
+    return img
 
 
-def imread(filename, flatten=False):
+def imread(filename, flatten=False, dtype=None):
     """Read an image
 
-    Read an image file into a numpy array using imageio.imread.
+    Read an image file into a numpy array using imageio.imread. If dtype is
+    'uint16' or 'float32', 8-bit greyscale BMP and uncompressed TIFF files are
+    decoded natively (see read_frames) straight into an array of that type.
 
     Parameters
     ----------
@@ -35,6 +73,10 @@ def imread(filename, flatten=False):
         The absolute path of the image file.
     flatten :  bool
         True if the image is RGB color or False (default) if greyscale.
+    dtype : str, optional
+        Data type of the image. Colour images are converted to grayscale and
+        all images are cast in a single pass. If None (default), greyscale images
+        keep the type of the file and colour images are float64.
 
     Returns
     -------
@@ -43,14 +85,32 @@ def imread(filename, flatten=False):
 
     Examples
     --------
-    >>> image = openpiv_cxx.tools.imread( 'image.bmp' )
+    >>> image = openpiv_cxx.tools.imread( 'image.bmp', dtype='float32' )
     >>> print image.shape
         (1280, 1024)
 
     """
+    native = str(filename).lower().endswith((".bmp", ".tif", ".tiff"))
+
+    if native and dtype is not None and np.dtype(dtype).name in ["uint16", "float32"]:
+        try:
+            layout = _frame_layout(filename)
+        except ValueError:
+            # colour and compressed files are read by imageio
+            layout = None
+
+        if layout is not None:
+            # the first page of multi-page files
+            layout = (layout[0][:1],) + layout[1:]
+
+            return _decode_frames(filename, layout, np.dtype(dtype).name)[0]
+
     im = _imread(filename)
     if np.ndim(im) > 2:
-        im = rgb2gray(im)
+        im = rgb2gray(im, dtype="float64" if dtype is None else dtype)
+
+    elif dtype is not None:
+        im = im.astype(dtype, copy=False)
 
     return im
 
@@ -100,3 +160,181 @@ def negative(image):
 
     """
     return 255 - image
+
+
+def _bmp_layout(filename):
+    """Pixel offset, shape and row stride of an uncompressed 8-bit BMP."""
+    with open(filename, "rb") as f:
+        header = f.read(54)
+
+        if len(header) < 54 or header[:2] != b"BM":
+            raise ValueError(f"{filename} is not a BMP file")
+
+        (pixel_offset,) = struct.unpack("<I", header[10:14])
+        header_size, width, height, _, bits, compression = struct.unpack(
+            "<IiiHHI", header[14:34]
+        )
+        (n_colors,) = struct.unpack("<I", header[46:50])
+
+        if compression != 0:
+            raise ValueError("Only uncompressed BMP files are supported")
+
+        if bits != 8:
+            raise ValueError("Only 8-bit greyscale BMP files are supported")
+
+        # the palette has to map indices to the same grey level
+        n_colors = n_colors or 256
+        f.seek(14 + header_size)
+        palette = np.frombuffer(f.read(4 * n_colors), dtype="uint8").reshape(-1, 4)
+
+        if palette.shape[0] != n_colors or np.any(
+            palette[:, :3] != np.arange(n_colors, dtype="uint8")[:, np.newaxis]
+        ):
+            raise ValueError("Only BMP files with a greyscale palette are supported")
+
+    # rows are padded to multiples of four bytes and stored bottom-up
+    row_stride = (width * bits + 31) // 32 * 4
+
+    return pixel_offset, (abs(height), width), row_stride, height > 0
+
+
+def _frame_layout(filename, shape=None, raw_dtype="uint16", offset=0):
+    """Page offsets, frame shape, row stride, row order and sample type of a file."""
+    filename = str(filename)
+    suffix = filename.lower().rsplit(".", 1)[-1]
+
+    if suffix == "bmp":
+        pixel_offset, frame_shape, row_stride, bottom_up = _bmp_layout(filename)
+
+        offsets = [pixel_offset]
+        sample_dtype = np.dtype("uint8")
+
+    elif suffix in ["tif", "tiff"]:
+        pages = _tiff_pages(filename)
+
+        if len(pages) == 0:
+            raise ValueError(f"{filename} does not contain any pages")
+
+        _, frame_shape, sample_dtype = pages[0]
+
+        for _, page_shape, page_dtype in pages:
+            if page_shape != frame_shape or page_dtype != sample_dtype:
+                raise ValueError("All TIFF pages must have the same shape and type")
+
+        offsets = [page_offset for page_offset, _, _ in pages]
+        row_stride = sample_dtype.itemsize * frame_shape[1]
+        bottom_up = False
+
+    else:
+        if shape is None:
+            raise ValueError("shape is required for raw binary files")
+
+        frame_shape = (int(shape[0]), int(shape[1]))
+        sample_dtype = np.dtype(raw_dtype)
+        row_stride = sample_dtype.itemsize * frame_shape[1]
+        frame_size = row_stride * frame_shape[0]
+
+        data_size = getsize(filename) - int(offset)
+
+        if data_size <= 0 or data_size % frame_size != 0:
+            raise ValueError(f"File size does not match frames of shape {shape}")
+
+        offsets = [int(offset) + k * frame_size for k in range(data_size // frame_size)]
+        bottom_up = False
+
+    if sample_dtype.kind + str(sample_dtype.itemsize) not in _SAMPLE_TYPES:
+        raise ValueError(f"Unsupported sample type: {sample_dtype}")
+
+    return offsets, tuple(frame_shape), row_stride, bottom_up, sample_dtype
+
+
+def _decode_frames(filename, layout, dtype, out=None, thread_count=1):
+    """Decode the frames of a file layout into an uint16 or float32 array."""
+    offsets, frame_shape, row_stride, bottom_up, sample_dtype = layout
+
+    frames_shape = (len(offsets),) + frame_shape
+
+    if out is None:
+        out = np.empty(frames_shape, dtype=dtype)
+
+    elif (
+        out.shape != frames_shape
+        or out.dtype != dtype
+        or out.flags["C_CONTIGUOUS"] == False
+    ):
+        raise ValueError(
+            f"out must be a C-contiguous {dtype} array of shape {frames_shape}"
+        )
+
+    decode = _decode_pages_uint16 if dtype == "uint16" else _decode_pages_float32
+
+    decode(
+        str(filename),
+        offsets,
+        frame_shape[0],
+        frame_shape[1],
+        row_stride,
+        bottom_up,
+        _SAMPLE_TYPES[sample_dtype.kind + str(sample_dtype.itemsize)],
+        sample_dtype.isnative == False,
+        out,
+        int(thread_count),
+    )
+
+    return out
+
+
+def read_frames(
+    filename,
+    dtype="float32",
+    shape=None,
+    raw_dtype="uint16",
+    offset=0,
+    out=None,
+    thread_count=1,
+):
+    """Read a stack of frames natively
+
+    Decode the frames of an uncompressed image file directly into a
+    preallocated uint16 or float32 array without intermediate copies. Supported
+    are 8-bit greyscale BMP files, uncompressed (multi-page) TIFF files and raw
+    binary files of frames stored one after another, e.g. camera recordings
+    with a fixed size header. The rows of all frames are decoded in parallel.
+
+    Parameters
+    ----------
+    filename : str
+        The path of a .bmp, .tif/.tiff or raw binary file.
+    dtype : str
+        Data type of the frames, either 'uint16' or 'float32' (default).
+        Integer samples outside the range of uint16 are clipped.
+    shape : tuple, optional
+        The (height, width) of the frames of raw binary files.
+    raw_dtype : str
+        Data type of the samples of raw binary files, [default: 'uint16'].
+    offset : int
+        Size of the header of raw binary files in bytes, [default: 0].
+    out : ndarray, optional
+        A C-contiguous (n_frames, height, width) array of type dtype the frames
+        are decoded into, e.g. to reuse a buffer for a sequence of files.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
+
+    Returns
+    -------
+    frames : ndarray
+        A three dimensional (n_frames, height, width) array of grey levels.
+
+    Examples
+    --------
+    >>> frames = openpiv_cxx.tools.read_frames('recording.tif', thread_count=4)
+    >>> frame_a, frame_b = frames[0], frames[1]
+
+    """
+    if dtype not in ["uint16", "float32"]:
+        raise ValueError(f"Unsupported data type: {dtype}")
+
+    layout = _frame_layout(filename, shape, raw_dtype, offset)
+
+    return _decode_frames(filename, layout, dtype, out, thread_count)
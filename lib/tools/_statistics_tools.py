@@ -0,0 +1,235 @@
+import numpy as np
+
+
+__all__ = ["FieldStatistics"]
+
+
+def _as_stack(arr):
+    """Float64 (n_frames, ny, nx) array with masked elements set to NaN."""
+    if isinstance(arr, np.ma.MaskedArray):
+        arr = arr.astype("float64").filled(np.nan)
+
+    arr = np.asarray(arr, dtype="float64")
+
+    if arr.ndim == 2:
+        arr = arr[np.newaxis]
+
+    if arr.ndim != 3:
+        raise ValueError("Vector fields must be two or three dimensional")
+
+    return arr
+
+
+class FieldStatistics:
+    """Streaming statistics of a sequence of vector fields
+
+    Accumulate the mean, variance, Reynolds shear stress and extrema of the
+    velocity components at every grid point while vector fields are consumed
+    one (or a chunk) at a time, so the sequence never has to be held in memory.
+    Chunks are reduced with Welford's algorithm and combined with the pairwise
+    update of Chan et al., which is numerically stable for long sequences.
+    Accumulators of parallel workers are combined with merge. Non-finite
+    vectors are skipped at their grid point.
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        The (ny, nx) shape of the vector fields. Taken from the first update
+        if not given.
+
+    Examples
+    --------
+    >>> stats = openpiv_cxx.tools.FieldStatistics()
+    >>> for frame_a, frame_b in pairs:
+    ...     x, y, u, v, *_ = openpiv_cxx.windef.run_multipass(frame_a, frame_b)
+    ...     stats.update(u, v)
+    >>> u_mean, uv = stats.mean_u, stats.reynolds_stress
+
+    """
+
+    def __init__(self, shape=None):
+        self.shape = None
+
+        if shape is not None:
+            self._allocate(tuple(int(n) for n in shape))
+
+    def _allocate(self, shape):
+        self.shape = shape
+        self.count = np.zeros(shape, dtype="int64")
+
+        self._mean_u = np.zeros(shape)
+        self._mean_v = np.zeros(shape)
+        self._m2_u = np.zeros(shape)
+        self._m2_v = np.zeros(shape)
+        self._c_uv = np.zeros(shape)
+
+        self.min_u = np.full(shape, np.nan)
+        self.max_u = np.full(shape, np.nan)
+        self.min_v = np.full(shape, np.nan)
+        self.max_v = np.full(shape, np.nan)
+
+    def _combine(self, count, mean_u, mean_v, m2_u, m2_v, c_uv):
+        """Combine the moments of another set of samples into the accumulator."""
+        total = self.count + count
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, count / total, 0.0)
+            cross = np.where(total > 0, self.count * count / total, 0.0)
+
+        delta_u = mean_u - self._mean_u
+        delta_v = mean_v - self._mean_v
+
+        self._mean_u += delta_u * weight
+        self._mean_v += delta_v * weight
+        self._m2_u += m2_u + delta_u * delta_u * cross
+        self._m2_v += m2_v + delta_v * delta_v * cross
+        self._c_uv += c_uv + delta_u * delta_v * cross
+
+        self.count = total
+
+    def update(self, u, v):
+        """Add vector fields
+
+        Parameters
+        ----------
+        u, v : ndarray
+            Two dimensional (ny, nx) arrays of a single vector field or three
+            dimensional (n_frames, ny, nx) arrays of a chunk of vector fields.
+
+        Returns
+        -------
+        self : FieldStatistics
+            The updated accumulator.
+
+        """
+        u = _as_stack(u)
+        v = _as_stack(v)
+
+        if u.shape != v.shape:
+            raise ValueError("u and v must have the same shape")
+
+        if self.shape is None:
+            self._allocate(u.shape[1:])
+
+        if u.shape[1:] != self.shape:
+            raise ValueError(f"Vector fields must have the shape {self.shape}")
+
+        valid = np.isfinite(u) & np.isfinite(v)
+        u = np.where(valid, u, 0.0)
+        v = np.where(valid, v, 0.0)
+
+        # moments of the chunk
+        count = valid.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_u = np.where(count > 0, u.sum(axis=0) / count, 0.0)
+            mean_v = np.where(count > 0, v.sum(axis=0) / count, 0.0)
+
+        fluct_u = np.where(valid, u - mean_u, 0.0)
+        fluct_v = np.where(valid, v - mean_v, 0.0)
+
+        self._combine(
+            count,
+            mean_u,
+            mean_v,
+            (fluct_u * fluct_u).sum(axis=0),
+            (fluct_v * fluct_v).sum(axis=0),
+            (fluct_u * fluct_v).sum(axis=0),
+        )
+
+        # extrema ignore NaNs
+        nan_u = np.where(valid, u, np.nan)
+        nan_v = np.where(valid, v, np.nan)
+
+        with np.errstate(invalid="ignore"):
+            for frame_u, frame_v in zip(nan_u, nan_v):
+                self.min_u = np.fmin(self.min_u, frame_u)
+                self.max_u = np.fmax(self.max_u, frame_u)
+                self.min_v = np.fmin(self.min_v, frame_v)
+                self.max_v = np.fmax(self.max_v, frame_v)
+
+        return self
+
+    def merge(self, other):
+        """Merge the accumulator of another worker
+
+        Parameters
+        ----------
+        other : FieldStatistics
+            An accumulator of vector fields with the same shape.
+
+        Returns
+        -------
+        self : FieldStatistics
+            The merged accumulator.
+
+        """
+        if other.shape is None:
+            return self
+
+        if self.shape is None:
+            self._allocate(other.shape)
+
+        if other.shape != self.shape:
+            raise ValueError("Accumulators must have the same shape")
+
+        self._combine(
+            other.count,
+            other._mean_u,
+            other._mean_v,
+            other._m2_u,
+            other._m2_v,
+            other._c_uv,
+        )
+
+        self.min_u = np.fmin(self.min_u, other.min_u)
+        self.max_u = np.fmax(self.max_u, other.max_u)
+        self.min_v = np.fmin(self.min_v, other.min_v)
+        self.max_v = np.fmax(self.max_v, other.max_v)
+
+        return self
+
+    def _moment(self, arr):
+        """Central moment from a sum of products of fluctuations."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, arr / self.count, np.nan)
+
+    @property
+    def mean_u(self):
+        """Mean of the u component."""
+        return np.where(self.count > 0, self._mean_u, np.nan)
+
+    @property
+    def mean_v(self):
+        """Mean of the v component."""
+        return np.where(self.count > 0, self._mean_v, np.nan)
+
+    @property
+    def var_u(self):
+        """Variance (Reynolds normal stress) of the u component."""
+        return self._moment(self._m2_u)
+
+    @property
+    def var_v(self):
+        """Variance (Reynolds normal stress) of the v component."""
+        return self._moment(self._m2_v)
+
+    @property
+    def rms_u(self):
+        """Root mean square of the fluctuations of the u component."""
+        return np.sqrt(self.var_u)
+
+    @property
+    def rms_v(self):
+        """Root mean square of the fluctuations of the v component."""
+        return np.sqrt(self.var_v)
+
+    @property
+    def reynolds_stress(self):
+        """Reynolds shear stress, the covariance of the u and v components."""
+        return self._moment(self._c_uv)
+
+    @property
+    def tke(self):
+        """Two dimensional turbulent kinetic energy, (var_u + var_v) / 2."""
+        return 0.5 * (self.var_u + self.var_v)
@@ -0,0 +1,675 @@
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+
+__all__ = [
+    "FieldReader",
+    "FieldStack",
+    "FieldWriter",
+    "load_fields",
+    "load_frames",
+    "open_field_store",
+    "save_fields",
+]
+
+
+# TIFF tags used to locate uncompressed pages
+_TIFF_TAGS = {
+    256: "width",
+    257: "height",
+    258: "bits",
+    259: "compression",
+    273: "offsets",
+    277: "samples",
+    279: "byte_counts",
+    322: "tile_width",
+    339: "sample_format",
+}
+
+# (struct code, size) of TIFF field types
+_TIFF_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4), 16: ("Q", 8)}
+
+# numpy kind of TIFF sample formats
+_TIFF_KINDS = {1: "u", 2: "i", 3: "f"}
+
+
+def _tiff_pages(filename):
+    """Offsets, shapes and data types of the pages of an uncompressed TIFF."""
+    with open(filename, "rb") as f:
+        header = f.read(8)
+
+        if header[:2] == b"II":
+            order = "<"
+        elif header[:2] == b"MM":
+            order = ">"
+        else:
+            raise ValueError(f"{filename} is not a TIFF file")
+
+        if struct.unpack(order + "H", header[2:4])[0] != 42:
+            raise ValueError(f"{filename} is not a classic TIFF file")
+
+        ifd_offset = struct.unpack(order + "I", header[4:8])[0]
+        pages = []
+
+        while ifd_offset != 0:
+            f.seek(ifd_offset)
+            (n_entries,) = struct.unpack(order + "H", f.read(2))
+            entries = f.read(12 * n_entries)
+            (ifd_offset,) = struct.unpack(order + "I", f.read(4))
+
+            # defaults of the TIFF specification
+            tags = {"compression": (1,), "samples": (1,), "sample_format": (1,)}
+
+            for k in range(n_entries):
+                tag, field_type, count = struct.unpack(
+                    order + "HHI", entries[12 * k : 12 * k + 8]
+                )
+
+                if tag not in _TIFF_TAGS or field_type not in _TIFF_TYPES:
+                    continue
+
+                code, size = _TIFF_TYPES[field_type]
+                value = entries[12 * k + 8 : 12 * k + 12]
+
+                # values that do not fit into the entry are stored elsewhere
+                if count * size > 4:
+                    position = f.tell()
+                    f.seek(struct.unpack(order + "I", value)[0])
+                    value = f.read(count * size)
+                    f.seek(position)
+
+                tags[_TIFF_TAGS[tag]] = struct.unpack(
+                    order + code * count, value[: count * size]
+                )
+
+            if "tile_width" in tags:
+                raise ValueError("Tiled TIFF files are not supported")
+
+            if tags["compression"][0] != 1:
+                raise ValueError("Only uncompressed TIFF files can be memory-mapped")
+
+            if tags.get("bits", (1,))[0] % 8 != 0:
+                raise ValueError("Only byte aligned TIFF samples are supported")
+
+            if tags["samples"][0] != 1:
+                raise ValueError("Only single channel TIFF files are supported")
+
+            if tags["sample_format"][0] not in _TIFF_KINDS:
+                raise ValueError(
+                    "Only integer and floating point TIFF samples are supported"
+                )
+
+            offsets, byte_counts = tags["offsets"], tags["byte_counts"]
+
+            # the strips of a page have to be stored contiguously
+            for k in range(len(offsets) - 1):
+                if offsets[k] + byte_counts[k] != offsets[k + 1]:
+                    raise ValueError("TIFF strips are not stored contiguously")
+
+            dtype = np.dtype(
+                order
+                + _TIFF_KINDS[tags["sample_format"][0]]
+                + str(tags["bits"][0] // 8)
+            )
+
+            pages.append(
+                (offsets[0], (tags["height"][0], tags["width"][0]), dtype)
+            )
+
+    return pages
+
+
+def load_frames(filename, shape=None, dtype="uint16", offset=0, mode="r"):
+    """Memory-map a stack of frames
+
+    Map the frames of a file into memory without reading them, so only the
+    frames (or parts of frames) that are accessed are loaded from disk.
+    Supported are NumPy (.npy) files, uncompressed (multi-page) TIFF files
+    and raw binary files without header.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    shape : tuple, optional
+        The (height, width) of the frames of a raw binary file. The number of
+        frames is derived from the file size.
+    dtype : str
+        The data type of the frames of a raw binary file.
+    offset : int
+        The number of header bytes to skip in a raw binary file.
+    mode : str
+        The file mode of the memory map, 'r' (default) for read only
+        and 'r+' for read and write.
+
+    Returns
+    -------
+    frames : ndarray
+        A memory-mapped three dimensional array of shape (n_frames, height, width).
+
+    Examples
+    --------
+    >>> frames = openpiv_cxx.tools.load_frames('recording.npy')
+    >>> frame_a, frame_b = frames[0], frames[1]
+
+    """
+    filename = str(filename)
+    suffix = filename.lower().rsplit(".", 1)[-1]
+
+    if suffix == "npy":
+        frames = np.load(filename, mmap_mode=mode)
+
+    elif suffix in ["tif", "tiff"]:
+        pages = _tiff_pages(filename)
+
+        if len(pages) == 0:
+            raise ValueError(f"{filename} does not contain any pages")
+
+        first, frame_shape, frame_dtype = pages[0]
+
+        for page_offset, page_shape, page_dtype in pages:
+            if page_shape != frame_shape or page_dtype != frame_dtype:
+                raise ValueError("All TIFF pages must have the same shape and type")
+
+        # pages are mapped as one array if they are evenly spaced
+        stride = pages[1][0] - first if len(pages) > 1 else 0
+        frame_size = frame_dtype.itemsize * frame_shape[0] * frame_shape[1]
+
+        for k, (page_offset, _, _) in enumerate(pages):
+            if page_offset != first + k * stride:
+                raise ValueError("TIFF pages are not evenly spaced")
+
+        buffer = np.memmap(
+            filename,
+            dtype="uint8",
+            mode=mode,
+            offset=first,
+            shape=(stride * (len(pages) - 1) + frame_size,),
+        )
+
+        frames = np.ndarray(
+            shape=(len(pages),) + frame_shape,
+            dtype=frame_dtype,
+            buffer=buffer,
+            strides=(
+                stride,
+                frame_dtype.itemsize * frame_shape[1],
+                frame_dtype.itemsize,
+            ),
+        )
+
+    else:
+        if shape is None:
+            raise ValueError("shape is required for raw binary files")
+
+        frames = np.memmap(filename, dtype=dtype, mode=mode, offset=offset)
+
+        frame_size = int(shape[0]) * int(shape[1])
+
+        if frames.size % frame_size != 0:
+            raise ValueError(f"File size does not match frames of shape {shape}")
+
+        frames = frames.reshape(-1, int(shape[0]), int(shape[1]))
+
+    if frames.ndim == 2:
+        frames = frames[np.newaxis]
+
+    if frames.ndim != 3:
+        raise ValueError("Frames must be two dimensional")
+
+    return frames
+
+
+def open_field_store(
+    filename,
+    mode="r",
+    n_frames=None,
+    shape=None,
+    fields=("x", "y", "u", "v", "s2n", "mask"),
+    dtype="float32",
+):
+    """Open a memory-mapped vector field store
+
+    Open or create a NumPy (.npy) file holding a sequence of vector fields as a
+    structured array of shape (n_frames, ny, nx). Every component is accessed
+    by name, e.g. store['u'][i] is the u component of frame i, and is written
+    to and read from disk on demand.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    mode : str
+        'r' (default) to read, 'r+' to read and write an existing store or
+        'w+' to create a new store.
+    n_frames : int, optional
+        The number of frames of a new store.
+    shape : tuple, optional
+        The (ny, nx) shape of the vector fields of a new store.
+    fields : tuple
+        The names of the components of a new store.
+    dtype : str
+        The data type of the components of a new store.
+
+    Returns
+    -------
+    store : ndarray
+        A memory-mapped structured array of shape (n_frames, ny, nx).
+
+    Examples
+    --------
+    >>> store = openpiv_cxx.tools.open_field_store(
+    ...     'results.npy', 'w+', n_frames=1000, shape=u.shape
+    ... )
+    >>> store['u'][0] = u
+    >>> store.flush()
+
+    """
+    if mode == "w+":
+        if n_frames is None or shape is None:
+            raise ValueError("n_frames and shape are required to create a store")
+
+        return np.lib.format.open_memmap(
+            str(filename),
+            mode="w+",
+            dtype=np.dtype([(name, dtype) for name in fields]),
+            shape=(int(n_frames), int(shape[0]), int(shape[1])),
+        )
+
+    if mode not in ["r", "r+"]:
+        raise ValueError(f"Mode {mode} not supported")
+
+    store = np.load(str(filename), mmap_mode=mode)
+
+    if store.dtype.names is None or store.ndim != 3:
+        raise ValueError(f"{filename} is not a vector field store")
+
+    return store
+
+
+def _frame_name(index, name):
+    """Archive member of a component of a frame."""
+    return f"frame_{index:06d}/{name}"
+
+
+def _frame_index(member):
+    """Frame index of an archive member."""
+    return int(member.split("/", 1)[0][len("frame_") :])
+
+
+class FieldWriter:
+    """Write a sequence of vector fields to a binary container
+
+    The container is a ZIP archive (readable with numpy.load) where every
+    component of every frame is stored as a .npy member, e.g.
+    'frame_000000/u.npy', optionally deflate compressed. Metadata is stored
+    as JSON next to the components. Frames are appended without rewriting
+    the existing frames, see FieldReader for reading.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the container, typically with the .npz extension.
+    mode : str
+        'w' (default) to create a new container or 'a' to append frames to an
+        existing container.
+    compress : bool
+        Deflate compress the components, [default: True].
+    metadata : dict, optional
+        JSON serializable metadata of the sequence, e.g. the evaluation settings.
+
+    Examples
+    --------
+    >>> with openpiv_cxx.tools.FieldWriter('results.npz') as writer:
+    ...     for frame_a, frame_b in pairs:
+    ...         x, y, u, v, s2n, mask, _ = windef.run_multipass(frame_a, frame_b)
+    ...         writer.append(x=x, y=y, u=u, v=v, s2n=s2n, mask=mask)
+
+    """
+
+    def __init__(self, filename, mode="w", compress=True, metadata=None):
+        if mode not in ["w", "a"]:
+            raise ValueError(f"Mode {mode} not supported")
+
+        self._zip = zipfile.ZipFile(
+            str(filename),
+            mode,
+            compression=zipfile.ZIP_DEFLATED if compress == True else zipfile.ZIP_STORED,
+            allowZip64=True,
+        )
+
+        names = self._zip.namelist()
+        frames = [_frame_index(name) for name in names if name.startswith("frame_")]
+
+        self._n_frames = max(frames) + 1 if len(frames) > 0 else 0
+
+        if metadata is not None:
+            if "metadata.json" in names:
+                raise ValueError("The container already holds metadata")
+
+            self._zip.writestr("metadata.json", json.dumps(metadata))
+
+    def __len__(self):
+        return self._n_frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, metadata=None, **fields):
+        """Append a frame
+
+        Parameters
+        ----------
+        metadata : dict, optional
+            JSON serializable metadata of the frame, e.g. the image file names.
+        **fields : ndarray
+            Components of the frame, e.g. x=x, y=y, u=u, v=v.
+
+        Returns
+        -------
+        index : int
+            The index of the frame.
+
+        """
+        if len(fields) == 0:
+            raise ValueError("At least one component is required")
+
+        index = self._n_frames
+
+        for name, arr in fields.items():
+            if isinstance(arr, np.ma.MaskedArray):
+                arr = arr.filled(np.nan)
+
+            with self._zip.open(
+                _frame_name(index, name) + ".npy", "w", force_zip64=True
+            ) as f:
+                np.lib.format.write_array(f, np.asanyarray(arr), allow_pickle=False)
+
+        if metadata is not None:
+            self._zip.writestr(
+                _frame_name(index, "metadata.json"), json.dumps(metadata)
+            )
+
+        self._n_frames += 1
+
+        return index
+
+    def close(self):
+        """Close the container."""
+        self._zip.close()
+
+
+class FieldReader:
+    """Lazily read a sequence of vector fields from a binary container
+
+    Components are only read and decompressed when they are accessed, see
+    FieldWriter for the layout of the container.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the container.
+
+    Examples
+    --------
+    >>> with openpiv_cxx.tools.FieldReader('results.npz') as reader:
+    ...     for i in range(len(reader)):
+    ...         u = reader.read(i, 'u')
+
+    """
+
+    def __init__(self, filename):
+        self._filename = str(filename)
+        self._zip = zipfile.ZipFile(self._filename, "r")
+
+        names = self._zip.namelist()
+
+        self._members = {}
+
+        for name in names:
+            if name.startswith("frame_") and name.endswith(".npy"):
+                index = _frame_index(name)
+                self._members.setdefault(index, []).append(
+                    name.split("/", 1)[1][: -len(".npy")]
+                )
+
+        self._n_frames = max(self._members) + 1 if len(self._members) > 0 else 0
+
+        if "metadata.json" in names:
+            self.metadata = json.loads(self._zip.read("metadata.json"))
+        else:
+            self.metadata = {}
+
+    def __len__(self):
+        return self._n_frames
+
+    def __getitem__(self, index):
+        """Read all components of a frame into a dict."""
+        return {name: self.read(index, name) for name in self.fields(index)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def fields(self, index=0):
+        """Names of the components of a frame."""
+        index = range(self._n_frames)[index]
+
+        return list(self._members.get(index, []))
+
+    def read(self, index, name):
+        """Read a component of a frame
+
+        Parameters
+        ----------
+        index : int
+            The index of the frame.
+        name : str
+            The name of the component, e.g. 'u'.
+
+        Returns
+        -------
+        arr : ndarray
+            The component.
+
+        """
+        index = range(self._n_frames)[index]
+
+        # uncompressed components are mapped instead of read
+        arr = self._memmap(index, name)
+
+        if arr is not None:
+            return arr
+
+        with self._zip.open(_frame_name(index, name) + ".npy") as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    def _memmap(self, index, name):
+        """Memory-map an uncompressed component, None if it is compressed."""
+        info = self._zip.getinfo(_frame_name(index, name) + ".npy")
+
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+
+        with open(self._filename, "rb") as f:
+            # skip the local file header of the member
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            offset = f.tell()
+
+        if dtype.hasobject:
+            return None
+
+        return np.memmap(
+            self._filename,
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=shape,
+            order="F" if fortran_order else "C",
+        )
+
+    def stack(self, name):
+        """Lazily loaded (n_frames, ny, nx) array of a component, see FieldStack."""
+        return FieldStack(self, name)
+
+    def frame_metadata(self, index):
+        """Metadata of a frame, an empty dict if the frame has no metadata."""
+        index = range(self._n_frames)[index]
+        member = _frame_name(index, "metadata.json")
+
+        if member not in self._zip.NameToInfo:
+            return {}
+
+        return json.loads(self._zip.read(member))
+
+    def close(self):
+        """Close the container."""
+        self._zip.close()
+
+
+class FieldStack:
+    """Lazily loaded sequence of a vector field component
+
+    An array-like view of one component of all frames of a FieldReader with
+    shape (n_frames, ny, nx). Only the frames that are indexed are loaded,
+    uncompressed containers (FieldWriter with compress=False) are memory-mapped
+    instead of read, so statistics can be computed chunk by chunk without
+    loading the entire sequence.
+
+    Parameters
+    ----------
+    reader : FieldReader
+        The container to read from.
+    name : str
+        The name of the component, e.g. 'u'.
+
+    Examples
+    --------
+    >>> reader = openpiv_cxx.tools.load_fields('results.npz')
+    >>> u = reader.stack('u')
+    >>> u_sum = sum(chunk.sum(axis=0) for chunk in u.chunks(100))
+    >>> u_mean = u_sum / len(u)
+
+    """
+
+    def __init__(self, reader, name):
+        if len(reader) == 0:
+            raise ValueError("The container does not hold any frames")
+
+        first = reader.read(0, name)
+
+        self._reader = reader
+        self.name = name
+        self.dtype = first.dtype
+        self.shape = (len(reader),) + first.shape
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _frame(self, index):
+        arr = self._reader.read(index, self.name)
+
+        if arr.shape != self.shape[1:]:
+            raise ValueError(f"Frame {index} has a different shape")
+
+        return arr
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        frames, rest = key[0], key[1:]
+
+        if isinstance(frames, (int, np.integer)):
+            return np.asarray(self._frame(int(frames))[rest])
+
+        if isinstance(frames, slice):
+            indexes = range(self.shape[0])[frames]
+        else:
+            indexes = np.arange(self.shape[0])[frames]
+
+        out = [np.asarray(self._frame(int(i))[rest]) for i in indexes]
+
+        if len(out) == 0:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)[(slice(None),) + rest]
+
+        return np.stack(out)
+
+    def __array__(self, dtype=None):
+        arr = self[:]
+
+        return arr if dtype is None else arr.astype(dtype)
+
+    def chunks(self, chunk_size=64):
+        """Iterate over the sequence in chunks
+
+        Parameters
+        ----------
+        chunk_size : int
+            The number of frames of every chunk.
+
+        Yields
+        ------
+        chunk : ndarray
+            A (chunk_size, ny, nx) array, the last chunk may have fewer frames.
+
+        """
+        chunk_size = max(int(chunk_size), 1)
+
+        for start in range(0, self.shape[0], chunk_size):
+            yield self[start : start + chunk_size]
+
+
+def save_fields(filename, append=False, compress=True, metadata=None, **fields):
+    """Save a vector field to a binary container
+
+    Write the components of a vector field as one frame of a binary, optionally
+    compressed container, see FieldWriter. Use FieldWriter directly to write
+    long sequences without reopening the container for every frame.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the container, typically with the .npz extension.
+    append : bool
+        Append the frame to an existing container instead of creating a new
+        container, [default: False].
+    compress : bool
+        Deflate compress the components, [default: True].
+    metadata : dict, optional
+        JSON serializable metadata of the frame.
+    **fields : ndarray
+        Components of the vector field, e.g. x=x, y=y, u=u, v=v.
+
+    Returns
+    -------
+    index : int
+        The index of the frame in the container.
+
+    """
+    with FieldWriter(filename, "a" if append == True else "w", compress) as writer:
+        return writer.append(metadata=metadata, **fields)
+
+
+def load_fields(filename):
+    """Open a binary vector field container for lazy reading, see FieldReader."""
+    return FieldReader(filename)
@@ -1,4 +1,5 @@
 from openpiv_cxx.input_checker import check_nd as _check
+from ._store_tools import save_fields
 
 import numpy as np
 
@@ -9,6 +10,9 @@ __all__ = ["save", "transform_coordinates", "uniform_scaling"]
 def save(filename, fmt="%8.4f", delimiter="\t", **kwargs):
     """Save flow field to an ascii file.
 
+    Files with the .npz extension are written as binary, compressed
+    containers instead, see save_fields.
+
     Parameters
     ----------
     filename : string
@@ -33,6 +37,10 @@ def save(filename, fmt="%8.4f", delimiter="\t", **kwargs):
     )
 
     """
+    if str(filename).endswith(".npz"):
+        save_fields(filename, **kwargs)
+        return
+
     den = []
     header = ""
 
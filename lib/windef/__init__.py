@@ -14,10 +14,15 @@ PIV Analysis
 
    first_pass - Zero order PIV evaluation
    multipass_img_deform - PIV evaluation with window deformation
+   pyramid_pass - Coarse-to-fine PIV evaluation on an image pyramid
+   run_multipass - Native multipass PIV evaluation with window deformation
+   run_multipass_tiled - Native multipass PIV evaluation of large images in tiles
+   sequence_pass - Time-resolved PIV evaluation with predictor reuse
    
 """
 
-from ._piv_eval import first_pass, multipass_img_deform
+from ._multipass import run_multipass, run_multipass_tiled
+from ._piv_eval import first_pass, multipass_img_deform, pyramid_pass, sequence_pass
 from ._window_deformation import create_deformation_field, deform_windows
 
 __all__ = [
@@ -25,4 +30,8 @@ __all__ = [
     "deform_windows",
     "first_pass",
     "multipass_img_deform",
+    "pyramid_pass",
+    "run_multipass",
+    "run_multipass_tiled",
+    "sequence_pass",
 ]
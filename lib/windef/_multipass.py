@@ -0,0 +1,334 @@
+from openpiv_cxx import process as piv_proc
+from openpiv_cxx.input_checker import check_nd as _check
+from ._windef_cpp import _multipass_deform
+
+import numpy as np
+
+
+__all__ = ["run_multipass", "run_multipass_tiled"]
+
+
+def run_multipass(
+    frame_a,
+    frame_b,
+    passes=((64, 32), (32, 16)),
+    correlation_method="circular",
+    deformation_method="symmetric",
+    deformation_algorithm="taylor expansions",
+    order=1,
+    radius=2,
+    deform_per_window=False,
+    validation_threshold=3.0,
+    validation_size=2,
+    validation_eps=0.1,
+    replace_iterations=10,
+    max_iterations=1,
+    tolerance=0.01,
+    reuse_tolerance=0.0,
+    thread_count=1,
+    mask=None,
+):
+    """Native multipass PIV with window deformation
+
+    Evaluate an image pair with several passes of window deformation PIV. The
+    complete per-pass loop (predictor interpolation, image deformation,
+    correlation, subpixel estimation, normalized median validation and
+    outlier replacement) runs natively with buffers reused across passes.
+    It is equivalent to first_pass followed by multipass_img_deform for each
+    remaining pass with validation and replacement in between. Every pass can
+    be repeated on the same grid until the correction of the displacement
+    field converges, so well-converged images stop early.
+
+    Parameters
+    ----------
+    frame_a : ndarray
+        A two dimensional array of integers containing grey levels of
+        the first frame.
+    frame_b : ndarray
+        A two dimensional array of integers containing grey levels of
+        the second frame.
+    passes : sequence
+        A sequence of (window_size, overlap) tuples, one for each pass.
+    correlation_method : str
+        Which correlation method to use where 'circular' is periodic
+        (e.g. not padded) and 'linear' is padded to size 2*window_size.
+    deformation_method : str
+        Order/type of deformation to use, either 'symmetric' or 'second image'.
+    deformation_algorithm : str
+        Type of deformation to use, either 'taylor expansions' or
+        'whittaker-shanon'.
+    order : int
+        The order of the Taylor expansions interpolation kernel.
+    radius : int
+        The radius of the Whittaker-Shannon interpolation kernel.
+    deform_per_window : bool
+        Deform the images directly into per-window buffers while correlating,
+        interpolating the displacement of each pixel on the fly, instead of
+        deforming the full frames. This avoids full-frame temporaries and skips
+        pixels that are not covered by interrogation windows.
+    validation_threshold : float
+        Threshold of the normalized local median test applied after every pass.
+    validation_size : int
+        The radius of the normalized local median kernel.
+    validation_eps : float
+        Epsilon of the normalized local median test.
+    replace_iterations : int
+        Maximum number of iterations for replacing invalid vectors with the
+        local mean of their valid neighbours.
+    max_iterations : int
+        Maximum number of times each pass is evaluated on the same grid, using
+        the result of the previous iteration as predictor, [default: 1].
+    tolerance : float
+        A pass stops iterating once the root mean square of the correction of
+        the displacement field drops below tolerance, in pixels.
+    reuse_tolerance : float
+        When a pass is evaluated on the same grid as the previous one (repeated
+        iterations or consecutive passes with the same window size and overlap),
+        windows keep their previous correlation peak while the predictor of every
+        grid point their deformation is interpolated from changed less than
+        reuse_tolerance pixels. Values <= 0 recorrelate all windows, [default: 0].
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels. Windows
+        that are fully masked return NaN displacements.
+
+    Returns
+    -------
+    x, y : ndarray
+        Array containg the x coordinates of the interrogation window centres.
+    u, v : ndarray
+        Array containing the u/v displacement for every interrogation window.
+    s2n : ndarray
+        Array consisting of signal to noise ratio values.
+    mask : ndarray
+        An integer array where elements that = 0 are valid and 1 = invalid
+        vectors of the last pass, which were replaced.
+    iterations : list
+        The number of iterations used by every pass.
+
+    """
+    _check(ndim=2, frame_a=frame_a, frame_b=frame_b)
+
+    if frame_a.shape != frame_b.shape:
+        raise ValueError("frame_a and frame_b must have the same shape")
+
+    if len(passes) == 0:
+        raise ValueError("At least one pass is required")
+
+    window_sizes = [int(window_size) for window_size, _ in passes]
+    overlaps = [int(overlap) for _, overlap in passes]
+
+    if correlation_method not in ["circular", "linear"]:
+        raise ValueError(f"Unsupported correlation method: {correlation_method}.")
+
+    if correlation_method == "circular":
+        correlation_method = 0  # circular
+    else:
+        correlation_method = 1  # linear
+
+    if deformation_method == "symmetric":
+        deform_order = 2
+    elif deformation_method == "second image":
+        deform_order = 1
+    else:
+        raise ValueError(f"Deformation method {deformation_method} not supported")
+
+    if deformation_algorithm.lower() == "taylor expansions":
+        if order not in [1, 3, 5, 7]:
+            raise ValueError(
+                f"Order {order} is not supported. Supported interpolation "
+                + "orders are 1, 3, 5, and 7"
+            )
+
+        deform_algo = 0
+        kernel_param = int(order)
+
+    elif deformation_algorithm.lower() == "whittaker-shanon":
+        if radius < 1:
+            raise ValueError("Radius < 1 is not supported")
+
+        deform_algo = 1
+        kernel_param = int(radius)
+
+    else:
+        raise ValueError(
+            f"Deformation method {deformation_algorithm} not supported. \n\
+             Supported algorithms are 'whittaker-shanon' and 'taylor expansions'"
+        )
+
+    if mask is None:
+        mask = np.empty((0, 0), dtype="uint8")  # empty mask disables masking
+    else:
+        _check(ndim=2, mask=mask)
+
+        if mask.shape != frame_a.shape:
+            raise ValueError("mask must have the same shape as the images")
+
+        mask = (mask != 0).astype("uint8")
+
+    if max_iterations < 1:
+        raise ValueError("max_iterations must be at least 1")
+
+    if frame_a.dtype != "float64":
+        frame_a = frame_a.astype("float64")
+
+    if frame_b.dtype != "float64":
+        frame_b = frame_b.astype("float64")
+
+    u, v, s2n, invalid, iterations = _multipass_deform(
+        frame_a,
+        frame_b,
+        window_sizes,
+        overlaps,
+        correlation_method,
+        deform_algo,
+        deform_order,
+        kernel_param,
+        deform_per_window == True,
+        float(validation_threshold),
+        int(validation_size),
+        float(validation_eps),
+        int(replace_iterations),
+        int(max_iterations),
+        float(tolerance),
+        float(reuse_tolerance),
+        int(thread_count),
+        mask,
+    )
+
+    x, y = piv_proc.get_rect_coordinates(frame_a.shape, window_sizes[-1], overlaps[-1])
+
+    return x, y, u, v, s2n, invalid, iterations
+
+
+def _tile_ranges(n_vectors, tile_vectors, step, window_size, halo, length):
+    """Vector and pixel ranges of the tiles along one axis."""
+    # tile origins are aligned to the grid so the tile grids match the full grid
+    halo = -(-halo // step) * step
+
+    for first in range(0, n_vectors, tile_vectors):
+        last = min(first + tile_vectors, n_vectors)
+
+        start = max(first * step - halo, 0)
+        stop = min((last - 1) * step + window_size + halo, length)
+
+        yield first, last, start, stop
+
+
+def run_multipass_tiled(
+    frame_a,
+    frame_b,
+    passes=((64, 32), (32, 16)),
+    tile_size=1024,
+    max_displacement=16,
+    mask=None,
+    **kwargs,
+):
+    """Native multipass PIV of large images in independent tiles
+
+    Evaluate an image pair in overlapping tiles with run_multipass and stitch
+    the vector fields. Every tile is extended by a halo of the largest window
+    size plus max_displacement pixels, so the vectors of its interior are not
+    affected by the tile borders. Only one tile of each frame is converted and
+    processed at a time, which bounds the peak memory regardless of the image
+    size. If the frames are memory-mapped (e.g. numpy.memmap or numpy.load with
+    mmap_mode), only the tiles are read from disk.
+
+    Parameters
+    ----------
+    frame_a : ndarray
+        A two dimensional array containing grey levels of the first frame.
+    frame_b : ndarray
+        A two dimensional array containing grey levels of the second frame.
+    passes : sequence
+        A sequence of (window_size, overlap) tuples, one for each pass.
+    tile_size : int
+        The approximate size of the tile interiors in pixels.
+    max_displacement : int
+        The largest expected displacement in pixels.
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels.
+    **kwargs
+        Additional keyword arguments passed to run_multipass.
+
+    Returns
+    -------
+    x, y : ndarray
+        Array containg the x coordinates of the interrogation window centres.
+    u, v : ndarray
+        Array containing the u/v displacement for every interrogation window.
+    s2n : ndarray
+        Array consisting of signal to noise ratio values.
+    mask : ndarray
+        An integer array where elements that = 0 are valid and 1 = invalid
+        vectors of the last pass, which were replaced.
+
+    """
+    _check(ndim=2, frame_a=frame_a, frame_b=frame_b)
+
+    if frame_a.shape != frame_b.shape:
+        raise ValueError("frame_a and frame_b must have the same shape")
+
+    if len(passes) == 0:
+        raise ValueError("At least one pass is required")
+
+    if mask is not None and mask.shape != frame_a.shape:
+        raise ValueError("mask must have the same shape as the images")
+
+    window_size, overlap = (int(value) for value in passes[-1])
+    step = window_size - overlap
+
+    if step < 1:
+        raise ValueError("Overlap sizes should be smaller than interrogation window sizes")
+
+    halo = max(int(ws) for ws, _ in passes) + int(max_displacement)
+    tile_vectors = max(int(tile_size) // step, 1)
+
+    x, y = piv_proc.get_rect_coordinates(frame_a.shape, window_size, overlap)
+
+    u = np.full(x.shape, np.nan)
+    v = np.full(x.shape, np.nan)
+    s2n = np.full(x.shape, np.nan)
+    invalid = np.zeros(x.shape, dtype=int)
+
+    rows = list(
+        _tile_ranges(
+            x.shape[0], tile_vectors, step, window_size, halo, frame_a.shape[0]
+        )
+    )
+    cols = list(
+        _tile_ranges(
+            x.shape[1], tile_vectors, step, window_size, halo, frame_a.shape[1]
+        )
+    )
+
+    for first_i, last_i, start_i, stop_i in rows:
+        for first_j, last_j, start_j, stop_j in cols:
+            tile = (slice(start_i, stop_i), slice(start_j, stop_j))
+
+            _, _, tile_u, tile_v, tile_s2n, tile_invalid, _ = run_multipass(
+                np.asarray(frame_a[tile]),
+                np.asarray(frame_b[tile]),
+                passes=passes,
+                mask=None if mask is None else np.asarray(mask[tile]),
+                **kwargs,
+            )
+
+            # the vectors of the tile interior
+            offset_i = start_i // step
+            offset_j = start_j // step
+
+            interior = (
+                slice(first_i - offset_i, last_i - offset_i),
+                slice(first_j - offset_j, last_j - offset_j),
+            )
+            field = (slice(first_i, last_i), slice(first_j, last_j))
+
+            u[field] = tile_u[interior]
+            v[field] = tile_v[interior]
+            s2n[field] = tile_s2n[interior]
+            invalid[field] = tile_invalid[interior]
+
+    return x, y, u, v, s2n, invalid
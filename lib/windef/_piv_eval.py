@@ -1,16 +1,36 @@
 from numpy import array
 from numpy.ma import MaskedArray
+import numpy as np
 from openpiv_cxx import process as piv_proc
+from openpiv_cxx.filters import gaussian_filter
 from openpiv_cxx.interpolate import bilinear2D, whittaker2D
 from ._window_deformation import deform_windows, create_deformation_field
 from openpiv_cxx.input_checker import check_nd as _check
+from openpiv_cxx.validate import normalized_local_median
 
 
-__all__ = ["first_pass", "multipass_img_deform"]
+__all__ = ["first_pass", "multipass_img_deform", "pyramid_pass", "sequence_pass"]
+
+
+def _fill_nans(arr):
+    """Replace NaNs with the median of the remaining elements."""
+    valid = ~np.isnan(arr)
+
+    if np.all(valid):
+        return arr
+
+    fill_value = np.median(arr[valid]) if np.any(valid) else 0.0
+
+    return np.where(valid, arr, fill_value)
 
 
 def first_pass(
-    frame_a, frame_b, window_size=32, overlap=16, correlation_method="circular"
+    frame_a,
+    frame_b,
+    window_size=32,
+    overlap=16,
+    correlation_method="circular",
+    mask=None,
 ):
     """Zero order PIV
 
@@ -32,6 +52,9 @@ def first_pass(
          The size of the interrogation window.
     overlap : int
         The overlap of the interrogation window, typically it is window_size/2.
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels. Windows
+        that are fully masked return NaN displacements.
 
     Returns
     -------
@@ -46,7 +69,13 @@ def first_pass(
     _check(ndim=2, frame_a=frame_a, frame_b=frame_b)
 
     cmatrix = piv_proc.fft_correlate_images(
-        frame_a, frame_b, window_size, overlap, correlation_method, thread_count=1
+        frame_a,
+        frame_b,
+        window_size,
+        overlap,
+        correlation_method,
+        thread_count=1,
+        mask=mask,
     )
 
     field_shape = piv_proc.get_field_shape(frame_a.shape, window_size, overlap)
@@ -74,6 +103,10 @@ def multipass_img_deform(
     deformation_algorithm="taylor expansions",
     order=1,
     radius=2,
+    mask=None,
+    validation_mask=None,
+    gradient_threshold=None,
+    s2n_old=None,
 ):
     """PIV with image deformation
 
@@ -83,6 +116,12 @@ def multipass_img_deform(
     the displacement u, v for each interrogation window as well as
     the signal to noise ratio array.
 
+    If validation_mask or gradient_threshold is given, the pass is adaptive:
+    only interrogation windows whose predictor is influenced by invalid vectors
+    of the previous pass or lies in a high-gradient region are recorrelated,
+    while the predictor is kept for all other windows. Only the bounding region
+    of the recorrelated windows is deformed.
+
     Parameters
     ----------
     frame_a : ndarray
@@ -115,6 +154,19 @@ def multipass_img_deform(
         The order of the Taylor expansions interpolation kernel.
     radius : scalar
         The radius of the Whittaker-Shannon interpolation kernel.
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels. Windows
+        that are fully masked return NaN displacements.
+    validation_mask : ndarray, optional
+        An integer array with the same shape as u_old where elements that = 0 are
+        valid and 1 = invalid, e.g. the output of validate.normalized_local_median.
+        Windows whose predictor is interpolated from invalid vectors are recorrelated.
+    gradient_threshold : scalar, optional
+        Windows where the predictor changes by more than gradient_threshold pixels
+        between neighbouring vectors of the new grid are recorrelated.
+    s2n_old : ndarray, optional
+        The signal to noise ratio of the previous pass, interpolated onto the
+        windows that are not recorrelated in an adaptive pass.
 
     Returns
     -------
@@ -123,7 +175,9 @@ def multipass_img_deform(
     u, v : ndarray
         Array containing the u/v displacement for every interrogation window.
     s2n : ndarray
-        Array consisting of signal to noise ratio values.
+        Array consisting of signal to noise ratio values. Windows that were not
+        recorrelated in an adaptive pass keep the interpolated s2n_old, or NaN if
+        s2n_old is not given.
 
     """
     _check(
@@ -164,24 +218,383 @@ def multipass_img_deform(
     else:
         raise ValueError(f"Deformation method {deformation_method} not supported")
 
-    frame_a, frame_b = deform_windows(
-        frame_a.astype("float64"),  # force the result to be float64
-        frame_b.astype("float64"),
-        x,
-        y,
-        u_pre,
-        v_pre,
+    options = dict(
         order=order,
         radius=radius,
         deformation_method=deformation_algorithm,
         deformation_order=deform_order,
     )
 
-    x, y, u, v, s2n = first_pass(
-        frame_a, frame_b, window_size, overlap, correlation_method
-    )
+    if validation_mask is None and gradient_threshold is None:
+        frame_a, frame_b = deform_windows(
+            frame_a.astype("float64"),  # force the result to be float64
+            frame_b.astype("float64"),
+            x,
+            y,
+            u_pre,
+            v_pre,
+            **options,
+        )
+
+        x, y, u, v, s2n = first_pass(
+            frame_a, frame_b, window_size, overlap, correlation_method, mask
+        )
+
+        u += u_pre
+        v += v_pre
+
+        return x, y, u, v, s2n
+
+    # adaptive pass: only recorrelate invalid and high-gradient regions
+    refine = np.zeros(u_pre.shape, dtype=bool)
+
+    if validation_mask is not None:
+        _check(ndim=2, validation_mask=validation_mask)
+
+        if validation_mask.shape != u_old.shape:
+            raise ValueError("validation_mask must have the same shape as u_old")
+
+        # any window whose predictor is influenced by an invalid vector
+        refine |= (
+            bilinear2D(
+                x_old, y_old, (validation_mask != 0).astype("float64"), x_int, y_int
+            )
+            > 0.0
+        )
+
+    if gradient_threshold is not None:
+        for comp in (u_pre, v_pre):
+            du_dy, du_dx = np.gradient(comp)
+            refine |= np.hypot(du_dx, du_dy) > gradient_threshold
+
+    u = u_pre.copy()
+    v = v_pre.copy()
+
+    if s2n_old is not None:
+        _check(ndim=2, s2n_old=s2n_old)
+
+        if s2n_old.shape != u_old.shape:
+            raise ValueError("s2n_old must have the same shape as u_old")
+
+        # clamp to the old grid to avoid extrapolating at the borders
+        s2n = bilinear2D(
+            x_old,
+            y_old,
+            s2n_old.astype("float64"),
+            np.clip(x_int, x_old[0], x_old[-1]),
+            np.clip(y_int, y_old[0], y_old[-1]),
+        )
+    else:
+        s2n = np.full(u_pre.shape, np.nan)
+
+    if np.any(refine):
+        x_ref = x[refine]
+        y_ref = y[refine]
+
+        # the region must hold the displaced pixels and the interpolation kernel
+        displacement = np.nan_to_num(np.maximum(np.abs(u_pre), np.abs(v_pre)))
+        margin = int(np.ceil(displacement.max())) + max(int(order), int(radius)) + 2
+
+        half_size = window_size / 2.0
+        rows, cols = frame_a.shape
+
+        left = max(int(np.floor(x_ref.min() - half_size + 0.5)) - margin, 0)
+        bottom = max(int(np.floor(y_ref.min() - half_size + 0.5)) - margin, 0)
+        right = min(int(np.floor(x_ref.max() - half_size + 0.5)) + window_size + margin, cols)
+        top = min(int(np.floor(y_ref.max() - half_size + 0.5)) + window_size + margin, rows)
+
+        region = (slice(bottom, top), slice(left, right))
+
+        region_a, region_b = deform_windows(
+            frame_a[region].astype("float64"),
+            frame_b[region].astype("float64"),
+            x - left,
+            y - bottom,
+            u_pre,
+            v_pre,
+            **options,
+        )
+
+        cmatrix = piv_proc.fft_correlate_points(
+            region_a,
+            region_b,
+            x_ref - left,
+            y_ref - bottom,
+            window_size,
+            correlation_method,
+            thread_count=1,
+            mask=None if mask is None else mask[region],
+        )
 
-    u += u_pre
-    v += v_pre
+        u_ref, v_ref, _, s2n_ref = piv_proc.correlation_to_displacement(
+            cmatrix, limit_peak_search=False, thread_count=1
+        )
+
+        u[refine] += u_ref
+        v[refine] += v_ref
+        s2n[refine] = s2n_ref
 
     return x, y, u, v, s2n
+
+
+def pyramid_pass(
+    frame_a,
+    frame_b,
+    window_size=32,
+    overlap=16,
+    levels=2,
+    correlation_method="circular",
+    deformation_method="symmetric",
+    deformation_algorithm="taylor expansions",
+    sigma=1.0,
+    mask=None,
+):
+    """Coarse-to-fine PIV on an image pyramid
+
+    Estimate large displacements by evaluating downsampled images. Both frames
+    are low pass filtered and downsampled by a factor of two per level. The
+    coarsest level is evaluated with first_pass and each finer level (except
+    the full resolution images) is refined with multipass_img_deform, doubling
+    the predictor between levels. The predictor of the finest coarse level is
+    then upsampled onto the full resolution grid, which is a fraction of the
+    cost of a full resolution pass with large interrogation windows.
+
+    Parameters
+    ----------
+    frame_a : ndarray
+        A two dimensional array of integers containing grey levels of
+        the first frame.
+    frame_b : ndarray
+        A two dimensional array of integers containing grey levels of
+        the second frame.
+    window_size : int
+         The size of the interrogation window at every pyramid level.
+    overlap : int
+        The overlap of the interrogation window, typically it is window_size/2.
+    levels : int
+        The number of downsampled pyramid levels, [default: 2]. Displacements of up
+        to roughly window_size/2 * 2**levels pixels can be recovered.
+    correlation_method : str
+        Type of correlation to use, see first_pass.
+    deformation_method : str
+        Order/type of deformation to use, see multipass_img_deform.
+    deformation_algorithm : str
+        Type of deformation to use, see multipass_img_deform.
+    sigma : scalar
+        Standard deviation of the gaussian low pass filter applied before
+        downsampling.
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels.
+
+    Returns
+    -------
+    x, y : ndarray
+        Array containg the x coordinates of the interrogation window centres
+        of the full resolution images.
+    u, v : ndarray
+        Array containing the predicted u/v displacement for every interrogation
+        window of the full resolution images.
+
+    """
+    _check(ndim=2, frame_a=frame_a, frame_b=frame_b)
+
+    if int(levels) < 1:
+        raise ValueError("levels must be at least 1")
+
+    levels = int(levels)
+
+    # build the image pyramid, level 0 being the original images
+    pyramid_a = [frame_a.astype("float64")]
+    pyramid_b = [frame_b.astype("float64")]
+    pyramid_mask = [mask]
+
+    for level in range(levels):
+        pyramid_a.append(gaussian_filter(pyramid_a[-1], sigma=sigma)[::2, ::2])
+        pyramid_b.append(gaussian_filter(pyramid_b[-1], sigma=sigma)[::2, ::2])
+
+        if mask is not None:
+            pyramid_mask.append(pyramid_mask[-1][::2, ::2])
+        else:
+            pyramid_mask.append(None)
+
+        if min(pyramid_a[-1].shape) < window_size:
+            raise ValueError(
+                f"Image is too small for {levels} pyramid levels with "
+                + f"interrogation windows of size {window_size}"
+            )
+
+    # coarsest level
+    x, y, u, v, _ = first_pass(
+        pyramid_a[levels],
+        pyramid_b[levels],
+        window_size,
+        overlap,
+        correlation_method,
+        mask=pyramid_mask[levels],
+    )
+
+    for level in range(levels - 1, -1, -1):
+        # fill missing vectors so they do not spread through the deformation
+        u = _fill_nans(u)
+        v = _fill_nans(v)
+
+        # image coordinates and displacements double on the finer level
+        x, y, u, v = 2.0 * x, 2.0 * y, 2.0 * u, 2.0 * v
+
+        if level == 0:
+            break
+
+        x, y, u, v, _ = multipass_img_deform(
+            pyramid_a[level],
+            pyramid_b[level],
+            x,
+            y,
+            u,
+            v,
+            window_size,
+            overlap,
+            correlation_method=correlation_method,
+            deformation_method=deformation_method,
+            deformation_algorithm=deformation_algorithm,
+            mask=pyramid_mask[level],
+        )
+
+    # upsample the predictor onto the full resolution grid
+    x_new, y_new = piv_proc.get_rect_coordinates(frame_a.shape, window_size, overlap)
+
+    x_old = x[0, :]
+    y_old = y[:, 0]
+
+    # clamp to the coarse grid to avoid extrapolating at the borders
+    x_int = np.clip(x_new[0, :], x_old[0], x_old[-1])
+    y_int = np.clip(y_new[:, 0], y_old[0], y_old[-1])
+
+    u = bilinear2D(x_old, y_old, u, x_int, y_int)
+    v = bilinear2D(x_old, y_old, v, x_int, y_int)
+
+    return x_new, y_new, u, v
+
+
+def sequence_pass(
+    frame_pairs,
+    passes=((64, 32), (32, 16)),
+    correlation_method="circular",
+    deformation_method="symmetric",
+    deformation_algorithm="taylor expansions",
+    order=1,
+    radius=2,
+    validation_threshold=3.0,
+    validation_size=1,
+    max_invalid=0.05,
+    mask=None,
+):
+    """Time-resolved PIV with predictor reuse
+
+    Evaluate a sequence of image pairs where consecutive displacement fields
+    are highly correlated. The first pair is evaluated with first_pass followed
+    by multipass_img_deform for each remaining pass. For every following pair,
+    the final field of the previous pair is used as predictor of the last pass
+    in place of the coarse passes. If more than max_invalid of the resulting
+    vectors fail the normalized local median test, the pair is evaluated again
+    with all passes.
+
+    Parameters
+    ----------
+    frame_pairs : iterable
+        An iterable of (frame_a, frame_b) tuples of two dimensional arrays
+        containing grey levels of the first and second frame.
+    passes : sequence
+        A sequence of (window_size, overlap) tuples, one for each pass.
+    correlation_method : str
+        Type of correlation to use, see first_pass.
+    deformation_method : str
+        Order/type of deformation to use, see multipass_img_deform.
+    deformation_algorithm : str
+        Type of deformation to use, see multipass_img_deform.
+    order : int
+        The order of the Taylor expansions interpolation kernel.
+    radius : int
+        The radius of the Whittaker-Shannon interpolation kernel.
+    validation_threshold : float
+        Threshold of the normalized local median test applied after every pass.
+    validation_size : int
+        The radius of the normalized local median kernel.
+    max_invalid : float
+        The largest fraction of invalid vectors for which the predictor of the
+        previous pair is accepted.
+    mask : ndarray, optional
+        A two dimensional boolean array where True marks masked pixels.
+
+    Yields
+    ------
+    x, y : ndarray
+        Array containg the x coordinates of the interrogation window centres.
+    u, v : ndarray
+        Array containing the u/v displacement for every interrogation window,
+        invalid vectors are replaced by the median of the field.
+    s2n : ndarray
+        Array consisting of signal to noise ratio values.
+    reused : bool
+        True if the coarse passes were skipped using the previous field.
+
+    """
+    if len(passes) == 0:
+        raise ValueError("At least one pass is required")
+
+    options = dict(
+        correlation_method=correlation_method,
+        deformation_method=deformation_method,
+        deformation_algorithm=deformation_algorithm,
+        order=order,
+        radius=radius,
+        mask=mask,
+    )
+
+    def validated(u, v):
+        invalid = normalized_local_median(
+            u, v, threshold=validation_threshold, size=validation_size
+        ) != 0
+        invalid |= np.isnan(u) | np.isnan(v)
+
+        u = _fill_nans(np.where(invalid, np.nan, u))
+        v = _fill_nans(np.where(invalid, np.nan, v))
+
+        return u, v, np.mean(invalid)
+
+    predictor = None
+
+    for frame_a, frame_b in frame_pairs:
+        _check(ndim=2, frame_a=frame_a, frame_b=frame_b)
+
+        reused = False
+
+        if predictor is not None:
+            # the previous field replaces the coarse passes
+            x, y, u, v, s2n = multipass_img_deform(
+                frame_a, frame_b, *predictor, *passes[-1], **options
+            )
+
+            u, v, invalid = validated(u, v)
+            reused = invalid <= max_invalid
+
+        if reused == False:
+            x, y, u, v, s2n = first_pass(
+                frame_a,
+                frame_b,
+                *passes[0],
+                correlation_method=correlation_method,
+                mask=mask,
+            )
+
+            u, v, _ = validated(u, v)
+
+            for window_size, overlap in passes[1:]:
+                x, y, u, v, s2n = multipass_img_deform(
+                    frame_a, frame_b, x, y, u, v, window_size, overlap, **options
+                )
+
+                u, v, _ = validated(u, v)
+
+        predictor = (x, y, u, v)
+
+        yield x, y, u, v, s2n, reused
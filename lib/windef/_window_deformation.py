@@ -1,6 +1,7 @@
 from numpy import arange, meshgrid
-from openpiv_cxx.interpolate import bilinear2D, whittaker2D, taylor_expansion2D
+from openpiv_cxx.interpolate import bilinear2D
 from openpiv_cxx.input_checker import check_nd as _check
+from ._windef_cpp import _deform_frame, _deform_frames_symmetric
 
 
 __all__ = ["create_deformation_field", "deform_windows"]
@@ -67,6 +68,7 @@ def deform_windows(
     order=1,
     radius=1,
     deformation_order=1,
+    thread_count=1,
 ):
     """Deform images by interpolation
 
@@ -75,7 +77,10 @@ def deform_windows(
     interpolated onto the new grid. Currently, two deformation algorithms are
     implemented, Whittaker-Shanon (sinc) and Taylor expansions with finite
     differences. Taylor expansions interpolation is usually much faster and
-    provides good results.
+    provides good results. The displacement of every pixel is interpolated
+    from the grid while the images are sampled, so no full-frame deformation
+    field is allocated. Outside of the grid, the displacement of the nearest
+    edge is used.
 
     Parameters
     ----------
@@ -107,6 +112,9 @@ def deform_windows(
     deformation_order : scalar
         Order of deformation to use where '1' deforms the second image
         and '2' deforms both images symetrically.
+    thread_count : int
+        The number of threads to use with values < 1 automatically setting thread_count
+        to the maximum of concurrent threads - 1, [default: 1].
 
     Returns
     -------
@@ -123,13 +131,22 @@ def deform_windows(
             + "Supported orders are 1 or 2"
         )
 
-    x_new, y_new, ut, vt = create_deformation_field(frame_a, x, y, u, v)
-
     if deformation_method.lower() == "whittaker-shanon":
-        deform_algo = whittaker2D
+        if radius < 1:
+            raise ValueError("Radius < 1 is not supported")
+
+        deform_algo = 1
+        kernel_param = int(radius)
 
     elif deformation_method.lower() == "taylor expansions":
-        deform_algo = taylor_expansion2D
+        if order not in [1, 3, 5, 7]:
+            raise ValueError(
+                f"Order {order} is not supported. Supported interpolation "
+                + "orders are 1, 3, 5, and 7"
+            )
+
+        deform_algo = 0
+        kernel_param = int(order)
 
     else:
         raise ValueError(
@@ -137,14 +154,22 @@ def deform_windows(
              Supported algorithms are 'whittaker-shanon' and 'taylor expansions'"
         )
 
+    # window centres are half-pixel for odd window sizes, so they are not truncated
+    x1 = x[0, :].astype("float64")  # extract first row from meshgrid
+    y1 = y[:, 0].astype("float64")  # extract first coloumn from meshgrid
+
+    # the displacement of every pixel is interpolated while the images are sampled
     if deformation_order == 1:
         frame_def_a = frame_a.copy()
 
-        frame_def_b = deform_algo(frame_b, y_new + vt, x_new + ut, order)
+        frame_def_b = _deform_frame(
+            frame_b, x1, y1, u, v, 1.0, deform_algo, kernel_param, int(thread_count)
+        )
 
     else:
-        frame_def_a = deform_algo(frame_a, y_new - vt / 2, x_new - ut / 2, order)
-
-        frame_def_b = deform_algo(frame_b, y_new + vt / 2, x_new + ut / 2, order)
+        # both frames share the interpolated displacement
+        frame_def_a, frame_def_b = _deform_frames_symmetric(
+            frame_a, frame_b, x1, y1, u, v, deform_algo, kernel_param, int(thread_count)
+        )
 
     return frame_def_a, frame_def_b
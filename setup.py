@@ -66,6 +66,7 @@ def main():
         version="0.4.0",
         package_dir={
             "openpiv_cxx": "lib",
+            "openpiv_cxx.batch": "lib/batch",
             "openpiv_cxx.filters": "lib/filters",
             "openpiv_cxx.input_checker": "lib/input_checker",
             "openpiv_cxx.inpaint_nans": "lib/inpaint_nans",
@@ -79,6 +80,7 @@ def main():
         },
         packages=[
             "openpiv_cxx",
+            "openpiv_cxx.batch",
             "openpiv_cxx.filters",
             "openpiv_cxx.input_checker",
             "openpiv_cxx.inpaint_nans",
@@ -94,6 +96,11 @@ def main():
             "C",
             "CXX"
         ],
+        entry_points={
+            "console_scripts": [
+                "openpiv-cxx-batch = openpiv_cxx.batch:main"
+            ]
+        },
         install_requires=install_requires,
         extras_require=extras,
         zip_safe=False
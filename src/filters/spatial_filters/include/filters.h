@@ -12,8 +12,10 @@ using imgDtype = constants::imgDtype;
 
 void intensity_cap_filter(
     imgDtype*,
-    int,
-    imgDtype
+    imgDtype*,
+    int, int,
+    imgDtype,
+    int
 );
 
 void binarize_filter(
@@ -28,6 +30,7 @@ void apply_kernel_lowpass(
     imgDtype*,
     std::vector<imgDtype>&,
     int, int,
+    int,
     int
 );
 
@@ -37,7 +40,42 @@ void apply_kernel_highpass(
     std::vector<imgDtype>&,
     int, int,
     int,
-    bool
+    bool,
+    int
+);
+
+
+void apply_kernel_lowpass_separable(
+    imgDtype*,
+    imgDtype*,
+    std::vector<imgDtype>&,
+    std::vector<imgDtype>&,
+    int, int,
+    int,
+    int
+);
+
+void apply_kernel_highpass_separable(
+    imgDtype*,
+    imgDtype*,
+    std::vector<imgDtype>&,
+    std::vector<imgDtype>&,
+    int, int,
+    int,
+    bool,
+    int
+);
+
+
+void variance_normalization(
+    imgDtype*,
+    imgDtype*,
+    std::vector<imgDtype>&,
+    std::vector<imgDtype>&,
+    int, int,
+    bool,
+    imgDtype,
+    int
 );
 
 
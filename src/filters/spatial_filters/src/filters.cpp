@@ -1,55 +1,115 @@
+#include <algorithm>
 #include <cmath>
 #include <vector>
 #include <iterator>
 #include <functional>
 #include <numeric>
 #include <cstdint>
+#include <exception>
+#include <limits>
+#include <thread>
 
 #include "kernels.h"
 #include "utils.h"
 
-void parallel_bulk( // for future parallel
+std::size_t get_thread_count(
+    int threads
+){
+    // values < 1 use the maximum of concurrent threads - 1
+    if (threads >= 1)
+        return static_cast<std::size_t>(threads);
+
+    return std::max<std::size_t>(std::thread::hardware_concurrency(), 2) - 1;
+}
+
+void parallel_bulk(
     std::function<void(std::size_t)>& lambda,
     std::size_t img_rows,
     std::size_t kernel_size,
     std::size_t thread_count = 4
 ){
     /* Perform bulk processing due to costs of creating/maintaining queues */
-    // get chunk size and starting row
-    std::size_t chunk_size = img_rows/thread_count, row = kernel_size / 2;
+    // get chunk size and starting row, skipping the border rows
+    std::size_t row = kernel_size / 2;
+    std::size_t n_rows = img_rows - 2*(kernel_size / 2);
+
+    thread_count = std::max<std::size_t>(std::min(thread_count, n_rows), 1);
+
+    std::size_t chunk_size = n_rows/thread_count;
     // allocate vector of shuck sizes
     std::vector<size_t> chunk_sizes( thread_count, chunk_size );
     // fix rounding errors to remove undefined behavior
-    chunk_sizes.back() = (img_rows - 2*(kernel_size / 2) - (thread_count-1)*chunk_size);
+    chunk_sizes.back() = n_rows - (thread_count-1)*chunk_size;
+
+    // rows are written independently, so every chunk runs on its own thread
+    std::vector<std::thread> workers;
+    std::vector<std::exception_ptr> errors( thread_count );
 
-    for ( const auto& chunk_size_ : chunk_sizes )
+    for (std::size_t k = 0; k < chunk_sizes.size(); ++k)
     {
-        auto processor = [row, chunk_size_, &lambda] ()
+        auto processor = [row, k, &chunk_sizes, &lambda, &errors] ()
         {
-            for ( std::size_t j=row; j<row + chunk_size_; ++j )
-                lambda(j);
+            try
+            {
+                for ( std::size_t j=row; j<row + chunk_sizes[k]; ++j )
+                    lambda(j);
+            }
+            catch (...)
+            {
+                errors[k] = std::current_exception();
+            }
         };
-        
-        processor(); // would be multi-threaded later...
-        row += chunk_size_;
+
+        // the last chunk is processed by the calling thread
+        if (k + 1 < chunk_sizes.size())
+            workers.emplace_back(processor);
+        else
+            processor();
+
+        row += chunk_sizes[k];
     }
+
+    for (auto& worker : workers)
+        worker.join();
+
+    for (auto& error : errors)
+        if (error)
+            std::rethrow_exception(error);
 }
 
 void intensity_cap_filter(
+    imgDtype* output,
     imgDtype* input,
-    int N_M,
-    imgDtype std_mult = 2.f
+    int img_rows, int img_cols,
+    imgDtype std_mult = 2.f,
+    int threads = 1
 ){
     imgDtype upper_limit{};
 
     // calculate mean and std
-    auto mean_std{ buffer_mean_std(input, N_M) };
+    auto mean_std{ buffer_mean_std(input, img_rows * img_cols) };
 
     // calculate cap
     upper_limit = mean_std[0] + std_mult * mean_std[1];
 
     // perform intensity capping
-    buffer_clip(input, 0.f, upper_limit, N_M);
+    std::function<void(std::size_t)> process_row = [
+        output,
+        input,
+        img_cols,
+        upper_limit
+    ]( std::size_t _row )
+    {
+        std::copy(
+            input + img_cols * _row,
+            input + img_cols * (_row + 1),
+            output + img_cols * _row
+        );
+
+        buffer_clip(output + img_cols * _row, 0.f, upper_limit, img_cols);
+    };
+
+    parallel_bulk(process_row, img_rows, 1, get_thread_count(threads));
 }
 
 void binarize_filter(
@@ -69,19 +129,20 @@ void apply_kernel_lowpass(
     imgDtype* input,
     std::vector<imgDtype>& kernel,
     int img_rows, int img_cols,
-    int kernel_size
+    int kernel_size,
+    int threads = 1
 ){
     int step{ img_cols };
 
     // setup lambda function for column processing
-    auto process_row = [
+    std::function<void(std::size_t)> process_row = [
         output,
         input,
         &kernel,
-        &img_cols,
-        &step,
-        &kernel_size
-    ]( int _row ) mutable
+        img_cols,
+        step,
+        kernel_size
+    ]( std::size_t _row )
     {
         for (int col{kernel_size / 2}; col < (img_cols - kernel_size / 2); ++col)
             output[step * _row + col] = kernels::apply_conv_kernel(
@@ -92,9 +153,8 @@ void apply_kernel_lowpass(
             );
     };
 
-    // process rows serially
-    for (int row{ kernel_size / 2 }; row < img_rows - kernel_size / 2; ++row)
-        process_row(row);
+    // process rows in parallel
+    parallel_bulk(process_row, img_rows, kernel_size, get_thread_count(threads));
 }
 
 
@@ -104,19 +164,21 @@ void apply_kernel_highpass(
     std::vector<imgDtype>& kernel,
     int img_rows, int img_cols,
     int kernel_size,
-    bool clip_at_zero = false
+    bool clip_at_zero = false,
+    int threads = 1
 ){
     int step{ img_cols };
 
     // setup lambda function for column processing
-    auto process_row = [
+    std::function<void(std::size_t)> process_row = [
         output,
         input,
         &kernel,
-        &img_cols,
-        &step,
-        &kernel_size
-    ]( int _row ) mutable
+        img_cols,
+        step,
+        kernel_size,
+        clip_at_zero
+    ]( std::size_t _row )
     {
         for (int col{kernel_size / 2}; col < (img_cols - kernel_size / 2); ++col)
             output[step * _row + col] = input[step * _row + col] - kernels::apply_conv_kernel(
@@ -125,13 +187,314 @@ void apply_kernel_highpass(
                 _row, col, step,
                 kernel_size
             );
+
+        // clip pixel values less than zero if necessary
+        if (clip_at_zero)
+            buffer_clip(output + step * _row, 0.f, 1.f, img_cols);
+    };
+
+    // process rows in parallel
+    parallel_bulk(process_row, img_rows, kernel_size, get_thread_count(threads));
+}
+
+
+void apply_kernel_lowpass_separable(
+    imgDtype* output,
+    imgDtype* input,
+    std::vector<imgDtype>& kernel_row,
+    std::vector<imgDtype>& kernel_col,
+    int img_rows, int img_cols,
+    int kernel_size,
+    int threads = 1
+){
+    int step{ img_cols }, half{ kernel_size / 2 };
+
+    // horizontal pass over all rows, which the vertical pass reads
+    std::vector<imgDtype> buffer(static_cast<std::size_t>(img_rows) * img_cols, 0.f);
+    imgDtype* temp = buffer.data();
+
+    std::function<void(std::size_t)> process_row = [
+        temp,
+        input,
+        &kernel_row,
+        step,
+        half
+    ]( std::size_t _row )
+    {
+        const imgDtype* in_row = input + step * _row;
+        imgDtype* temp_row = temp + step * _row;
+
+        for (int col{half}; col < step - half; ++col)
+        {
+            imgDtype sum{0};
+
+            for (int j{-half}; j <= half; ++j)
+                sum += kernel_row[j + half] * in_row[col + j];
+
+            temp_row[col] = sum;
+        }
+    };
+
+    // vertical pass, accumulating whole rows so memory is read contiguously
+    std::function<void(std::size_t)> process_col = [
+        output,
+        temp,
+        &kernel_col,
+        step,
+        half
+    ]( std::size_t _row )
+    {
+        imgDtype* out_row = output + step * _row;
+
+        for (int col{half}; col < step - half; ++col)
+            out_row[col] = 0.f;
+
+        for (int i{-half}; i <= half; ++i)
+        {
+            const imgDtype* temp_row = temp + step * (_row + i);
+            imgDtype weight{ kernel_col[i + half] };
+
+            for (int col{half}; col < step - half; ++col)
+                out_row[col] += weight * temp_row[col];
+        }
+    };
+
+    std::size_t thread_count{ get_thread_count(threads) };
+
+    parallel_bulk(process_row, img_rows, 1, thread_count);
+    parallel_bulk(process_col, img_rows, kernel_size, thread_count);
+}
+
+
+void apply_kernel_highpass_separable(
+    imgDtype* output,
+    imgDtype* input,
+    std::vector<imgDtype>& kernel_row,
+    std::vector<imgDtype>& kernel_col,
+    int img_rows, int img_cols,
+    int kernel_size,
+    bool clip_at_zero = false,
+    int threads = 1
+){
+    apply_kernel_lowpass_separable(
+        output,
+        input,
+        kernel_row,
+        kernel_col,
+        img_rows, img_cols,
+        kernel_size,
+        threads
+    );
+
+    std::function<void(std::size_t)> process_row = [
+        output,
+        input,
+        img_cols,
+        clip_at_zero
+    ]( std::size_t _row )
+    {
+        imgDtype* out_row = output + img_cols * _row;
+        const imgDtype* in_row = input + img_cols * _row;
+
+        for (int col{0}; col < img_cols; ++col)
+            out_row[col] = in_row[col] - out_row[col];
+
+        // clip pixel values less than zero if necessary
+        if (clip_at_zero)
+            buffer_clip(out_row, 0.f, 1.f, img_cols);
     };
 
-    // process rows serially
-    for (int row{ kernel_size / 2 }; row < img_rows - kernel_size / 2; ++row)
-        process_row(row);
+    parallel_bulk(process_row, img_rows, 1, get_thread_count(threads));
+}
+
+
+// index of numpy's 'reflect' padding mode, mirrored about the edge pixels
+inline int reflect_index(
+    int i,
+    int n
+){
+    if (n == 1)
+        return 0;
+
+    int period{ 2 * (n - 1) };
+
+    i = std::abs(i) % period;
+
+    return (i < n) ? i : period - i;
+}
+
+
+// horizontal pass of a 1D kernel over a row with reflected borders
+inline void convolve_row_reflect(
+    imgDtype* out_row,
+    const imgDtype* in_row,
+    imgDtype* padded,
+    const std::vector<imgDtype>& kernel,
+    int img_cols,
+    bool square = false
+){
+    int half{ static_cast<int>(kernel.size()) / 2 };
+
+    for (int col{-half}; col < img_cols + half; ++col)
+    {
+        imgDtype value{ in_row[reflect_index(col, img_cols)] };
+        padded[col + half] = square ? value * value : value;
+    }
+
+    // accumulate shifted rows so the inner loop runs over contiguous columns
+    std::fill(out_row, out_row + img_cols, 0.f);
+
+    for (int j{0}; j <= 2 * half; ++j)
+    {
+        imgDtype weight{ kernel[j] };
+        const imgDtype* shifted = padded + j;
 
-    // clip pixel values less than zero if necessary
-    if (clip_at_zero) 
-        buffer_clip(output, 0.f, 1.f, img_rows * img_cols);
-}
\ No newline at end of file
+        for (int col{0}; col < img_cols; ++col)
+            out_row[col] += weight * shifted[col];
+    }
+}
+
+
+// vertical pass of a 1D kernel for one row with reflected borders
+inline void convolve_col_reflect(
+    imgDtype* out_row,
+    const imgDtype* input,
+    const std::vector<imgDtype>& kernel,
+    int row,
+    int img_rows, int img_cols
+){
+    int half{ static_cast<int>(kernel.size()) / 2 };
+
+    std::fill(out_row, out_row + img_cols, 0.f);
+
+    for (int i{-half}; i <= half; ++i)
+    {
+        const imgDtype* in_row = input + static_cast<std::size_t>(img_cols) * reflect_index(row + i, img_rows);
+        imgDtype weight{ kernel[i + half] };
+
+        for (int col{0}; col < img_cols; ++col)
+            out_row[col] += weight * in_row[col];
+    }
+}
+
+
+void variance_normalization(
+    imgDtype* output,
+    imgDtype* input,
+    std::vector<imgDtype>& kernel1,
+    std::vector<imgDtype>& kernel2,
+    int img_rows, int img_cols,
+    bool clip_at_zero = true,
+    imgDtype scale = 1.f,
+    int threads = 1
+){
+    std::size_t thread_count{ get_thread_count(threads) };
+    std::size_t N_M{ static_cast<std::size_t>(img_rows) * img_cols };
+
+    // the high pass image and one buffer for the horizontal passes
+    std::vector<imgDtype> high_pass(N_M), temp(N_M);
+    std::vector<imgDtype> row_min(img_rows), row_max(img_rows);
+
+    std::size_t padded_size{ img_cols + std::max(kernel1.size(), kernel2.size()) };
+
+    // horizontal pass of the low pass kernel
+    std::function<void(std::size_t)> lowpass_rows = [
+        input, &temp, &kernel1, img_cols, padded_size
+    ]( std::size_t _row )
+    {
+        std::vector<imgDtype> padded(padded_size);
+
+        convolve_row_reflect(
+            temp.data() + img_cols * _row,
+            input + img_cols * _row,
+            padded.data(),
+            kernel1,
+            img_cols
+        );
+    };
+
+    // vertical pass of the low pass kernel, subtracted from the image
+    std::function<void(std::size_t)> highpass_cols = [
+        input, &temp, &high_pass, &kernel1, img_rows, img_cols
+    ]( std::size_t _row )
+    {
+        imgDtype* hp_row = high_pass.data() + img_cols * _row;
+        const imgDtype* in_row = input + img_cols * _row;
+
+        convolve_col_reflect(hp_row, temp.data(), kernel1, _row, img_rows, img_cols);
+
+        for (int col{0}; col < img_cols; ++col)
+            hp_row[col] = in_row[col] - hp_row[col];
+    };
+
+    // horizontal pass of the variance kernel over the squared high pass image
+    std::function<void(std::size_t)> variance_rows = [
+        &high_pass, &temp, &kernel2, img_cols, padded_size
+    ]( std::size_t _row )
+    {
+        std::vector<imgDtype> padded(padded_size);
+
+        convolve_row_reflect(
+            temp.data() + img_cols * _row,
+            high_pass.data() + img_cols * _row,
+            padded.data(),
+            kernel2,
+            img_cols,
+            true
+        );
+    };
+
+    // vertical pass of the variance kernel fused with the normalization
+    std::function<void(std::size_t)> normalize_cols = [
+        output, &temp, &high_pass, &kernel2, &row_min, &row_max,
+        img_rows, img_cols, clip_at_zero
+    ]( std::size_t _row )
+    {
+        imgDtype* out_row = output + img_cols * _row;
+        const imgDtype* hp_row = high_pass.data() + img_cols * _row;
+
+        convolve_col_reflect(out_row, temp.data(), kernel2, _row, img_rows, img_cols);
+
+        imgDtype min_{ std::numeric_limits<imgDtype>::max() };
+        imgDtype max_{ std::numeric_limits<imgDtype>::lowest() };
+
+        for (int col{0}; col < img_cols; ++col)
+        {
+            // stops image from being all black
+            imgDtype den{ std::sqrt(std::max(out_row[col], 0.f)) };
+            imgDtype value{ (den != 0.f) ? hp_row[col] / den : 0.f };
+
+            if (clip_at_zero && value < 0.f)
+                value = 0.f;
+
+            out_row[col] = value;
+            min_ = std::min(min_, value);
+            max_ = std::max(max_, value);
+        }
+
+        row_min[_row] = min_;
+        row_max[_row] = max_;
+    };
+
+    parallel_bulk(lowpass_rows, img_rows, 1, thread_count);
+    parallel_bulk(highpass_cols, img_rows, 1, thread_count);
+    parallel_bulk(variance_rows, img_rows, 1, thread_count);
+    parallel_bulk(normalize_cols, img_rows, 1, thread_count);
+
+    // min-max normalization to [0, scale]
+    imgDtype min_{ *std::min_element(row_min.begin(), row_min.end()) };
+    imgDtype max_{ *std::max_element(row_max.begin(), row_max.end()) };
+    imgDtype factor{ (max_ > min_) ? scale / (max_ - min_) : 0.f };
+
+    std::function<void(std::size_t)> rescale_rows = [
+        output, img_cols, min_, factor
+    ]( std::size_t _row )
+    {
+        imgDtype* out_row = output + img_cols * _row;
+
+        for (int col{0}; col < img_cols; ++col)
+            out_row[col] = (out_row[col] - min_) * factor;
+    };
+
+    parallel_bulk(rescale_rows, img_rows, 1, thread_count);
+}
@@ -25,8 +25,9 @@ namespace py = pybind11;
 
 
 py::array_t<imgDtype> intensity_cap_wrapper(
-    py::array_t<imgDtype>& input,
-    imgDtype std_mult = 2.f
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    imgDtype std_mult = 2.f,
+    int thread_count = 1
 ){
     // check input dimensions
     if ( input.ndim() != 2 )
@@ -39,13 +40,16 @@ py::array_t<imgDtype> intensity_cap_wrapper(
     py::array_t<imgDtype> result = py::array_t<imgDtype>(buf1.size);
     auto buf2 = result.request();
 
+    imgDtype* ptr_in  = (imgDtype*) buf1.ptr;
     imgDtype* ptr_out = (imgDtype*) buf2.ptr;
 
     // call pure C++ function
     intensity_cap_filter(
         ptr_out,
-        N*M, 
-        std_mult
+        ptr_in,
+        N, M, 
+        std_mult,
+        thread_count
     );
 
     result.resize( {N,M} );
@@ -55,7 +59,7 @@ py::array_t<imgDtype> intensity_cap_wrapper(
 
 
 py::array_t<imgDtype> intensity_binarize_wrapper(
-    py::array_t<imgDtype>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
     imgDtype threshold = 0.5
 ){
     // check input dimensions
@@ -87,8 +91,9 @@ py::array_t<imgDtype> intensity_binarize_wrapper(
 
 
 py::array_t<imgDtype> low_pass_filter_wrapper(
-    py::array_t<imgDtype>& input,
-    py::array_t<imgDtype>& np_kernel
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel,
+    int thread_count = 1
 ){
     // check input dimensions
     if ( input.ndim() != 2 )
@@ -119,7 +124,8 @@ py::array_t<imgDtype> low_pass_filter_wrapper(
       ptr_in,
       GKernel,
       N, M, 
-      kernel_size
+      kernel_size,
+      thread_count
     );
 
     result.resize( {N,M} );
@@ -129,9 +135,10 @@ py::array_t<imgDtype> low_pass_filter_wrapper(
 
 
 py::array_t<imgDtype> high_pass_filter_wrapper(
-    py::array_t<imgDtype>& input,
-    py::array_t<imgDtype>& np_kernel,
-    py::bool_ clip_at_zero = false
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel,
+    py::bool_ clip_at_zero = false,
+    int thread_count = 1
 ){
     // check input dimensions
     if ( input.ndim() != 2 )
@@ -163,7 +170,53 @@ py::array_t<imgDtype> high_pass_filter_wrapper(
         GKernel,
         N, M, 
         kernel_size,
-        clip_at_zero
+        clip_at_zero,
+        thread_count
+    );
+
+    result.resize( {N,M} );
+
+    return result;
+}
+
+
+py::array_t<imgDtype> low_pass_filter_separable_wrapper(
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel_row,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel_col,
+    int thread_count = 1
+){
+    // check input dimensions
+    if ( input.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_kernel_row.size() != np_kernel_col.size() || np_kernel_row.size() % 2 != 1 )
+        throw std::runtime_error("Kernels should have the same odd size");
+
+    auto buf1 = input.request();
+
+    int N = input.shape(0), M = input.shape(1);
+
+    py::array_t<imgDtype> result = py::array_t<imgDtype>(buf1.size);
+    auto buf2 = result.request();
+
+    imgDtype* ptr_in  = (imgDtype*) buf1.ptr;
+    imgDtype* ptr_out = (imgDtype*) buf2.ptr;
+
+    std::vector<imgDtype> kernel_row(np_kernel_row.data(), np_kernel_row.data() + np_kernel_row.size());
+    std::vector<imgDtype> kernel_col(np_kernel_col.data(), np_kernel_col.data() + np_kernel_col.size());
+
+    int kernel_size = np_kernel_row.size();
+
+    // call pure C++ function
+    apply_kernel_lowpass_separable(
+        ptr_out,
+        ptr_in,
+        kernel_row,
+        kernel_col,
+        N, M,
+        kernel_size,
+        thread_count
     );
 
     result.resize( {N,M} );
@@ -172,6 +225,98 @@ py::array_t<imgDtype> high_pass_filter_wrapper(
 }
 
 
+py::array_t<imgDtype> high_pass_filter_separable_wrapper(
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel_row,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel_col,
+    py::bool_ clip_at_zero = false,
+    int thread_count = 1
+){
+    // check input dimensions
+    if ( input.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_kernel_row.size() != np_kernel_col.size() || np_kernel_row.size() % 2 != 1 )
+        throw std::runtime_error("Kernels should have the same odd size");
+
+    auto buf1 = input.request();
+
+    int N = input.shape(0), M = input.shape(1);
+
+    py::array_t<imgDtype> result = py::array_t<imgDtype>(buf1.size);
+    auto buf2 = result.request();
+
+    imgDtype* ptr_in  = (imgDtype*) buf1.ptr;
+    imgDtype* ptr_out = (imgDtype*) buf2.ptr;
+
+    std::vector<imgDtype> kernel_row(np_kernel_row.data(), np_kernel_row.data() + np_kernel_row.size());
+    std::vector<imgDtype> kernel_col(np_kernel_col.data(), np_kernel_col.data() + np_kernel_col.size());
+
+    int kernel_size = np_kernel_row.size();
+
+    // call pure C++ function
+    apply_kernel_highpass_separable(
+        ptr_out,
+        ptr_in,
+        kernel_row,
+        kernel_col,
+        N, M,
+        kernel_size,
+        clip_at_zero,
+        thread_count
+    );
+
+    result.resize( {N,M} );
+
+    return result;
+}
+
+
+py::array_t<imgDtype> variance_normalization_wrapper(
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& input,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel1,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast>& np_kernel2,
+    py::bool_ clip_at_zero = true,
+    imgDtype scale = 1.f,
+    int thread_count = 1
+){
+    // check input dimensions
+    if ( input.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_kernel1.size() % 2 != 1 || np_kernel2.size() % 2 != 1 )
+        throw std::runtime_error("Kernels should have an odd size");
+
+    int N = input.shape(0), M = input.shape(1);
+
+    py::array_t<imgDtype> result({ N, M });
+
+    imgDtype* ptr_in  = const_cast<imgDtype*>(input.data());
+    imgDtype* ptr_out = result.mutable_data();
+
+    std::vector<imgDtype> kernel1(np_kernel1.data(), np_kernel1.data() + np_kernel1.size());
+    std::vector<imgDtype> kernel2(np_kernel2.data(), np_kernel2.data() + np_kernel2.size());
+
+    {
+        py::gil_scoped_release release;
+
+        // call pure C++ function
+        variance_normalization(
+            ptr_out,
+            ptr_in,
+            kernel1,
+            kernel2,
+            N, M,
+            clip_at_zero,
+            scale,
+            thread_count
+        );
+    }
+
+    return result;
+}
+
+
 #pragma warning(default: 4244)
 
 PYBIND11_MODULE(_spatial_filters_cpp, m) {
@@ -181,7 +326,8 @@ PYBIND11_MODULE(_spatial_filters_cpp, m) {
         &intensity_cap_wrapper,
         "Apply an intensity cap filter to a 2D array",
         py::arg("input"),
-        py::arg("std_mult") = 2.f
+        py::arg("std_mult") = 2.f,
+        py::arg("thread_count") = 1
     );
 
     m.def("_threshold_binarization", 
@@ -195,7 +341,8 @@ PYBIND11_MODULE(_spatial_filters_cpp, m) {
         &low_pass_filter_wrapper,
         "Apply a low pass filter to a 2D array",
         py::arg("input"),
-        py::arg("np_kernel")
+        py::arg("np_kernel"),
+        py::arg("thread_count") = 1
     );
 
     m.def("_highpass_filter", 
@@ -203,6 +350,37 @@ PYBIND11_MODULE(_spatial_filters_cpp, m) {
         "Apply a high pass filter to a 2D array",
         py::arg("input"),
         py::arg("np_kernel"),
-        py::arg("clip_at_zero") = false
+        py::arg("clip_at_zero") = false,
+        py::arg("thread_count") = 1
+    );
+
+    m.def("_lowpass_filter_separable", 
+        &low_pass_filter_separable_wrapper,
+        "Apply a separable low pass filter to a 2D array",
+        py::arg("input"),
+        py::arg("np_kernel_row"),
+        py::arg("np_kernel_col"),
+        py::arg("thread_count") = 1
+    );
+
+    m.def("_highpass_filter_separable", 
+        &high_pass_filter_separable_wrapper,
+        "Apply a separable high pass filter to a 2D array",
+        py::arg("input"),
+        py::arg("np_kernel_row"),
+        py::arg("np_kernel_col"),
+        py::arg("clip_at_zero") = false,
+        py::arg("thread_count") = 1
+    );
+
+    m.def("_variance_normalization", 
+        &variance_normalization_wrapper,
+        "Apply a fused local variance normalization filter to a 2D array",
+        py::arg("input"),
+        py::arg("np_kernel1"),
+        py::arg("np_kernel2"),
+        py::arg("clip_at_zero") = true,
+        py::arg("scale") = 1.f,
+        py::arg("thread_count") = 1
     );
 }
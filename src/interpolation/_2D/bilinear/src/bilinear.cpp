@@ -43,33 +43,25 @@ void bilinear2D(
 ){
     int y1, y2, x1, x2;
     double y, x, z11, z12, z21, z22;
-    uint32_t y_ind, x_ind, ii, jj;
+    uint32_t y_ind, x_ind;
     
     for (uint32_t i = 0; i < N; ++i)
     {
         x_ind = find_index(X, xi[i], xUpperBound);
 
-        ii = i;
         if (x_ind == 0)
-        {
-            x_ind = 1; // ignore edges
-            ii = ii + 1;
-        }
+            x_ind = 1; // extrapolate from the first cell at the edges
 
         x1 = X[x_ind - 1];
         x2 = X[x_ind];
-        x  = xi[ii];
+        x  = xi[i];
 
         for (uint32_t j = 0; j < M; ++j)
         {
             y_ind = find_index(Y, yi[j], yUpperBound);
 
-            jj = j;
             if (y_ind == 0)
-            {
-                y_ind = 1; // ignore edges
-                jj = jj + 1;
-            }
+                y_ind = 1; // extrapolate from the first cell at the edges
 
 //            std::cout << i << ' ' << j << ' ' << xi[i] << ' ' << yi[j] << '\n';
 
@@ -77,7 +69,7 @@ void bilinear2D(
 
             y1 = Y[y_ind - 1];
             y2 = Y[y_ind];
-            y  = yi[jj];
+            y  = yi[j];
 
 //            std::cout << x1 << ' ' << x2 << ' ' << y1 << ' ' << y2 << '\n';
 
@@ -39,11 +39,11 @@ int find_index_wrapper(
 */
 
 py::array_t<imgDtype> bilinear_interp_wrapper(
-    py::array_t<int> X,
-    py::array_t<int> Y,
-    py::array_t<imgDtype> Z,
-    py::array_t<imgDtype> xi,
-    py::array_t<imgDtype> yi
+    py::array_t<int, py::array::c_style | py::array::forcecast> X,
+    py::array_t<int, py::array::c_style | py::array::forcecast> Y,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast> Z,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast> xi,
+    py::array_t<imgDtype, py::array::c_style | py::array::forcecast> yi
 ){
     // check input dimensions
     if ( X.ndim() != 1 )
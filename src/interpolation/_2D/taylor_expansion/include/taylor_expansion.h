@@ -5,6 +5,15 @@
 #include <cstdint>
 
 
+double taylor_expansion_k1_point(
+    const double*,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double
+);
+
+
 void taylor_expansion_k1_2D(
     const double*,
     const double*,
@@ -15,6 +24,15 @@ void taylor_expansion_k1_2D(
 );
 
 
+double taylor_expansion_k3_point(
+    const double*,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double
+);
+
+
 void taylor_expansion_k3_2D(
     const double*,
     const double*,
@@ -25,6 +43,15 @@ void taylor_expansion_k3_2D(
 );
 
 
+double taylor_expansion_k5_point(
+    const double*,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double
+);
+
+
 void taylor_expansion_k5_2D(
     const double*,
     const double*,
@@ -35,6 +62,15 @@ void taylor_expansion_k5_2D(
 );
 
 
+double taylor_expansion_k7_point(
+    const double*,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double
+);
+
+
 void taylor_expansion_k7_2D(
     const double*,
     const double*,
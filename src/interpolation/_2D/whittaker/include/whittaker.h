@@ -10,6 +10,16 @@ double sinc(
 );
 
 
+double whittaker2D_point(
+    const double*,
+    uint32_t,
+    uint32_t,
+    double,
+    double,
+    int
+);
+
+
 void whittaker2D(
     const double*,
     const double*,
@@ -1,4 +1,5 @@
 // std
+#include <algorithm>
 #include <cmath>
 #include <iostream>
 
@@ -18,64 +19,50 @@ double sinc(
 }
 
 
-void whittaker2D(
-    const double* X,
-    const double* Y,
+// sample the image at a single (row, column) coordinate
+double whittaker2D_point(
     const double* Z,
-    double* out,
     uint32_t N,
     uint32_t M,
+    double bx,
+    double by,
     int radius
 ){
-    int xn, yn;
-    int i0=0, i1=0, j0=0, j1=0;
-    double dx, dy, bx, by, sx, sy;
     int nMax = static_cast<int>(N) - 1;
     int mMax = static_cast<int>(M) - 1;
-    
-    
-    for (uint32_t i = 0; i < N; ++i)
-    {
-        for (uint32_t j = 0; j < M; ++j)
-        {
-            bx = X[i * M + j];
-            by = Y[i * M + j];
 
-            xn =  (int) bx;
-            yn =  (int) by;
+    int xn =  (int) bx;
+    int yn =  (int) by;
 
-            i0 = xn - radius;
-            i1 = xn + radius;
-            j0 = yn - radius;
-            j1 = yn + radius;
-            
-//            std::cout << i0 << ' ' << i1 << ' ' << j0 << ' ' << j1 << '\n';
-            
-            i0 = std::max(i0, 0);
-            i1 = std::min(i1, nMax);
-                
-            j0 = std::max(j0, 0);
-            j1 = std::min(j1, mMax);
+    int i0 = std::max(xn - radius, 0);
+    int i1 = std::min(xn + radius, nMax);
+    int j0 = std::max(yn - radius, 0);
+    int j1 = std::min(yn + radius, mMax);
 
-//            std::cout << i0 << ' ' << i1 << ' ' << j0 << ' ' << j1 << '\n';
+    double result = 0.0;
 
-            out[i * M + j] = 0.0;
+    for (int k = i0; k <= i1; ++k)
+    {
+        double sx = sinc(double(k) - bx);
 
-            for (int k = i0; k <= i1; ++k)
-            {
-                dx = double(k) - bx;
-                sx = sinc(dx);
+        for (int h = j0; h <= j1; ++h)
+            result += Z[k * M + h] * sx * sinc(double(h) - by);
+    }
 
-//                std::cout << i << ' ' << j << ' ' << k << ' ' << dx << ": " << sx << '\n';
+    return result;
+}
 
-                for (int h = j0; h <= j1; ++h)
-                {
-                    dy = double(h) - by;
-                    sy = sinc(dy);
 
-                    out[i * M + j] += Z[k * M + h] * sx * sy;
-                }
-            }
-        }
-    }
-}
\ No newline at end of file
+void whittaker2D(
+    const double* X,
+    const double* Y,
+    const double* Z,
+    double* out,
+    uint32_t N,
+    uint32_t M,
+    int radius
+){
+    for (uint32_t i = 0; i < N; ++i)
+        for (uint32_t j = 0; j < M; ++j)
+            out[i * M + j] = whittaker2D_point(Z, N, M, X[i * M + j], Y[i * M + j], radius);
+}
@@ -3,13 +3,53 @@
 
 // std
 #include <cinttypes>
+#include <functional>
 #include <vector>
 
+// openpiv
+#include "core/image.h"
+#include "core/rect.h"
+
 // pybind11
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
 
 namespace py = pybind11;
+using namespace openpiv;
+
+
+void correlate_windows(
+    const core::gf_image&,
+    const core::gf_image&,
+    const std::vector<core::rect>&,
+    const std::vector<std::size_t>&,
+    std::uint32_t,
+    int,
+    int,
+    const std::uint8_t*,
+    std::vector<double>&
+);
+
+
+// fills the size x size buffers of window i of both frames and its mask
+using window_sampler = std::function<void(
+    std::size_t,
+    core::gf_image&,
+    core::gf_image&,
+    std::vector<std::uint8_t>&
+)>;
+
+
+void correlate_sampled_windows(
+    const std::vector<std::size_t>&,
+    std::uint32_t,
+    int,
+    int,
+    bool,
+    const window_sampler&,
+    std::vector<double>&
+);
+
 
 std::vector<double> process_window(
     py::array_t<double, py::array::c_style | py::array::forcecast>&,
@@ -23,7 +63,32 @@ std::vector<double> process_images_standard(
     std::uint32_t,
     std::uint32_t,
     int,
-    int
+    int,
+    const std::uint8_t*
+);
+
+
+std::vector<double> process_points_standard(
+    py::array_t<double, py::array::c_style | py::array::forcecast>&,
+    py::array_t<double, py::array::c_style | py::array::forcecast>&,
+    const double*,
+    const double*,
+    std::size_t,
+    std::uint32_t,
+    int,
+    int,
+    const std::uint8_t*
+);
+
+
+std::vector<double> process_images_ecc(
+    py::array_t<double, py::array::c_style | py::array::forcecast>&,
+    py::array_t<double, py::array::c_style | py::array::forcecast>&,
+    std::uint32_t,
+    std::uint32_t,
+    int,
+    int,
+    const std::uint8_t*
 );
 
 
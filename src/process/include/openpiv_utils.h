@@ -3,7 +3,7 @@
 
 // std
 #include <vector>
-// #include <cinttypes>
+#include <cinttypes>
 #include <cstddef>
 
 // openpiv
@@ -53,6 +53,26 @@ std::vector<double> mean_std(
     std::size_t
 );
 
+
+std::vector<double> mean_std_masked(
+    const core::gf_image&,
+    const std::uint8_t*,
+    std::size_t,
+    std::size_t,
+    std::size_t,
+    std::size_t
+);
+
+
+void placeIntoPaddedMasked(
+    const core::gf_image&,
+    core::gf_image&,
+    const std::uint8_t*,
+    int, int,
+    int, int,
+    double
+);
+
         
 void applyScalarToImage(
     core::gf_image&,
@@ -69,4 +89,12 @@ void placeIntoCmatrix(
     std::size_t
 );
 
+
+void fillCmatrix(
+    std::vector<double>&,
+    double,
+    std::size_t,
+    std::size_t
+);
+
 #endif
\ No newline at end of file
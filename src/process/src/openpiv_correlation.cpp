@@ -10,13 +10,18 @@ Table of Contents
 1:   comments
 17:  includes
 47:  standard cross-correlation of one interrogation window
-72:  standard cross-correlation
-178: auto-correlation
+72:  standard cross-correlation of a set of interrogation windows
+196: standard cross-correlation of sampled interrogation windows
+321: standard cross-correlation
+360: standard cross-correlation of windows centered at points
+428: auto-correlation
+519: error correlation correction (ecc) cross-correlation
 */
 
 #include "openpiv_correlation.h"
 
 // std
+#include <algorithm>
 #include <atomic>
 #include <chrono>
 #include <fstream>
@@ -64,36 +69,29 @@ std::vector<double> process_window(
 };
 
 
-// Normalozed cross-correlation
-std::vector<double> process_images_standard(
-    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
-    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
-    std::uint32_t size = 32,
-    std::uint32_t overlap_size = 16,
-    int correlation_method = 0,
-    int threads = 0
+// normalized cross-correlation of a set of interrogation windows where window i is
+// stored at cmatrix slot index[i] (an empty index stores windows in order)
+void correlate_windows(
+    const core::gf_image& img_a,
+    const core::gf_image& img_b,
+    const std::vector<core::rect>& grid,
+    const std::vector<std::size_t>& index,
+    std::uint32_t size,
+    int correlation_method,
+    int threads,
+    const std::uint8_t* mask,
+    std::vector<double>& cmatrix
 ){
-    // basic setup
-    double overlap = 1.0 - (static_cast<double>(overlap_size) / static_cast<double>(size));
-
     uint32_t thread_count = std::thread::hardware_concurrency()-1;
     if (threads >= 1)
         thread_count = static_cast<uint32_t>(threads);
 
-    core::gf_image img_a{ convert_image(np_img_a) };
-    core::gf_image img_b{ convert_image(np_img_b) };
-
-    // create a grid for processing
-    auto ia = core::size{size, size};
-    auto grid = core::generate_cartesian_grid( img_b.size(), ia, overlap );
-
     // padding
     auto paddedWindow = core::size{size, size};
     if (correlation_method != 0)
         paddedWindow = core::size{size * 2, size * 2}; // pad windows by 2N
 
     // process!
-    std::vector<double> cmatrix(grid.size() * size * size, 0.0);
     uint32_t cmatrix_stride = size * size;
 
     auto fft = algos::FFT( paddedWindow );
@@ -104,20 +102,48 @@ std::vector<double> process_images_standard(
         &cmatrix_stride,
         &img_a,
         &img_b,
+        &index,
         &paddedWindow,
         &fft,
-        &correlator
+        &correlator,
+        mask
      ]( std::size_t i, const core::rect& ia, 
         core::gf_image& view_a, core::gf_image& view_b,
         core::gf_image& output)
      {
-        auto mean_stdA = mean_std(img_a, ia.bottom(), ia.top(), ia.left(), ia.right());
-        auto mean_stdB = mean_std(img_b, ia.bottom(), ia.top(), ia.left(), ia.right());
+        std::vector<double> mean_stdA, mean_stdB;
+        double valid_count = static_cast<double>(ia.area());
 
-        double norm = mean_stdA[1] * mean_stdB[1] * static_cast<double>(paddedWindow.area() * ia.area());
+        if ( !index.empty() )
+            i = index[i];
 
-        placeIntoPadded(img_a, view_a, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
-        placeIntoPadded(img_b, view_b, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        if (mask == nullptr)
+        {
+            mean_stdA = mean_std(img_a, ia.bottom(), ia.top(), ia.left(), ia.right());
+            mean_stdB = mean_std(img_b, ia.bottom(), ia.top(), ia.left(), ia.right());
+
+            placeIntoPadded(img_a, view_a, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPadded(img_b, view_b, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
+        else
+        {
+            mean_stdA = mean_std_masked(img_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
+
+            // skip fully masked windows
+            if (mean_stdA[2] == 0.0)
+            {
+                fillCmatrix(cmatrix, NAN, cmatrix_stride, i);
+                return;
+            }
+
+            mean_stdB = mean_std_masked(img_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
+            valid_count = mean_stdA[2];
+
+            placeIntoPaddedMasked(img_a, view_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPaddedMasked(img_b, view_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
+
+        double norm = mean_stdA[1] * mean_stdB[1] * static_cast<double>(paddedWindow.area()) * valid_count;
 
         // prepare & correlate
         output = (fft.*correlator)( view_a, view_b );
@@ -128,7 +154,7 @@ std::vector<double> process_images_standard(
         placeIntoCmatrix(cmatrix, output, paddedWindow, ia, i); 
      };
 
-    if (thread_count > 1)
+    if (thread_count > 1 && grid.size() > thread_count)
     {
         ThreadPool pool( thread_count );
 
@@ -164,6 +190,236 @@ std::vector<double> process_images_standard(
         for (std::size_t i = 0; i < grid.size(); ++i)
             processor(i, grid[i], view_a, view_b, output);
     }
+}
+
+
+// normalized cross-correlation of interrogation windows that are sampled on the fly
+// where sampler(i, window_a, window_b, window_mask) fills size x size buffers of
+// window i, which is stored at cmatrix slot i
+void correlate_sampled_windows(
+    const std::vector<std::size_t>& windows,
+    std::uint32_t size,
+    int correlation_method,
+    int threads,
+    bool masked,
+    const window_sampler& sampler,
+    std::vector<double>& cmatrix
+){
+    uint32_t thread_count = std::thread::hardware_concurrency()-1;
+    if (threads >= 1)
+        thread_count = static_cast<uint32_t>(threads);
+
+    // padding
+    auto paddedWindow = core::size{size, size};
+    if (correlation_method != 0)
+        paddedWindow = core::size{size * 2, size * 2}; // pad windows by 2N
+
+    // process!
+    uint32_t cmatrix_stride = size * size;
+    auto ia = core::rect{ core::point2<std::int32_t>{0, 0}, core::size{size, size} };
+
+    auto fft = algos::FFT( paddedWindow );
+    auto correlator = &algos::FFT::cross_correlate_real<core::image, core::g_f>;
+
+    auto processor = [
+        &cmatrix,
+        &cmatrix_stride,
+        &ia,
+        &paddedWindow,
+        &fft,
+        &correlator,
+        &sampler,
+        masked
+     ]( std::size_t i,
+        core::gf_image& window_a, core::gf_image& window_b,
+        std::vector<std::uint8_t>& window_mask,
+        core::gf_image& view_a, core::gf_image& view_b,
+        core::gf_image& output)
+     {
+        std::vector<double> mean_stdA, mean_stdB;
+        double valid_count = static_cast<double>(ia.area());
+
+        sampler(i, window_a, window_b, window_mask);
+
+        if (!masked)
+        {
+            mean_stdA = mean_std(window_a, ia.bottom(), ia.top(), ia.left(), ia.right());
+            mean_stdB = mean_std(window_b, ia.bottom(), ia.top(), ia.left(), ia.right());
+
+            placeIntoPadded(window_a, view_a, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPadded(window_b, view_b, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
+        else
+        {
+            const std::uint8_t* mask = window_mask.data();
+
+            mean_stdA = mean_std_masked(window_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
+
+            // skip fully masked windows
+            if (mean_stdA[2] == 0.0)
+            {
+                fillCmatrix(cmatrix, NAN, cmatrix_stride, i);
+                return;
+            }
+
+            mean_stdB = mean_std_masked(window_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
+            valid_count = mean_stdA[2];
+
+            placeIntoPaddedMasked(window_a, view_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPaddedMasked(window_b, view_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
+
+        double norm = mean_stdA[1] * mean_stdB[1] * static_cast<double>(paddedWindow.area()) * valid_count;
+
+        // prepare & correlate
+        output = (fft.*correlator)( view_a, view_b );
+
+        // normalize output
+        applyScalarToImage(output, norm, paddedWindow.area());
+
+        placeIntoCmatrix(cmatrix, output, paddedWindow, ia, i); 
+     };
+
+    auto process_chunk = [size, &windows, &processor, &paddedWindow](std::size_t first, std::size_t last)
+    {
+        core::gf_image window_a{ size, size };
+        core::gf_image window_b{ size, size };
+        std::vector<std::uint8_t> window_mask( static_cast<std::size_t>(size) * size, 0 );
+
+        core::gf_image view_a{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image view_b{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image output{ paddedWindow.height(), paddedWindow.width() };
+
+        for ( std::size_t j = first; j < last; ++j )
+            processor(windows[j], window_a, window_b, window_mask, view_a, view_b, output);
+    };
+
+    if (thread_count > 1 && windows.size() > thread_count)
+    {
+        ThreadPool pool( thread_count );
+
+        // ensure we don't miss windows due to rounding
+        std::size_t chunk_size = windows.size() / thread_count;
+        std::vector<size_t> chunk_sizes( thread_count, chunk_size );
+        chunk_sizes.back() = windows.size() - (thread_count-1)*chunk_size;
+
+        std::size_t i = 0;
+        for ( const auto& chunk_size_ : chunk_sizes )
+        {
+            pool.enqueue(
+                [i, chunk_size_, &process_chunk]() {
+                    process_chunk(i, i + chunk_size_);
+                } );
+            i += chunk_size_;
+        }
+    }
+    else
+        process_chunk(0, windows.size());
+}
+
+
+// Normalozed cross-correlation
+std::vector<double> process_images_standard(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    std::uint32_t size = 32,
+    std::uint32_t overlap_size = 16,
+    int correlation_method = 0,
+    int threads = 0,
+    const std::uint8_t* mask = nullptr
+){
+    // basic setup
+    double overlap = 1.0 - (static_cast<double>(overlap_size) / static_cast<double>(size));
+
+    core::gf_image img_a{ convert_image(np_img_a) };
+    core::gf_image img_b{ convert_image(np_img_b) };
+
+    // create a grid for processing
+    auto ia = core::size{size, size};
+    auto grid = core::generate_cartesian_grid( img_b.size(), ia, overlap );
+
+    // process!
+    std::vector<double> cmatrix(grid.size() * size * size, 0.0);
+
+    correlate_windows(
+        img_a,
+        img_b,
+        grid,
+        {},
+        size,
+        correlation_method,
+        threads,
+        mask,
+        cmatrix
+    );
+
+    return cmatrix;
+}
+
+
+// normalized cross-correlation of windows centered at arbitrary points
+std::vector<double> process_points_standard(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    const double* x,
+    const double* y,
+    std::size_t point_count,
+    std::uint32_t size = 32,
+    int correlation_method = 0,
+    int threads = 0,
+    const std::uint8_t* mask = nullptr
+){
+    core::gf_image img_a{ convert_image(np_img_a) };
+    core::gf_image img_b{ convert_image(np_img_b) };
+
+    auto ia = core::size{size, size};
+
+    // windows that do not fit inside the image are left as NaN
+    std::vector<core::rect> grid;
+    std::vector<std::size_t> index;
+
+    grid.reserve(point_count);
+    index.reserve(point_count);
+
+    double half_size = static_cast<double>(size) / 2.0;
+
+    for (std::size_t i = 0; i < point_count; ++i)
+    {
+        if ( !std::isfinite(x[i]) || !std::isfinite(y[i]) )
+            continue;
+
+        double left = std::floor(x[i] - half_size + 0.5);
+        double bottom = std::floor(y[i] - half_size + 0.5);
+
+        if ( left < 0.0 || bottom < 0.0 ||
+             left + size > static_cast<double>(img_a.width()) ||
+             bottom + size > static_cast<double>(img_a.height()) )
+            continue;
+
+        grid.emplace_back(
+            core::point2<std::int32_t>{
+                static_cast<std::int32_t>(left),
+                static_cast<std::int32_t>(bottom)
+            },
+            ia
+        );
+        index.push_back(i);
+    }
+
+    // process!
+    std::vector<double> cmatrix(point_count * size * size, NAN);
+
+    correlate_windows(
+        img_a,
+        img_b,
+        grid,
+        index,
+        size,
+        correlation_method,
+        threads,
+        mask,
+        cmatrix
+    );
 
     return cmatrix;
 }
@@ -261,14 +517,14 @@ std::vector<double> process_images_auto(
 
 
 // error correlation correction (ecc) cross-correlation
-/*
 std::vector<double> process_images_ecc(
-    core::gf_image& img_a,
-    core::gf_image& img_b,
-    uint32_t size = 32,
-    uint32_t overlap_size = 16,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    std::uint32_t size = 32,
+    std::uint32_t overlap_size = 16,
     int correlation_method = 0,
-    int threads = 0
+    int threads = 0,
+    const std::uint8_t* mask = nullptr
 ){
     // basic setup
     double overlap = 1.0 - (static_cast<double>(overlap_size) / static_cast<double>(size));
@@ -277,14 +533,20 @@ std::vector<double> process_images_ecc(
     if (threads >= 1)
         thread_count = static_cast<uint32_t>(threads);
 
+    core::gf_image img_a{ convert_image(np_img_a) };
+    core::gf_image img_b{ convert_image(np_img_b) };
+
     // create a grid for processing
     auto ia = core::size{size, size};
     auto grid = core::generate_cartesian_grid( img_b.size(), ia, overlap );
 
-    // field shape
-    uint32_t field_shape_x = img_a.width();
-    uint32_t field_shape_y = img_a.height();
-    
+    // field shape (the grid is stored row by row)
+    std::size_t field_cols = 0;
+    while ( field_cols < grid.size() && grid[field_cols].bottom() == grid[0].bottom() )
+        ++field_cols;
+
+    std::size_t field_rows = (field_cols > 0) ? grid.size() / field_cols : 0;
+
     // padding
     auto paddedWindow = core::size{size, size};
     if (correlation_method != 0)
@@ -297,90 +559,153 @@ std::vector<double> process_images_ecc(
     auto fft = algos::FFT( paddedWindow );
     auto correlator = &algos::FFT::cross_correlate_real<core::image, core::g_f>;
 
-    auto process_row = [
-        &cmatrix,
-        &cmatrix_stride,
+    // returns false if the window is fully masked
+    auto correlate = [
         &img_a,
         &img_b,
-        &grid,
         &paddedWindow,
         &fft,
         &correlator,
-        filed_shape_x,
-        filed_shape_y,
-        overlap
-     ]( size_t row )
-    {
-        core::gf_image output_old(paddedWindow.heihgt(), paddedWindow.width());
-        
-        for (size_t i = 0; i < field_shape_x; ++i)
+        mask
+     ]( const core::rect& ia, core::gf_image& view_a, core::gf_image& view_b,
+        core::gf_image& output ) -> bool
+     {
+        std::vector<double> mean_stdA, mean_stdB;
+        double valid_count = static_cast<double>(ia.area());
+
+        if (mask == nullptr)
         {
-            auto ia = grid[row * filed_shape_y + i];
+            mean_stdA = mean_std(img_a, ia.bottom(), ia.top(), ia.left(), ia.right());
+            mean_stdB = mean_std(img_b, ia.bottom(), ia.top(), ia.left(), ia.right());
 
-            auto mean_stdA = mean_std( img_a, ia.bottom(), ia.top(), ia.left(), ia.right() );
-            auto mean_stdB = mean_std( img_b, ia.bottom(), ia.top(), ia.left(), ia.right() );
+            placeIntoPadded(img_a, view_a, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPadded(img_b, view_b, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
+        else
+        {
+            mean_stdA = mean_std_masked(img_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
 
-            double norm = mean_stdA[1] * mean_stdB[1] * paddedWindow.area();
+            if (mean_stdA[2] == 0.0)
+                return false;
+
+            mean_stdB = mean_std_masked(img_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right());
+            valid_count = mean_stdA[2];
+
+            placeIntoPaddedMasked(img_a, view_a, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdA[0]);
+            placeIntoPaddedMasked(img_b, view_b, mask, ia.bottom(), ia.top(), ia.left(), ia.right(), mean_stdB[0]);
+        }
 
-            auto view_a { placeIntoPadded(img_a, paddedWindow, ia, mean_stdA[0]) };
-            auto view_b { placeIntoPadded(img_b, paddedWindow, ia, mean_stdB[0]) };
+        double norm = mean_stdA[1] * mean_stdB[1] * static_cast<double>(paddedWindow.area()) * valid_count;
+
+        // prepare & correlate
+        output = (fft.*correlator)( view_a, view_b );
+
+        // normalize output
+        applyScalarToImage(output, norm, paddedWindow.area());
+
+        // negative correlation carries no displacement information and the product
+        // of two negative values would otherwise create spurious peaks
+        for (std::size_t j = 0; j < paddedWindow.area(); ++j)
+            output[j] = (output[j] > 0.0) ? output[j] : 0.0;
+
+        return true;
+     };
+
+    // multiply each correlation plane with the previous plane of the same row, the
+    // first plane of a row (or the first plane after a masked window) is paired with
+    // the next one and planes without valid neighbours are stored uncorrected
+    auto process_row = [
+        &cmatrix,
+        &cmatrix_stride,
+        &grid,
+        &paddedWindow,
+        &correlate,
+        field_cols
+     ]( std::size_t row, core::gf_image& view_a, core::gf_image& view_b,
+        core::gf_image& output, core::gf_image& output_old, core::gf_image& product )
+     {
+        std::size_t row_start = row * field_cols;
+        bool old_valid = false, old_written = false;
 
-            // prepare & correlate
-            core::gf_image output{ (fft.*correlator)( view_a, view_b ) };
+        for (std::size_t col = 0; col < field_cols; ++col)
+        {
+            const auto& ia = grid[row_start + col];
 
-            if (i == 0)
+            if ( !correlate(ia, view_a, view_b, output) )
             {
-                // normalize output
-                applyScalarToImage(output, norm, paddedWindow.area());
+                fillCmatrix(cmatrix, NAN, cmatrix_stride, row_start + col);
 
-                placeIntoCmatrix(cmatrix, output, paddedWindow, ia, i);
+                if (old_valid && !old_written)
+                    placeIntoCmatrix(cmatrix, output_old, paddedWindow, ia, row_start + col - 1);
 
-                output_old.swap(output);
+                old_valid = false;
+                continue;
             }
 
-            else
+            if (old_valid)
             {
-                output = output * output_old;
-                
-                // normalize output
-                applyScalarToImage(output, norm, paddedWindow.area());
+                for (std::size_t j = 0; j < paddedWindow.area(); ++j)
+                    product[j] = output[j] * output_old[j];
+
+                placeIntoCmatrix(cmatrix, product, paddedWindow, ia, row_start + col);
 
-                placeIntoCmatrix(cmatrix, output, paddedWindow, ia, i);
+                if (!old_written)
+                    placeIntoCmatrix(cmatrix, product, paddedWindow, ia, row_start + col - 1);
 
-                output_old.swap(output);
+                old_written = true;
             }
-        ]
+            else
+                old_written = false;
+
+            std::swap(output, output_old);
+            old_valid = true;
+        }
+
+        if (old_valid && !old_written)
+            placeIntoCmatrix(cmatrix, output_old, paddedWindow, grid[row_start], row_start + field_cols - 1);
      };
 
-    if (thread_count > 1)
+    if (thread_count > 1 && field_rows > 1)
     {
         ThreadPool pool( thread_count );
 
-        // - split the grid into thread_count chunks
+        // - split the rows into thread_count chunks
         // - wrap each chunk into a processing for loop and push to thread
+        thread_count = std::min<std::size_t>(thread_count, field_rows);
 
-        // ensure we don't miss grid locations due to rounding
-        size_t chunk_size = grid.size()/thread_count;
+        // ensure we don't miss rows due to rounding
+        std::size_t chunk_size = field_rows / thread_count;
         std::vector<size_t> chunk_sizes( thread_count, chunk_size );
-        chunk_sizes.back() = grid.size() - (thread_count-1)*chunk_size;
+        chunk_sizes.back() = field_rows - (thread_count-1)*chunk_size;
 
-        size_t i = 0;
+        std::size_t i = 0;
         for ( const auto& chunk_size_ : chunk_sizes )
         {
             pool.enqueue(
-                [i, chunk_size_, &grid, &processor]() {
-                    for ( size_t j=i; j<i + chunk_size_; ++j )
-                        processor(j, grid[j]);
+                [i, chunk_size_, &process_row, &paddedWindow]() {
+                    core::gf_image view_a{ paddedWindow.height(), paddedWindow.width() };
+                    core::gf_image view_b{ paddedWindow.height(), paddedWindow.width() };
+                    core::gf_image output{ paddedWindow.height(), paddedWindow.width() };
+                    core::gf_image output_old{ paddedWindow.height(), paddedWindow.width() };
+                    core::gf_image product{ paddedWindow.height(), paddedWindow.width() };
+
+                    for ( std::size_t j=i; j<i + chunk_size_; ++j )
+                        process_row(j, view_a, view_b, output, output_old, product);
                 } );
             i += chunk_size_;
         }
     }
     else
     {
-        for (size_t i = 0; i < grid.size(); ++i)
-            processor(i, grid[i]);
+        core::gf_image view_a{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image view_b{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image output{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image output_old{ paddedWindow.height(), paddedWindow.width() };
+        core::gf_image product{ paddedWindow.height(), paddedWindow.width() };
+
+        for (std::size_t row = 0; row < field_rows; ++row)
+            process_row(row, view_a, view_b, output, output_old, product);
     }
 
     return cmatrix;
 }
-*/
\ No newline at end of file
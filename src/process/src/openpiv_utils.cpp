@@ -1,5 +1,9 @@
 #include "openpiv_utils.h"
 
+// std
+#include <algorithm>
+#include <cmath>
+
 using namespace openpiv;
 
 
@@ -65,7 +69,7 @@ double meanI(
     std::size_t x1,
     std::size_t x2
 ){
-    double sum, std_ = 0.0;
+    double sum = 0.0;
     
     std::size_t deltaY = (y2 - y1), deltaX = (x2 - x1);
     std::size_t N_M = deltaY * deltaX;
@@ -89,8 +93,8 @@ std::vector<double> mean_std(
     std::size_t x1,
     std::size_t x2
 ){
-    double img_sum, img_std_temp = 0.0;
-    double img_mean, img_std = 0.0;
+    double img_sum = 0.0, img_std_temp = 0.0;
+    double img_mean = 0.0, img_std = 0.0;
     
     std::size_t deltaY = (y2 - y1), deltaX = (x2 - x1);
     std::size_t N_M = deltaY * deltaX;
@@ -115,6 +119,86 @@ std::vector<double> mean_std(
     return stat_out;
 }
 
+
+
+std::vector<double> mean_std_masked(
+    const core::gf_image& img,
+    const std::uint8_t* mask,
+    std::size_t y1,
+    std::size_t y2,
+    std::size_t x1,
+    std::size_t x2
+){
+    double img_sum = 0.0, img_std_temp = 0.0;
+    double img_mean = 0.0, img_std = 0.0;
+    std::size_t N_M = 0;
+
+    std::size_t img_stride = img.width();
+
+    for (std::size_t row{y1}; row < y2; ++row)
+    {
+        for (std::size_t col{x1}; col < x2; ++col)
+        {
+            if ( mask[row * img_stride + col] != 0 )
+                continue;
+
+            img_sum += img[row * img_stride + col];
+            img_std_temp += img[row * img_stride + col]*img[row * img_stride + col];
+            ++N_M;
+        }
+    }
+
+    if (N_M > 0)
+    {
+        img_mean = img_sum / static_cast<double>(N_M);
+        img_std = std::sqrt( (img_std_temp / static_cast<double>(N_M)) + (img_mean*img_mean) - (2*img_mean*img_mean) );
+    }
+
+    std::vector<double> stat_out(3);
+    stat_out[0] = img_mean; 
+    stat_out[1] = img_std;
+    stat_out[2] = static_cast<double>(N_M);
+
+    return stat_out;
+}
+
+
+void placeIntoPaddedMasked(
+    const core::gf_image& image,
+    core::gf_image& intWindow,
+    const std::uint8_t* mask,
+    int y1,
+    int y2,
+    int x1,
+    int x2,
+    double meanI = 0.0
+){
+    const std::size_t padY = intWindow.height() / 2 - (y2 - y1) / 2;
+    const std::size_t padX = intWindow.width()  / 2 - (x2 - x1) / 2;
+
+    std::size_t imgY = y1;
+    std::size_t imgX = x1;
+
+    std::size_t maxRow = y2 - y1;
+    std::size_t maxCol = x2 - x1;
+
+    std::size_t image_stride = image.width();
+    std::size_t result_stride = intWindow.width();
+
+    // masked pixels are set to zero (the window mean after subtraction), so they
+    // do not contribute to the correlation
+    for (std::size_t row = 0; row < maxRow; ++row)
+    {
+        for (std::size_t col = 0; col < maxCol; ++col)
+        {
+            std::size_t ind = (imgY + row) * image_stride  + imgX + col;
+
+            intWindow[(padY + row) * result_stride + padX + col] = 
+                (mask[ind] != 0) ? 0.0 : image[ind] - meanI;
+        }
+    }
+}
+
         
 void applyScalarToImage(
     core::gf_image& image,
@@ -155,4 +239,18 @@ void placeIntoCmatrix(
         cmatrix.begin() + ind * (ia.area())
     );
     */
+}
+
+
+void fillCmatrix(
+    std::vector<double>& cmatrix,
+    double value,
+    std::size_t window_stride,
+    std::size_t ind
+){
+    std::fill(
+        cmatrix.begin() + ind * window_stride,
+        cmatrix.begin() + (ind + 1) * window_stride,
+        value
+    );
 }
\ No newline at end of file
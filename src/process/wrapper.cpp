@@ -77,7 +77,8 @@ py::array_t<double> fft_correlate_images_standard_wrapper( // big function name
     int window_size,
     int overlap,
     int correlation_method,
-    int thread_count
+    int thread_count,
+    py::array_t<std::uint8_t, py::array::c_style | py::array::forcecast>& np_mask
 ){
     // check inputs
     if ( np_img_a.ndim() != 2 )
@@ -95,6 +96,17 @@ py::array_t<double> fft_correlate_images_standard_wrapper( // big function name
     if (overlap > window_size)
         throw std::runtime_error("Overlap sizes can not be larger than interrogation window sizes");
 
+    // an empty mask disables masking
+    const std::uint8_t* mask_ptr = nullptr;
+
+    if ( np_mask.size() != 0 )
+    {
+        if ( np_mask.size() != np_img_a.size() )
+            throw std::runtime_error("Mask should have same size as inputs");
+
+        mask_ptr = np_mask.data();
+    }
+
     // cast ints to proper dtype
     std::uint32_t window_size_t = static_cast<std::uint32_t>(window_size);
     std::uint32_t overlap_t = static_cast<std::uint32_t>(overlap);
@@ -105,7 +117,155 @@ py::array_t<double> fft_correlate_images_standard_wrapper( // big function name
             window_size_t,
             overlap_t,
             correlation_method,
-            thread_count
+            thread_count,
+            mask_ptr
+        );
+
+    // return 3-D NumPy array  
+    std::size_t window_num = result.size() / (window_size * window_size);
+    std::size_t stride_3d = window_size * window_size;
+    std::size_t stride_2d = window_size;
+
+    std::size_t              ndim    = 3;
+    std::vector<std::size_t> shape   = { window_num, stride_2d, stride_2d };
+    std::vector<std::size_t> strides = {
+        static_cast<std::size_t>(sizeof(double))*stride_3d, 
+        static_cast<std::size_t>(sizeof(double))*stride_2d,
+        static_cast<std::size_t>(sizeof(double))
+    };
+
+    return py::array(py::buffer_info(
+        result.data(),                           /* data as contiguous array  */
+        sizeof(double),                          /* size of one scalar        */
+        py::format_descriptor<double>::format(), /* data type                 */
+        ndim,                                    /* number of dimensions      */
+        shape,                                   /* shape of the matrix       */
+        strides                                  /* strides for each axis     */
+    ));
+}
+
+
+py::array_t<double> fft_correlate_points_standard_wrapper(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_x,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_y,
+    int window_size,
+    int correlation_method,
+    int thread_count,
+    py::array_t<std::uint8_t, py::array::c_style | py::array::forcecast>& np_mask
+){
+    // check inputs
+    if ( np_img_a.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_img_a.size() != np_img_b.size() )
+        throw std::runtime_error("Inputs should have same sizes");
+
+    if ( np_x.size() != np_y.size() )
+        throw std::runtime_error("Point coordinates should have same sizes");
+
+    if ( window_size < 1 )
+        throw std::runtime_error("Interrogation window sizes can not be smaller than 1");
+
+    // an empty mask disables masking
+    const std::uint8_t* mask_ptr = nullptr;
+
+    if ( np_mask.size() != 0 )
+    {
+        if ( np_mask.size() != np_img_a.size() )
+            throw std::runtime_error("Mask should have same size as inputs");
+
+        mask_ptr = np_mask.data();
+    }
+
+    // cast ints to proper dtype
+    std::uint32_t window_size_t = static_cast<std::uint32_t>(window_size);
+    std::size_t point_count = static_cast<std::size_t>(np_x.size());
+
+    std::vector<double> result = process_points_standard(
+            np_img_a,
+            np_img_b,
+            np_x.data(),
+            np_y.data(),
+            point_count,
+            window_size_t,
+            correlation_method,
+            thread_count,
+            mask_ptr
+        );
+
+    // return 3-D NumPy array  
+    std::size_t stride_3d = window_size * window_size;
+    std::size_t stride_2d = window_size;
+
+    std::size_t              ndim    = 3;
+    std::vector<std::size_t> shape   = { point_count, stride_2d, stride_2d };
+    std::vector<std::size_t> strides = {
+        static_cast<std::size_t>(sizeof(double))*stride_3d, 
+        static_cast<std::size_t>(sizeof(double))*stride_2d,
+        static_cast<std::size_t>(sizeof(double))
+    };
+
+    return py::array(py::buffer_info(
+        result.data(),                           /* data as contiguous array  */
+        sizeof(double),                          /* size of one scalar        */
+        py::format_descriptor<double>::format(), /* data type                 */
+        ndim,                                    /* number of dimensions      */
+        shape,                                   /* shape of the matrix       */
+        strides                                  /* strides for each axis     */
+    ));
+}
+
+
+py::array_t<double> fft_correlate_images_ecc_wrapper(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    int window_size,
+    int overlap,
+    int correlation_method,
+    int thread_count,
+    py::array_t<std::uint8_t, py::array::c_style | py::array::forcecast>& np_mask
+){
+    // check inputs
+    if ( np_img_a.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_img_a.size() != np_img_b.size() )
+        throw std::runtime_error("Inputs should have same sizes");
+
+    if ( window_size < 1 )
+        throw std::runtime_error("Interrogation window sizes can not be smaller than 1");
+    
+    if ( overlap < 1 )
+        throw std::runtime_error("Overlap can not be smaller than 1");
+        
+    if (overlap > window_size)
+        throw std::runtime_error("Overlap sizes can not be larger than interrogation window sizes");
+
+    // an empty mask disables masking
+    const std::uint8_t* mask_ptr = nullptr;
+
+    if ( np_mask.size() != 0 )
+    {
+        if ( np_mask.size() != np_img_a.size() )
+            throw std::runtime_error("Mask should have same size as inputs");
+
+        mask_ptr = np_mask.data();
+    }
+
+    // cast ints to proper dtype
+    std::uint32_t window_size_t = static_cast<std::uint32_t>(window_size);
+    std::uint32_t overlap_t = static_cast<std::uint32_t>(overlap);
+
+    std::vector<double> result = process_images_ecc(
+            np_img_a,
+            np_img_b,
+            window_size_t,
+            overlap_t,
+            correlation_method,
+            thread_count,
+            mask_ptr
         );
 
     // return 3-D NumPy array  
@@ -192,5 +352,7 @@ PYBIND11_MODULE(_process_cpp, m)
     m.doc() = "pybind11 wrapper of main openpivcore functions";
     m.def("_img2corr_iw", &fft_correlate_window_wrapper, "Correlate two interrogation windows for testing");
     m.def("_img2corr_standard", &fft_correlate_images_standard_wrapper, "Correlate two images");
+    m.def("_pts2corr_standard", &fft_correlate_points_standard_wrapper, "Correlate two images at arbitrary points");
+    m.def("_img2corr_ecc", &fft_correlate_images_ecc_wrapper, "Correlate two images with error correlation-based correction");
     m.def("_corr2vec", &find_subpixel_wrapper, "Extract displacement and peak information from correlation matrixes");
 }
\ No newline at end of file
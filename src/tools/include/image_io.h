@@ -0,0 +1,49 @@
+#ifndef IMAGE_IO_H
+#define IMAGE_IO_H
+
+#include <cstdint>
+#include <string>
+#include <vector>
+
+
+// sample types of uncompressed image files
+enum sample_type
+{
+    sample_uint8 = 0,
+    sample_uint16 = 1,
+    sample_int16 = 2,
+    sample_uint32 = 3,
+    sample_int32 = 4,
+    sample_float32 = 5,
+    sample_float64 = 6
+};
+
+
+// layout of the pages of an uncompressed image file
+struct page_layout
+{
+    std::vector<std::uint64_t> offsets; // byte offset of the first stored row of every page
+    std::uint32_t height = 0;
+    std::uint32_t width = 0;
+    std::uint64_t row_stride = 0;       // bytes between stored rows, including padding
+    bool bottom_up = false;             // rows are stored last row first (BMP)
+    int type = sample_uint16;
+    bool swap_bytes = false;            // samples are stored in non-native byte order
+};
+
+
+std::size_t sample_size(
+    int type
+);
+
+
+// read the pages of a file into out, a (pages, height, width) buffer
+template <typename T>
+void decode_pages(
+    const std::string& filename,
+    const page_layout& layout,
+    T* out,
+    int threads
+);
+
+#endif
@@ -0,0 +1,218 @@
+#include "image_io.h"
+
+// std
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <exception>
+#include <fstream>
+#include <limits>
+#include <stdexcept>
+#include <thread>
+#include <type_traits>
+
+
+std::size_t sample_size(
+    int type
+){
+    switch (type)
+    {
+        case sample_uint8: return 1;
+        case sample_uint16: return 2;
+        case sample_int16: return 2;
+        case sample_uint32: return 4;
+        case sample_int32: return 4;
+        case sample_float32: return 4;
+        case sample_float64: return 8;
+        default: throw std::runtime_error("Unsupported sample type");
+    }
+}
+
+
+// convert a sample, clipping to the range of integer outputs
+template <typename T, typename S>
+inline T convert_sample(
+    S value
+){
+    if constexpr ( std::is_floating_point_v<T> )
+        return static_cast<T>(value);
+    else if constexpr ( std::is_unsigned_v<S> && sizeof(S) < sizeof(T) )
+        return static_cast<T>(value);
+    else
+    {
+        // NaN is mapped to 0
+        if ( !(value > 0) )
+            return 0;
+
+        if ( static_cast<double>(value) >= std::numeric_limits<T>::max() )
+            return std::numeric_limits<T>::max();
+
+        if constexpr ( std::is_floating_point_v<S> )
+            return static_cast<T>(std::lround(value));
+        else
+            return static_cast<T>(value);
+    }
+}
+
+
+template <typename T, typename S>
+void convert_row(
+    unsigned char* row,
+    T* out,
+    std::uint32_t width,
+    bool swap_bytes
+){
+    if ( swap_bytes )
+        for (std::uint32_t j = 0; j < width; ++j)
+            std::reverse(row + j * sizeof(S), row + (j + 1) * sizeof(S));
+
+    if constexpr ( std::is_same_v<S, T> )
+        std::memcpy(out, row, width * sizeof(T));
+    else
+    {
+        S value;
+
+        for (std::uint32_t j = 0; j < width; ++j)
+        {
+            std::memcpy(&value, row + j * sizeof(S), sizeof(S));
+            out[j] = convert_sample<T>(value);
+        }
+    }
+}
+
+
+template <typename T>
+void convert_rows(
+    unsigned char* block,
+    T* out,
+    std::uint32_t n_rows,
+    const page_layout& layout
+){
+    for (std::uint32_t i = 0; i < n_rows; ++i)
+    {
+        // stored rows of bottom-up files are reversed
+        unsigned char* row = block + layout.row_stride * (layout.bottom_up ? n_rows - 1 - i : i);
+        T* out_row = out + static_cast<std::size_t>(i) * layout.width;
+
+        switch (layout.type)
+        {
+            case sample_uint8: convert_row<T, std::uint8_t>(row, out_row, layout.width, false); break;
+            case sample_uint16: convert_row<T, std::uint16_t>(row, out_row, layout.width, layout.swap_bytes); break;
+            case sample_int16: convert_row<T, std::int16_t>(row, out_row, layout.width, layout.swap_bytes); break;
+            case sample_uint32: convert_row<T, std::uint32_t>(row, out_row, layout.width, layout.swap_bytes); break;
+            case sample_int32: convert_row<T, std::int32_t>(row, out_row, layout.width, layout.swap_bytes); break;
+            case sample_float32: convert_row<T, float>(row, out_row, layout.width, layout.swap_bytes); break;
+            case sample_float64: convert_row<T, double>(row, out_row, layout.width, layout.swap_bytes); break;
+            default: throw std::runtime_error("Unsupported sample type");
+        }
+    }
+}
+
+
+// read the rows [first, last) of the concatenated pages
+template <typename T>
+void decode_rows(
+    const std::string& filename,
+    const page_layout& layout,
+    T* out,
+    std::size_t first,
+    std::size_t last
+){
+    std::ifstream file(filename, std::ios::binary);
+
+    if ( !file )
+        throw std::runtime_error("Could not open " + filename);
+
+    std::vector<unsigned char> block;
+
+    std::size_t row = first;
+
+    while ( row < last )
+    {
+        std::size_t page = row / layout.height;
+        std::uint32_t first_row = static_cast<std::uint32_t>(row % layout.height);
+        std::uint32_t n_rows = static_cast<std::uint32_t>(
+            std::min<std::size_t>(last - row, layout.height - first_row)
+        );
+
+        // the rows of a page are stored contiguously, so they are read at once
+        std::uint64_t stored_row = layout.bottom_up ?
+            layout.height - first_row - n_rows : first_row;
+
+        block.resize(layout.row_stride * n_rows);
+
+        file.seekg(static_cast<std::streamoff>(layout.offsets[page] + stored_row * layout.row_stride));
+        file.read(reinterpret_cast<char*>(block.data()), static_cast<std::streamsize>(block.size()));
+
+        if ( static_cast<std::size_t>(file.gcount()) != block.size() )
+            throw std::runtime_error("Unexpected end of file " + filename);
+
+        convert_rows(block.data(), out + row * layout.width, n_rows, layout);
+
+        row += n_rows;
+    }
+}
+
+
+template <typename T>
+void decode_pages(
+    const std::string& filename,
+    const page_layout& layout,
+    T* out,
+    int threads
+){
+    std::uint32_t thread_count = std::thread::hardware_concurrency()-1;
+
+    if (threads >= 1)
+        thread_count = static_cast<std::uint32_t>(threads);
+
+    if ( layout.row_stride < layout.width * sample_size(layout.type) )
+        throw std::runtime_error("Row stride is smaller than the rows");
+
+    // rows of all pages are split evenly, so single large pages are read in parallel too
+    std::size_t n_rows = layout.offsets.size() * layout.height;
+
+    if ( thread_count > n_rows )
+        thread_count = static_cast<std::uint32_t>(std::max<std::size_t>(n_rows, 1));
+
+    if ( thread_count > 1 )
+    {
+        std::size_t chunk_size = n_rows / thread_count;
+        std::vector<std::size_t> chunk_sizes( thread_count, chunk_size );
+        chunk_sizes.back() = n_rows - (thread_count-1)*chunk_size;
+
+        // every thread reads with its own file handle, errors are raised after joining
+        std::vector<std::thread> workers;
+        std::vector<std::exception_ptr> errors( thread_count );
+
+        std::size_t row = 0;
+        for (std::size_t k = 0; k < chunk_sizes.size(); ++k)
+        {
+            workers.emplace_back(
+                [&filename, &layout, out, row, k, &chunk_sizes, &errors]() {
+                    try
+                    {
+                        decode_rows(filename, layout, out, row, row + chunk_sizes[k]);
+                    }
+                    catch (...)
+                    {
+                        errors[k] = std::current_exception();
+                    }
+                } );
+            row += chunk_sizes[k];
+        }
+
+        for (auto& worker : workers)
+            worker.join();
+
+        for (auto& error : errors)
+            if ( error )
+                std::rethrow_exception(error);
+    }
+    else
+        decode_rows(filename, layout, out, 0, n_rows);
+}
+
+
+template void decode_pages<std::uint16_t>(const std::string&, const page_layout&, std::uint16_t*, int);
+template void decode_pages<float>(const std::string&, const page_layout&, float*, int);
@@ -0,0 +1,87 @@
+// std
+#include <cinttypes>
+#include <string>
+#include <vector>
+
+// pybind11
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+
+// tools
+#include "image_io.h"
+
+namespace py = pybind11;
+
+// ----------------
+// Python interface
+// ----------------
+
+#pragma warning(disable: 4244)
+
+
+template <typename T>
+void decode_pages_wrapper(
+    const std::string& filename,
+    std::vector<std::uint64_t> offsets,
+    std::uint32_t height,
+    std::uint32_t width,
+    std::uint64_t row_stride,
+    bool bottom_up,
+    int type,
+    bool swap_bytes,
+    py::array_t<T, py::array::c_style>& out,
+    int thread_count
+){
+    // check inputs
+    if ( out.ndim() != 3 )
+        throw std::runtime_error("Output should be 3-D NumPy array");
+
+    if ( !out.writeable() )
+        throw std::runtime_error("Output should be writeable");
+
+    if ( static_cast<std::size_t>(out.shape(0)) != offsets.size() ||
+         static_cast<std::uint32_t>(out.shape(1)) != height ||
+         static_cast<std::uint32_t>(out.shape(2)) != width )
+        throw std::runtime_error("Output should have shape (pages, height, width)");
+
+    page_layout layout;
+
+    layout.offsets = std::move(offsets);
+    layout.height = height;
+    layout.width = width;
+    layout.row_stride = row_stride;
+    layout.bottom_up = bottom_up;
+    layout.type = type;
+    layout.swap_bytes = swap_bytes;
+
+    T* ptr_out = out.mutable_data();
+
+    {
+        py::gil_scoped_release release;
+
+        decode_pages<T>(filename, layout, ptr_out, thread_count);
+    }
+}
+
+#pragma warning(default: 4244)
+
+// wrap as Python module
+PYBIND11_MODULE(_tools_cpp, m)
+{
+    m.doc() = "pybind11 wrapper of native image decoding functions";
+
+    m.def("_decode_pages_uint16", &decode_pages_wrapper<std::uint16_t>,
+        "Decode the pages of an uncompressed image file into an uint16 array",
+        py::arg("filename"), py::arg("offsets"), py::arg("height"), py::arg("width"),
+        py::arg("row_stride"), py::arg("bottom_up"), py::arg("type"), py::arg("swap_bytes"),
+        py::arg("out").noconvert(), py::arg("thread_count")
+    );
+
+    m.def("_decode_pages_float32", &decode_pages_wrapper<float>,
+        "Decode the pages of an uncompressed image file into a float32 array",
+        py::arg("filename"), py::arg("offsets"), py::arg("height"), py::arg("width"),
+        py::arg("row_stride"), py::arg("bottom_up"), py::arg("type"), py::arg("swap_bytes"),
+        py::arg("out").noconvert(), py::arg("thread_count")
+    );
+}
@@ -0,0 +1,136 @@
+#ifndef WINDEF_MULTIPASS_H
+#define WINDEF_MULTIPASS_H
+
+// std
+#include <cinttypes>
+#include <vector>
+
+// openpiv
+#include "core/image.h"
+#include "core/rect.h"
+
+using namespace openpiv;
+
+
+// vector field of a single pass
+struct multipass_field
+{
+    std::uint32_t rows = 0;
+    std::uint32_t cols = 0;
+    std::vector<double> x; // window centers (columns)
+    std::vector<double> y; // window centers (rows)
+    std::vector<double> u;
+    std::vector<double> v;
+    std::vector<double> s2n;
+    std::vector<int> mask; // 0 = valid, 1 = invalid
+};
+
+
+void build_grid(
+    std::uint32_t,
+    std::uint32_t,
+    std::uint32_t,
+    std::uint32_t,
+    std::vector<core::rect>&,
+    multipass_field&
+);
+
+
+void validate_field(
+    multipass_field&,
+    double,
+    std::uint32_t,
+    double,
+    std::vector<double>&,
+    std::vector<double>&,
+    std::vector<int>&
+);
+
+
+void replace_invalid(
+    multipass_field&,
+    std::uint32_t
+);
+
+
+void interpolate_field(
+    const multipass_field&,
+    const std::vector<double>&,
+    const std::vector<double>&,
+    std::vector<double>&,
+    std::vector<double>&
+);
+
+
+void interpolate_point(
+    const multipass_field&,
+    double,
+    double,
+    double&,
+    double&
+);
+
+
+double sample_point(
+    const double*,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double,
+    int,
+    int
+);
+
+
+void deform_frame(
+    const double*,
+    double*,
+    std::uint32_t,
+    std::uint32_t,
+    const multipass_field&,
+    double,
+    int,
+    int,
+    int
+);
+
+
+void deform_frames_symmetric(
+    const double*,
+    const double*,
+    double*,
+    double*,
+    std::uint32_t,
+    std::uint32_t,
+    const multipass_field&,
+    int,
+    int,
+    int
+);
+
+
+void multipass_deform(
+    const core::gf_image&,
+    const core::gf_image&,
+    const std::vector<std::uint32_t>&,
+    const std::vector<std::uint32_t>&,
+    int,
+    int,
+    int,
+    int,
+    bool,
+    double,
+    std::uint32_t,
+    double,
+    std::uint32_t,
+    std::uint32_t,
+    double,
+    double,
+    int,
+    const std::uint8_t*,
+    multipass_field&,
+    std::vector<std::uint32_t>&
+);
+
+
+#endif
@@ -0,0 +1,811 @@
+#include "multipass.h"
+
+// std
+#include <algorithm>
+#include <cmath>
+#include <iostream>
+#include <stdexcept>
+#include <thread>
+
+// utils
+#include "threadpool.hpp"
+
+// process
+#include "openpiv_correlation.h"
+#include "cc_subpixel.h"
+
+// interpolation
+#include "taylor_expansion.h"
+#include "whittaker.h"
+
+// validation
+#include "vector_based.h"
+
+using namespace openpiv;
+
+
+// regular grid of interrogation windows, same layout as process.get_rect_coordinates
+void build_grid(
+    std::uint32_t width,
+    std::uint32_t height,
+    std::uint32_t window_size,
+    std::uint32_t overlap,
+    std::vector<core::rect>& grid,
+    multipass_field& field
+){
+    if ( window_size > width || window_size > height )
+        throw std::runtime_error("Interrogation window sizes can not be larger than the images");
+
+    std::uint32_t step = window_size - overlap;
+
+    field.cols = (width - window_size) / step + 1;
+    field.rows = (height - window_size) / step + 1;
+
+    std::size_t n_windows = static_cast<std::size_t>(field.rows) * field.cols;
+
+    field.x.resize(field.cols);
+    field.y.resize(field.rows);
+
+    for (std::uint32_t j = 0; j < field.cols; ++j)
+        field.x[j] = static_cast<double>(j * step) + window_size / 2.0;
+
+    for (std::uint32_t i = 0; i < field.rows; ++i)
+        field.y[i] = static_cast<double>(i * step) + window_size / 2.0;
+
+    grid.clear();
+    grid.reserve(n_windows);
+
+    for (std::uint32_t i = 0; i < field.rows; ++i)
+        for (std::uint32_t j = 0; j < field.cols; ++j)
+            grid.emplace_back(
+                core::point2<std::int32_t>{
+                    static_cast<std::int32_t>(j * step),
+                    static_cast<std::int32_t>(i * step)
+                },
+                core::size{window_size, window_size}
+            );
+
+    field.u.resize(n_windows);
+    field.v.resize(n_windows);
+    field.s2n.resize(n_windows);
+    field.mask.resize(n_windows);
+}
+
+
+// normalized median test, non-finite vectors are also flagged as invalid
+void validate_field(
+    multipass_field& field,
+    double threshold,
+    std::uint32_t kernel_radius,
+    double eps,
+    std::vector<double>& buffer_u,
+    std::vector<double>& buffer_v,
+    std::vector<int>& buffer_mask
+){
+    std::uint32_t N = field.rows + 2 * kernel_radius;
+    std::uint32_t M = field.cols + 2 * kernel_radius;
+
+    // pad by the kernel radius with NaNs
+    buffer_u.assign(static_cast<std::size_t>(N) * M, NAN);
+    buffer_v.assign(static_cast<std::size_t>(N) * M, NAN);
+    buffer_mask.assign(static_cast<std::size_t>(N) * M, 0);
+
+    for (std::uint32_t i = 0; i < field.rows; ++i)
+    {
+        std::copy(
+            field.u.begin() + i * field.cols,
+            field.u.begin() + (i + 1) * field.cols,
+            buffer_u.begin() + (i + kernel_radius) * M + kernel_radius
+        );
+
+        std::copy(
+            field.v.begin() + i * field.cols,
+            field.v.begin() + (i + 1) * field.cols,
+            buffer_v.begin() + (i + kernel_radius) * M + kernel_radius
+        );
+    }
+
+    normalized_local_median_test(
+        buffer_u.data(),
+        buffer_v.data(),
+        buffer_mask.data(),
+        threshold,
+        threshold,
+        N, M,
+        kernel_radius,
+        eps,
+        1
+    );
+
+    for (std::uint32_t i = 0; i < field.rows; ++i)
+    {
+        for (std::uint32_t j = 0; j < field.cols; ++j)
+        {
+            std::size_t ind = i * field.cols + j;
+
+            field.mask[ind] = buffer_mask[(i + kernel_radius) * M + j + kernel_radius];
+
+            if ( !std::isfinite(field.u[ind]) || !std::isfinite(field.v[ind]) )
+                field.mask[ind] = 1;
+        }
+    }
+}
+
+
+// iteratively replace invalid vectors by the mean of their valid neighbours
+void replace_invalid(
+    multipass_field& field,
+    std::uint32_t max_iter
+){
+    std::vector<int> invalid(field.mask);
+    std::vector<std::size_t> filled;
+    std::vector<double> filled_u, filled_v;
+
+    int rows = static_cast<int>(field.rows);
+    int cols = static_cast<int>(field.cols);
+
+    for (std::uint32_t iter = 0; iter < max_iter; ++iter)
+    {
+        bool remaining = false;
+
+        filled.clear();
+        filled_u.clear();
+        filled_v.clear();
+
+        for (int i = 0; i < rows; ++i)
+        {
+            for (int j = 0; j < cols; ++j)
+            {
+                std::size_t ind = i * cols + j;
+
+                if ( invalid[ind] == 0 )
+                    continue;
+
+                double sum_u = 0.0, sum_v = 0.0;
+                std::size_t count = 0;
+
+                for (int ii = std::max(i - 1, 0); ii <= std::min(i + 1, rows - 1); ++ii)
+                {
+                    for (int jj = std::max(j - 1, 0); jj <= std::min(j + 1, cols - 1); ++jj)
+                    {
+                        std::size_t kernel_ind = ii * cols + jj;
+
+                        if ( invalid[kernel_ind] != 0 )
+                            continue;
+
+                        sum_u += field.u[kernel_ind];
+                        sum_v += field.v[kernel_ind];
+                        ++count;
+                    }
+                }
+
+                if ( count == 0 )
+                {
+                    remaining = true;
+                    continue;
+                }
+
+                filled.push_back(ind);
+                filled_u.push_back(sum_u / static_cast<double>(count));
+                filled_v.push_back(sum_v / static_cast<double>(count));
+            }
+        }
+
+        for (std::size_t k = 0; k < filled.size(); ++k)
+        {
+            field.u[filled[k]] = filled_u[k];
+            field.v[filled[k]] = filled_v[k];
+            invalid[filled[k]] = 0;
+        }
+
+        if ( !remaining || filled.empty() )
+            break;
+    }
+
+    // vectors without any valid neighbours left
+    for (std::size_t ind = 0; ind < invalid.size(); ++ind)
+    {
+        if ( invalid[ind] != 0 )
+        {
+            field.u[ind] = 0.0;
+            field.v[ind] = 0.0;
+        }
+    }
+}
+
+
+// bilinear interpolation of a vector field, clamped to the extents of the field
+void interpolate_field(
+    const multipass_field& field,
+    const std::vector<double>& xi,
+    const std::vector<double>& yi,
+    std::vector<double>& u_out,
+    std::vector<double>& v_out
+){
+    if ( field.rows < 2 || field.cols < 2 )
+        throw std::runtime_error("Vector fields need at least 2 rows and columns for interpolation");
+
+    u_out.resize(xi.size() * yi.size());
+    v_out.resize(xi.size() * yi.size());
+
+    // grid centers may be fractional (odd window sizes), so they are kept as double
+    for (std::size_t i = 0; i < yi.size(); ++i)
+        for (std::size_t j = 0; j < xi.size(); ++j)
+            interpolate_point(
+                field, xi[j], yi[i],
+                u_out[i * xi.size() + j],
+                v_out[i * xi.size() + j]
+            );
+}
+
+
+// bilinear interpolation of a vector field at a single point, clamped to the extents of the field
+void interpolate_point(
+    const multipass_field& field,
+    double x,
+    double y,
+    double& u,
+    double& v
+){
+    double x0 = field.x.front();
+    double y0 = field.y.front();
+    double step_x = field.x[1] - field.x[0];
+    double step_y = field.y[1] - field.y[0];
+
+    x = std::clamp(x, x0, field.x.back());
+    y = std::clamp(y, y0, field.y.back());
+
+    std::uint32_t j = std::min(static_cast<std::uint32_t>((x - x0) / step_x), field.cols - 2);
+    std::uint32_t i = std::min(static_cast<std::uint32_t>((y - y0) / step_y), field.rows - 2);
+
+    double tx = (x - field.x[j]) / step_x;
+    double ty = (y - field.y[i]) / step_y;
+
+    std::size_t ind = static_cast<std::size_t>(i) * field.cols + j;
+    std::size_t below = ind + field.cols;
+
+    u = (1.0 - ty) * ((1.0 - tx) * field.u[ind]   + tx * field.u[ind + 1]) +
+               ty  * ((1.0 - tx) * field.u[below] + tx * field.u[below + 1]);
+
+    v = (1.0 - ty) * ((1.0 - tx) * field.v[ind]   + tx * field.v[ind + 1]) +
+               ty  * ((1.0 - tx) * field.v[below] + tx * field.v[below + 1]);
+}
+
+
+// sample an image at a single (row, column) coordinate
+double sample_point(
+    const double* img,
+    std::uint32_t height,
+    std::uint32_t width,
+    double row,
+    double col,
+    int deformation_algorithm,
+    int kernel_param
+){
+    if ( deformation_algorithm == 1 )
+        return whittaker2D_point(img, height, width, row, col, kernel_param);
+    else if ( kernel_param == 1 )
+        return taylor_expansion_k1_point(img, height, width, row, col);
+    else if ( kernel_param == 3 )
+        return taylor_expansion_k3_point(img, height, width, row, col);
+    else if ( kernel_param == 5 )
+        return taylor_expansion_k5_point(img, height, width, row, col);
+    else
+        return taylor_expansion_k7_point(img, height, width, row, col);
+}
+
+
+// split the rows of an image into chunks processed by a thread pool
+template <typename Function>
+void process_rows(
+    std::uint32_t height,
+    int threads,
+    Function process_chunk
+){
+    std::uint32_t thread_count = std::thread::hardware_concurrency()-1;
+    if (threads > 0)
+        thread_count = static_cast<std::uint32_t>(threads);
+
+    if (thread_count > 1 && height > thread_count)
+    {
+        ThreadPool pool( thread_count );
+
+        // ensure we don't miss rows due to rounding
+        std::uint32_t chunk_size = height / thread_count;
+        std::vector<std::uint32_t> chunk_sizes( thread_count, chunk_size );
+        chunk_sizes.back() = height - (thread_count-1)*chunk_size;
+
+        std::uint32_t i = 0;
+        for ( const auto& chunk_size_ : chunk_sizes )
+        {
+            pool.enqueue(
+                [i, chunk_size_, &process_chunk]() {
+                    process_chunk(i, i + chunk_size_);
+                } );
+            i += chunk_size_;
+        }
+    }
+    else
+        process_chunk(0, height);
+}
+
+
+// displacement of a pixel, invalid vectors do not displace the image
+inline void pixel_displacement(
+    const multipass_field& field,
+    double x,
+    double y,
+    double& u,
+    double& v
+){
+    interpolate_point(field, x, y, u, v);
+
+    if ( !std::isfinite(u) ) u = 0.0;
+    if ( !std::isfinite(v) ) v = 0.0;
+}
+
+
+// deform an image by a vector field, interpolating the displacement and sampling
+// the image in one pass per pixel; the pixel (row, col) is mapped onto
+// (row + scale * v, col + scale * u)
+void deform_frame(
+    const double* img,
+    double* out,
+    std::uint32_t height,
+    std::uint32_t width,
+    const multipass_field& field,
+    double scale,
+    int deformation_algorithm,
+    int kernel_param,
+    int threads
+){
+    auto process_chunk = [=, &field](std::uint32_t first, std::uint32_t last)
+    {
+        double u, v;
+
+        for (std::uint32_t i = first; i < last; ++i)
+        {
+            double y = static_cast<double>(i);
+
+            for (std::uint32_t j = 0; j < width; ++j)
+            {
+                double x = static_cast<double>(j);
+
+                pixel_displacement(field, x, y, u, v);
+
+                out[static_cast<std::size_t>(i) * width + j] = sample_point(
+                    img, height, width, y + scale * v, x + scale * u,
+                    deformation_algorithm, kernel_param
+                );
+            }
+        }
+    };
+
+    process_rows(height, threads, process_chunk);
+}
+
+
+// symmetric deformation of an image pair, both frames are sampled from the same
+// interpolated displacement; (row, col) is mapped onto (row -/+ v/2, col -/+ u/2)
+void deform_frames_symmetric(
+    const double* img_a,
+    const double* img_b,
+    double* out_a,
+    double* out_b,
+    std::uint32_t height,
+    std::uint32_t width,
+    const multipass_field& field,
+    int deformation_algorithm,
+    int kernel_param,
+    int threads
+){
+    auto process_chunk = [=, &field](std::uint32_t first, std::uint32_t last)
+    {
+        double u, v;
+
+        for (std::uint32_t i = first; i < last; ++i)
+        {
+            double y = static_cast<double>(i);
+
+            for (std::uint32_t j = 0; j < width; ++j)
+            {
+                double x = static_cast<double>(j);
+                std::size_t ind = static_cast<std::size_t>(i) * width + j;
+
+                pixel_displacement(field, x, y, u, v);
+
+                u /= 2.0;
+                v /= 2.0;
+
+                out_a[ind] = sample_point(
+                    img_a, height, width, y - v, x - u,
+                    deformation_algorithm, kernel_param
+                );
+                out_b[ind] = sample_point(
+                    img_b, height, width, y + v, x + u,
+                    deformation_algorithm, kernel_param
+                );
+            }
+        }
+    };
+
+    process_rows(height, threads, process_chunk);
+}
+
+
+// multipass window deformation PIV
+void multipass_deform(
+    const core::gf_image& img_a,
+    const core::gf_image& img_b,
+    const std::vector<std::uint32_t>& window_sizes,
+    const std::vector<std::uint32_t>& overlaps,
+    int correlation_method,
+    int deformation_algorithm,
+    int deformation_order,
+    int kernel_param,
+    bool per_window,
+    double validation_threshold,
+    std::uint32_t validation_size,
+    double validation_eps,
+    std::uint32_t replace_iterations,
+    std::uint32_t max_iterations,
+    double tolerance,
+    double reuse_tolerance,
+    int threads,
+    const std::uint8_t* mask,
+    multipass_field& result,
+    std::vector<std::uint32_t>& iterations
+){
+    std::uint32_t width = img_a.width();
+    std::uint32_t height = img_a.height();
+
+    // buffers reused across passes
+    multipass_field previous, current;
+    std::vector<core::rect> grid, active_grid;
+    std::vector<double> cmatrix, peaks;
+    std::vector<double> u_pre, v_pre, u_last, v_last;
+    std::vector<double> u_ref, v_ref, peak_u, peak_v, peak_s2n;
+    std::vector<double> buffer_u, buffer_v;
+    std::vector<int> buffer_mask;
+    std::vector<bool> masked_windows;
+    std::vector<double> x_grid, y_grid;
+    std::vector<std::size_t> windows, slots;
+
+    core::gf_image def_a{ width, height };
+    core::gf_image def_b{ width, height };
+
+    iterations.clear();
+
+    // every pass is repeated on the same grid until the correction converges
+    std::size_t pass = 0;
+    std::uint32_t iteration = 0;
+
+    while ( pass < window_sizes.size() )
+    {
+        std::uint32_t window_size = window_sizes[pass];
+        bool predictor = pass > 0 || iteration > 0;
+
+        build_grid(width, height, window_size, overlaps[pass], grid, current);
+
+        std::size_t n_windows = grid.size();
+        std::size_t window_stride = static_cast<std::size_t>(window_size) * window_size;
+
+        const core::gf_image* frame_a = &img_a;
+        const core::gf_image* frame_b = &img_b;
+
+        if ( predictor )
+        {
+            // predictor on the new grid
+            x_grid.assign(current.x.begin(), current.x.end());
+            y_grid.assign(current.y.begin(), current.y.end());
+
+            interpolate_field(previous, x_grid, y_grid, u_pre, v_pre);
+
+            current.u = u_pre;
+            current.v = v_pre;
+        }
+        else
+        {
+            u_pre.assign(n_windows, 0.0);
+            v_pre.assign(n_windows, 0.0);
+        }
+
+        // on an unchanged grid, windows keep the correlation peak measured against
+        // u_last, v_last until the predictor of a grid point their deformation is
+        // interpolated from changed by reuse_tolerance since its last change
+        bool same_grid = iteration > 0 || ( pass > 0 &&
+            window_sizes[pass - 1] == window_size && overlaps[pass - 1] == overlaps[pass] );
+
+        windows.clear();
+
+        if ( same_grid && reuse_tolerance > 0.0 )
+        {
+            std::uint32_t step = window_size - overlaps[pass];
+            std::int64_t reach = (window_size + 2 * step - 1) / (2 * step);
+            std::int64_t rows = current.rows, cols = current.cols;
+
+            std::vector<bool> refresh(n_windows, false);
+
+            for (std::size_t k = 0; k < n_windows; ++k)
+            {
+                if ( std::hypot(u_pre[k] - u_ref[k], v_pre[k] - v_ref[k]) < reuse_tolerance )
+                    continue;
+
+                u_ref[k] = u_pre[k];
+                v_ref[k] = v_pre[k];
+
+                // every window overlapping the grid point is recorrelated
+                std::int64_t row = static_cast<std::int64_t>(k) / cols;
+                std::int64_t col = static_cast<std::int64_t>(k) % cols;
+
+                std::int64_t first_row = std::max<std::int64_t>(row - reach, 0);
+                std::int64_t last_row = std::min<std::int64_t>(row + reach, rows - 1);
+                std::int64_t first_col = std::max<std::int64_t>(col - reach, 0);
+                std::int64_t last_col = std::min<std::int64_t>(col + reach, cols - 1);
+
+                for (std::int64_t i = first_row; i <= last_row; ++i)
+                    for (std::int64_t j = first_col; j <= last_col; ++j)
+                        refresh[i * cols + j] = true;
+            }
+
+            for (std::size_t i = 0; i < n_windows; ++i)
+                if ( refresh[i] )
+                    windows.push_back(i);
+        }
+        else
+        {
+            u_last.assign(n_windows, 0.0);
+            v_last.assign(n_windows, 0.0);
+            u_ref = u_pre;
+            v_ref = v_pre;
+            peak_u.assign(n_windows, 0.0);
+            peak_v.assign(n_windows, 0.0);
+            peak_s2n.assign(n_windows, 0.0);
+            masked_windows.assign(n_windows, false);
+
+            windows.resize(n_windows);
+
+            for (std::size_t i = 0; i < n_windows; ++i)
+                windows[i] = i;
+        }
+
+        // correlation matrixes of the recorrelated windows are stored contiguously
+        slots.resize(windows.size());
+
+        for (std::size_t j = 0; j < windows.size(); ++j)
+        {
+            u_last[windows[j]] = u_pre[windows[j]];
+            v_last[windows[j]] = v_pre[windows[j]];
+            slots[j] = j;
+        }
+
+        cmatrix.assign(windows.size() * window_stride, 0.0);
+
+        if ( predictor && !per_window && !windows.empty() )
+        {
+            // deform the full frames, windows are otherwise deformed while they are correlated
+            if ( deformation_order == 2 )
+            {
+                deform_frames_symmetric(
+                    img_a.data(), img_b.data(),
+                    def_a.data(), def_b.data(),
+                    height, width,
+                    current,
+                    deformation_algorithm, kernel_param,
+                    threads
+                );
+
+                frame_a = &def_a;
+            }
+            else
+                deform_frame(
+                    img_b.data(), def_b.data(),
+                    height, width,
+                    current, 1.0,
+                    deformation_algorithm, kernel_param,
+                    threads
+                );
+
+            frame_b = &def_b;
+        }
+
+        // correlate and find displacements
+        if ( predictor && per_window )
+        {
+            // sample the deformed windows directly from the images
+            auto sampler = [
+                &grid, &windows, &current, &img_a, &img_b, mask,
+                width, height, window_size,
+                deformation_order, deformation_algorithm, kernel_param
+            ]( std::size_t j, core::gf_image& window_a, core::gf_image& window_b,
+               std::vector<std::uint8_t>& window_mask )
+            {
+                const core::rect& ia = grid[windows[j]];
+                double u, v;
+
+                for (std::uint32_t row = 0; row < window_size; ++row)
+                {
+                    std::size_t img_row = static_cast<std::size_t>(ia.bottom()) + row;
+                    double y = static_cast<double>(img_row);
+
+                    for (std::uint32_t col = 0; col < window_size; ++col)
+                    {
+                        std::size_t img_col = static_cast<std::size_t>(ia.left()) + col;
+                        std::size_t ind = row * window_size + col;
+                        double x = static_cast<double>(img_col);
+
+                        interpolate_point(current, x, y, u, v);
+
+                        if ( deformation_order == 2 )
+                        {
+                            window_a[ind] = sample_point(
+                                img_a.data(), height, width, y - v / 2.0, x - u / 2.0,
+                                deformation_algorithm, kernel_param
+                            );
+                            window_b[ind] = sample_point(
+                                img_b.data(), height, width, y + v / 2.0, x + u / 2.0,
+                                deformation_algorithm, kernel_param
+                            );
+                        }
+                        else
+                        {
+                            window_a[ind] = img_a[img_row * width + img_col];
+                            window_b[ind] = sample_point(
+                                img_b.data(), height, width, y + v, x + u,
+                                deformation_algorithm, kernel_param
+                            );
+                        }
+
+                        if ( mask != nullptr )
+                            window_mask[ind] = mask[img_row * width + img_col];
+                    }
+                }
+            };
+
+            correlate_sampled_windows(
+                slots,
+                window_size,
+                correlation_method,
+                threads,
+                mask != nullptr,
+                sampler,
+                cmatrix
+            );
+        }
+        else if ( windows.size() == n_windows )
+            correlate_windows(
+                *frame_a,
+                *frame_b,
+                grid,
+                {},
+                window_size,
+                correlation_method,
+                threads,
+                mask,
+                cmatrix
+            );
+        else
+        {
+            active_grid.clear();
+
+            for (const auto& i : windows)
+                active_grid.push_back(grid[i]);
+
+            correlate_windows(
+                *frame_a,
+                *frame_b,
+                active_grid,
+                {},
+                window_size,
+                correlation_method,
+                threads,
+                mask,
+                cmatrix
+            );
+        }
+
+        // subpixel peaks of the recorrelated windows only, the others are cached
+        std::size_t n_active = windows.size();
+
+        if ( n_active > 0 )
+        {
+            peaks.assign(n_active * 8, 0.0);
+
+            process_cmatrix_2x3(
+                cmatrix.data(),
+                peaks.data(),
+                static_cast<std::uint32_t>(n_active),
+                static_cast<std::uint32_t>(window_stride),
+                {window_size, window_size},
+                0,
+                threads,
+                1
+            );
+        }
+
+        for (std::size_t j = 0; j < n_active; ++j)
+        {
+            std::size_t i = windows[j];
+
+            // fully masked windows have NaN correlation matrixes
+            masked_windows[i] = std::isnan(cmatrix[j * window_stride]);
+
+            peak_u[i] = peaks[j];
+            peak_v[i] = peaks[n_active + j];
+            peak_s2n[i] = peaks[3 * n_active + j];
+        }
+
+        for (std::size_t i = 0; i < n_windows; ++i)
+        {
+            if ( masked_windows[i] )
+            {
+                current.u[i] = NAN;
+                current.v[i] = NAN;
+                current.s2n[i] = NAN;
+                continue;
+            }
+
+            // the peak of a reused window is measured against the predictor it was
+            // correlated with
+            current.u[i] = u_last[i] + peak_u[i];
+            current.v[i] = v_last[i] + peak_v[i];
+            current.s2n[i] = peak_s2n[i];
+        }
+
+        // validate and replace outliers
+        validate_field(
+            current,
+            validation_threshold,
+            validation_size,
+            validation_eps,
+            buffer_u,
+            buffer_v,
+            buffer_mask
+        );
+
+        replace_invalid(current, replace_iterations);
+
+        // root mean square of the correction of unmasked windows, relative to the
+        // predictor their correlation was measured against
+        double rms = 0.0;
+        std::size_t n_valid = 0;
+
+        for (std::size_t i = 0; i < n_windows; ++i)
+        {
+            if ( masked_windows[i] )
+                continue;
+
+            double du = current.u[i] - u_last[i];
+            double dv = current.v[i] - v_last[i];
+
+            rms += du * du + dv * dv;
+            ++n_valid;
+        }
+
+        if ( n_valid > 0 )
+            rms = std::sqrt(rms / static_cast<double>(n_valid));
+
+        std::swap(previous, current);
+
+        ++iteration;
+
+        if ( iteration >= max_iterations || rms < tolerance )
+        {
+            iterations.push_back(iteration);
+            iteration = 0;
+            ++pass;
+        }
+    }
+
+    // masked windows do not carry vectors
+    for (std::size_t i = 0; i < masked_windows.size(); ++i)
+    {
+        if ( masked_windows[i] )
+        {
+            previous.u[i] = NAN;
+            previous.v[i] = NAN;
+        }
+    }
+
+    result = std::move(previous);
+}
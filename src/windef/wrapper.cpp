@@ -0,0 +1,283 @@
+// std
+#include <algorithm>
+#include <cinttypes>
+#include <cmath>
+#include <vector>
+
+// pybind11
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+
+// process
+#include "openpiv_utils.h"
+
+// windef
+#include "multipass.h"
+
+namespace py = pybind11;
+using namespace openpiv;
+
+// ----------------
+// Python interface
+// ----------------
+
+#pragma warning(disable: 4244)
+
+
+py::tuple multipass_deform_wrapper(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    std::vector<int> window_sizes,
+    std::vector<int> overlaps,
+    int correlation_method,
+    int deformation_algorithm,
+    int deformation_order,
+    int kernel_param,
+    bool per_window,
+    double validation_threshold,
+    int validation_size,
+    double validation_eps,
+    int replace_iterations,
+    int max_iterations,
+    double tolerance,
+    double reuse_tolerance,
+    int thread_count,
+    py::array_t<std::uint8_t, py::array::c_style | py::array::forcecast>& np_mask
+){
+    // check inputs
+    if ( np_img_a.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_img_a.size() != np_img_b.size() )
+        throw std::runtime_error("Inputs should have same sizes");
+
+    if ( window_sizes.size() == 0 )
+        throw std::runtime_error("At least one pass is required");
+
+    if ( window_sizes.size() != overlaps.size() )
+        throw std::runtime_error("Window sizes and overlaps should have same sizes");
+
+    for (std::size_t i = 0; i < window_sizes.size(); ++i)
+    {
+        if ( window_sizes[i] < 1 )
+            throw std::runtime_error("Interrogation window sizes can not be smaller than 1");
+
+        if ( overlaps[i] < 0 )
+            throw std::runtime_error("Overlap can not be smaller than 0");
+
+        if ( overlaps[i] >= window_sizes[i] )
+            throw std::runtime_error("Overlap sizes should be smaller than interrogation window sizes");
+    }
+
+    if ( validation_size < 1 )
+        throw std::runtime_error("Validation kernel radius can not be smaller than 1");
+
+    if ( max_iterations < 1 )
+        throw std::runtime_error("Maximum iterations can not be smaller than 1");
+
+    // an empty mask disables masking
+    const std::uint8_t* mask_ptr = nullptr;
+
+    if ( np_mask.size() != 0 )
+    {
+        if ( np_mask.size() != np_img_a.size() )
+            throw std::runtime_error("Mask should have same size as inputs");
+
+        mask_ptr = np_mask.data();
+    }
+
+    // cast ints to proper dtype
+    std::vector<std::uint32_t> window_sizes_t(window_sizes.begin(), window_sizes.end());
+    std::vector<std::uint32_t> overlaps_t(overlaps.begin(), overlaps.end());
+
+    core::gf_image img_a{ convert_image(np_img_a) };
+    core::gf_image img_b{ convert_image(np_img_b) };
+
+    multipass_field field;
+    std::vector<std::uint32_t> iterations;
+
+    {
+        // the images are read ahead on other threads while the pair is evaluated
+        py::gil_scoped_release release;
+
+        multipass_deform(
+            img_a,
+            img_b,
+            window_sizes_t,
+            overlaps_t,
+            correlation_method,
+            deformation_algorithm,
+            deformation_order,
+            kernel_param,
+            per_window,
+            validation_threshold,
+            static_cast<std::uint32_t>(validation_size),
+            validation_eps,
+            static_cast<std::uint32_t>(std::max(replace_iterations, 0)),
+            static_cast<std::uint32_t>(max_iterations),
+            tolerance,
+            reuse_tolerance,
+            thread_count,
+            mask_ptr,
+            field,
+            iterations
+        );
+    }
+
+    std::vector<std::size_t> shape = { field.rows, field.cols };
+
+    py::array_t<double> u( shape ), v( shape ), s2n( shape );
+    py::array_t<int> mask( shape );
+
+    std::copy(field.u.begin(), field.u.end(), u.mutable_data());
+    std::copy(field.v.begin(), field.v.end(), v.mutable_data());
+    std::copy(field.s2n.begin(), field.s2n.end(), s2n.mutable_data());
+    std::copy(field.mask.begin(), field.mask.end(), mask.mutable_data());
+
+    return py::make_tuple(u, v, s2n, mask, iterations);
+}
+
+
+// regular vector field from grid coordinates and displacements
+multipass_field convert_field(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_x,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_y,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_u,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_v
+){
+    if ( np_x.size() < 2 || np_y.size() < 2 )
+        throw std::runtime_error("Vector field should have at least two rows and columns");
+
+    if ( np_u.size() != np_x.size() * np_y.size() || np_v.size() != np_u.size() )
+        throw std::runtime_error("Vector field components should have same sizes as the grid");
+
+    multipass_field field;
+
+    field.cols = static_cast<std::uint32_t>(np_x.size());
+    field.rows = static_cast<std::uint32_t>(np_y.size());
+    field.x.assign(np_x.data(), np_x.data() + np_x.size());
+    field.y.assign(np_y.data(), np_y.data() + np_y.size());
+    field.u.assign(np_u.data(), np_u.data() + np_u.size());
+    field.v.assign(np_v.data(), np_v.data() + np_v.size());
+
+    // the displacement is interpolated on a regular grid
+    auto regular = [](const std::vector<double>& grid)
+    {
+        double step = grid[1] - grid[0];
+
+        for (std::size_t k = 2; k < grid.size(); ++k)
+            if ( std::abs(grid[k] - grid[k - 1] - step) > 1e-9 * std::max(1.0, std::abs(step)) )
+                return false;
+
+        return true;
+    };
+
+    if ( !regular(field.x) || !regular(field.y) )
+        throw std::runtime_error("Grid should be regularly spaced");
+
+    if ( field.x[1] <= field.x[0] || field.y[1] <= field.y[0] )
+        throw std::runtime_error("Grid should be strictly increasing");
+
+    return field;
+}
+
+
+py::array_t<double> deform_frame_wrapper(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_x,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_y,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_u,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_v,
+    double scale,
+    int deformation_algorithm,
+    int kernel_param,
+    int thread_count
+){
+    // check inputs
+    if ( np_img.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    multipass_field field = convert_field(np_x, np_y, np_u, np_v);
+
+    std::uint32_t height = static_cast<std::uint32_t>(np_img.shape(0));
+    std::uint32_t width = static_cast<std::uint32_t>(np_img.shape(1));
+
+    py::array_t<double> out({ np_img.shape(0), np_img.shape(1) });
+
+    {
+        py::gil_scoped_release release;
+
+        deform_frame(
+            np_img.data(),
+            out.mutable_data(),
+            height,
+            width,
+            field,
+            scale,
+            deformation_algorithm,
+            kernel_param,
+            thread_count
+        );
+    }
+
+    return out;
+}
+
+
+py::tuple deform_frames_symmetric_wrapper(
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_a,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_img_b,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_x,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_y,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_u,
+    py::array_t<double, py::array::c_style | py::array::forcecast>& np_v,
+    int deformation_algorithm,
+    int kernel_param,
+    int thread_count
+){
+    // check inputs
+    if ( np_img_a.ndim() != 2 || np_img_b.ndim() != 2 )
+        throw std::runtime_error("Input should be 2-D NumPy array");
+
+    if ( np_img_a.shape(0) != np_img_b.shape(0) || np_img_a.shape(1) != np_img_b.shape(1) )
+        throw std::runtime_error("Inputs should have same sizes");
+
+    multipass_field field = convert_field(np_x, np_y, np_u, np_v);
+
+    std::uint32_t height = static_cast<std::uint32_t>(np_img_a.shape(0));
+    std::uint32_t width = static_cast<std::uint32_t>(np_img_a.shape(1));
+
+    py::array_t<double> out_a({ np_img_a.shape(0), np_img_a.shape(1) });
+    py::array_t<double> out_b({ np_img_a.shape(0), np_img_a.shape(1) });
+
+    {
+        py::gil_scoped_release release;
+
+        deform_frames_symmetric(
+            np_img_a.data(),
+            np_img_b.data(),
+            out_a.mutable_data(),
+            out_b.mutable_data(),
+            height,
+            width,
+            field,
+            deformation_algorithm,
+            kernel_param,
+            thread_count
+        );
+    }
+
+    return py::make_tuple(out_a, out_b);
+}
+
+#pragma warning(default: 4244)
+
+// wrap as Python module
+PYBIND11_MODULE(_windef_cpp, m)
+{
+    m.doc() = "pybind11 wrapper of native window deformation PIV functions";
+    m.def("_multipass_deform", &multipass_deform_wrapper, "Multipass window deformation PIV of two images");
+    m.def("_deform_frame", &deform_frame_wrapper, "Deform an image by an interpolated vector field");
+    m.def("_deform_frames_symmetric", &deform_frames_symmetric_wrapper, "Deform an image pair symmetrically by an interpolated vector field");
+}
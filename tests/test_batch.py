@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from os.path import dirname, join, exists
+from openpiv_cxx import batch
+
+
+image_dir = join(dirname(__file__), "..", "synthetic_tests", "vel_magnitude")
+
+pattern_a = join(image_dir, "vel_4[89]a.bmp")
+pattern_b = join(image_dir, "vel_4[89]b.bmp")
+
+
+def test_find_pairs() -> None:
+    pairs = batch.find_pairs(pattern_a, pattern_b)
+
+    assert len(pairs) == 2
+    assert all(a.endswith("a.bmp") and b.endswith("b.bmp") for a, b in pairs)
+
+    # consecutive frames
+    assert len(batch.find_pairs(pattern_a)) == 1
+
+    with pytest.raises(ValueError):
+        batch.find_pairs(pattern_a, pattern_b.replace("4[89]", "4[789]"))
+
+
+def test_prefetch_pairs() -> None:
+    from openpiv_cxx.tools import imread
+
+    pairs = batch.find_pairs(pattern_a, pattern_b)
+    loaded = []
+
+    def loader(filename):
+        loaded.append(filename)
+        return imread(filename)
+
+    frames = batch.prefetch_pairs(pairs, depth=1, loader=loader)
+
+    for (file_a, file_b), (pf_a, pf_b, frame_a, frame_b) in zip(pairs, frames):
+        assert (pf_a, pf_b) == (file_a, file_b)
+        assert np.array_equal(frame_a, imread(file_a))
+        assert np.array_equal(frame_b, imread(file_b))
+
+    assert len(loaded) == 2 * len(pairs)
+
+    # stopping early does not leave reading threads behind
+    frames = batch.prefetch_pairs(pairs * 10, depth=3, n_threads=2)
+    next(frames)
+    frames.close()
+
+
+def test_run_batch(tmp_path) -> None:
+    pairs = batch.find_pairs(pattern_a, pattern_b)
+
+    outputs = batch.run_batch(pairs, tmp_path, passes=[(32, 16), (16, 8)])
+
+    assert outputs[0].endswith("vel_48a.npz")
+    assert outputs[1].endswith("vel_49a.npz")
+    assert all(exists(output) for output in outputs)
+
+    with np.load(outputs[0]) as result:
+        assert np.mean(np.abs(result["v"] - 1.5)) < 0.1
+
+    # existing results are skipped, the others are computed in worker processes
+    mtime = (tmp_path / "vel_48a.npz").stat().st_mtime_ns
+    (tmp_path / "vel_49a.npz").unlink()
+
+    batch.run_batch(pairs, tmp_path, passes=[(32, 16), (16, 8)], n_workers=2)
+
+    assert (tmp_path / "vel_48a.npz").stat().st_mtime_ns == mtime
+    assert exists(tmp_path / "vel_49a.npz")
+
+
+def test_run_batch_worker_errors(tmp_path) -> None:
+    pairs = batch.find_pairs(pattern_a, pattern_b)
+
+    # errors of worker processes are raised without verbose output
+    (tmp_path / "corrupt_a.bmp").write_bytes(b"not an image")
+    corrupt = [pairs[0], (str(tmp_path / "corrupt_a.bmp"), pairs[0][1])]
+    missing = [pairs[0], (str(tmp_path / "missing_a.bmp"), pairs[0][1])]
+
+    for failing in [corrupt, missing]:
+        with pytest.raises(Exception):
+            batch.run_batch(
+                failing,
+                tmp_path / "results",
+                passes=[(32, 16)],
+                n_workers=2,
+                verbose=False,
+            )
+
+
+def test_run_batch_background(tmp_path) -> None:
+    pairs = batch.find_pairs(pattern_a, pattern_b)
+
+    outputs = batch.run_batch(
+        pairs, tmp_path, passes=[(32, 16), (16, 8)], background="median"
+    )
+
+    with np.load(outputs[0]) as result:
+        assert np.mean(np.abs(result["v"] - 1.5)) < 0.1
+
+
+def test_main(tmp_path) -> None:
+    assert batch.main(
+        [pattern_a, pattern_b, "-o", str(tmp_path), "-p", "32,16", "-q"]
+    ) == 0
+
+    assert exists(tmp_path / "vel_48a.npz")
+    assert exists(tmp_path / "vel_49a.npz")
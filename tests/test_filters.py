@@ -122,3 +122,144 @@ def test_sobel_v_filter():
     
     # use default values
     new_img = filters.sobel_filter(img, orientation = 'v')
+
+
+def test_background_estimator():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(25, 16, 24), dtype="uint8")
+
+    for method, expected in [
+        ("min", frames.min(axis=0)),
+        ("mean", frames.mean(axis=0)),
+        ("median", np.median(frames, axis=0)),
+    ]:
+        estimator = filters.BackgroundEstimator(method)
+
+        # single frames and chunks
+        estimator.update(frames[0])
+        estimator.update(frames[1:10])
+
+        for frame in frames[10:]:
+            estimator.update(frame)
+
+        background = estimator.background
+
+        assert background.dtype == "float32"
+        assert estimator.count == 25
+        assert np.allclose(background, expected, atol=1.0)
+
+    # coarse bins of 16-bit frames
+    frames = frames.astype("uint16") * 200
+
+    background = filters.estimate_background(frames, "median", bins=512)
+
+    assert np.allclose(background, np.median(frames, axis=0), atol=65535 / 511)
+
+    new_img = filters.subtract_background(frames[0], background)
+
+    assert new_img.min() == 0
+    assert np.allclose(new_img, np.maximum(frames[0] - background, 0))
+
+    # test for errors
+    with pytest.raises(ValueError):
+        filters.BackgroundEstimator("max")
+
+    with pytest.raises(ValueError):
+        filters.BackgroundEstimator().update(frames[0]).update(frames[0, :8])
+
+
+def test_separable_kernel():
+    from openpiv_cxx.filters._spatial_filters import _separate_kernel
+    from openpiv_cxx.filters._spatial_filters_cpp import (
+        _lowpass_filter,
+        _highpass_filter
+    )
+
+    img = np.random.default_rng(0).random((48, 40)).astype("float32")
+
+    for sigma in [1.0, 2.5]:
+        kernel = _kernels.gaussian_kernel(sigma=sigma, truncate=2.0)
+        kernel_row, kernel_col = _separate_kernel(kernel)
+        pad = kernel.shape[0] // 2
+
+        assert np.allclose(np.outer(kernel_col, kernel_row), kernel, atol=1e-7)
+
+        # separable passes match the full 2D kernel
+        buffer1 = np.pad(img, pad, mode="reflect")
+        inner = (slice(pad, -pad), slice(pad, -pad))
+
+        expected = _lowpass_filter(buffer1, kernel.astype("float32"))[inner]
+        assert np.allclose(filters.gaussian_filter(img, sigma), expected, atol=1e-5)
+
+        expected = _highpass_filter(buffer1, kernel.astype("float32"), True)[inner]
+        assert np.allclose(filters.highpass_filter(img, sigma), expected, atol=1e-5)
+
+    # non-separable kernels are detected
+    assert _separate_kernel(np.eye(3))[0] is None
+
+
+def test_filters_threaded():
+    img = imread(path_to_img)
+
+    for filter_ in [
+        filters.gaussian_filter,
+        filters.highpass_filter,
+        filters.variance_normalization_filter,
+        filters.sobel_filter,
+        filters.intensity_cap,
+    ]:
+        expected = filter_(img)
+
+        # rows are split across threads, including more threads than rows
+        for thread_count in [3, 0]:
+            assert np.allclose(filter_(img, thread_count=thread_count), expected)
+
+        assert np.allclose(filter_(img[:5, :40], thread_count=8), filter_(img[:5, :40]))
+
+
+def test_intensity_cap_values():
+    img = np.random.default_rng(0).random((32, 48)).astype("float32")
+    img[3, 4] = 100.0
+
+    original = img.copy()
+    upper_limit = img.mean() + 2.0 * img.std()
+
+    new_img = filters.intensity_cap(img, thread_count=2)
+
+    assert np.array_equal(img, original)
+    assert np.allclose(new_img, np.clip(img, 0, upper_limit), atol=1e-5)
+
+    # non-contiguous views are read in their logical order
+    view = img[:, ::2]
+    upper_limit = view.mean() + 2.0 * view.std()
+
+    new_img = filters.intensity_cap(view, thread_count=2)
+
+    assert np.allclose(new_img, np.clip(view, 0, upper_limit), atol=1e-5)
+
+
+def test_variance_normalization_values():
+    img = imread(path_to_img)[:96, :80]
+
+    # the unfused filter chain
+    img_f = img.astype("float32") / img.max()
+    high_pass = filters.highpass_filter(img_f, 1.0, 2.0, False)
+    den = np.sqrt(filters.gaussian_filter(high_pass * high_pass, 2.0, 2.0))
+    expected = np.divide(
+        high_pass, den, out=np.zeros_like(high_pass), where=(den != 0.0)
+    )
+    expected[expected < 0] = 0
+    expected = (expected - expected.min()) / (expected.max() - expected.min())
+    expected *= img.max()
+
+    for thread_count in [1, 3]:
+        new_img = filters.variance_normalization_filter(img, thread_count=thread_count)
+
+        assert new_img.dtype == "float32"
+        assert np.allclose(new_img, expected, atol=1e-3 * img.max())
+
+    # the normalized image is cast, not the denominator
+    new_img = filters.variance_normalization_filter(img, keep_dtype=True)
+
+    assert new_img.dtype == img.dtype
+    assert new_img.max() > 0.9 * img.max()
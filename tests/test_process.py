@@ -95,3 +95,108 @@ def test_correlation_to_displacement() -> None:
 
     assert np.nanmean(np.abs(u - shift_u)) < 0.05
     assert np.nanmean(np.abs(v - shift_v)) < 0.05
+
+
+def test_fft_correlate_images_ecc() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    corr = process.fft_correlate_images(frame_a, frame_b, error_correction=True)
+
+    u, v, _, _ = process.correlation_to_displacement(corr)
+
+    assert np.nanmean(np.abs(u - shift_u)) < 0.05
+    assert np.nanmean(np.abs(v - shift_v)) < 0.05
+
+
+def test_fft_correlate_images_ecc_threads() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    corr1 = process.fft_correlate_images(
+        frame_a, frame_b, error_correction=True, thread_count=1
+    )
+    corr2 = process.fft_correlate_images(
+        frame_a, frame_b, error_correction=True, thread_count=3
+    )
+
+    assert np.allclose(corr1, corr2)
+
+
+def test_fft_correlate_images_masked() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    mask = np.zeros(frame_a.shape, dtype=bool)
+    mask[:, : frame_a.shape[1] // 2] = True  # mask left half of the image
+    mask[:, frame_a.shape[1] // 2 : frame_a.shape[1] // 2 + 8] = True
+
+    field_shape = process.get_field_shape(frame_a.shape, 32, 16)
+
+    corr = process.fft_correlate_images(frame_a, frame_b, mask=mask)
+
+    u, v, _, _ = process.correlation_to_displacement(
+        corr, field_shape[0], field_shape[1]
+    )
+
+    x, y = process.get_coordinates(frame_a.shape, 32, 16)
+
+    fully_masked = x + 16 <= frame_a.shape[1] // 2 + 8
+
+    assert np.all(np.isnan(corr.reshape(-1, 32 * 32)[fully_masked.ravel()]))
+    assert np.all(np.isnan(u[fully_masked]))
+    assert np.nanmean(np.abs(u[~fully_masked] - shift_u)) < 0.05
+    assert np.nanmean(np.abs(v[~fully_masked] - shift_v)) < 0.05
+
+
+def test_fft_correlate_images_masked_wrong_inputs() -> None:
+    frame_a = np.random.rand(64, 64)
+    frame_b = np.random.rand(64, 64)
+
+    with pytest.raises(ValueError):
+        out = process.fft_correlate_images(
+            frame_a, frame_b, mask=np.zeros((32, 64), dtype=bool)
+        )
+
+
+def test_fft_correlate_images_masked_ecc() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    mask = np.zeros(frame_a.shape, dtype=bool)
+    mask[:, :40] = True
+
+    corr = process.fft_correlate_images(
+        frame_a, frame_b, mask=mask, error_correction=True, thread_count=2
+    )
+
+    u, v, _, _ = process.correlation_to_displacement(corr)
+
+    assert np.nanmean(np.abs(u - shift_u)) < 0.05
+    assert np.nanmean(np.abs(v - shift_v)) < 0.05
+
+
+def test_fft_correlate_points() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    x, y = process.get_coordinates(frame_a.shape, 32, 16)
+
+    corr1 = process.fft_correlate_images(frame_a, frame_b)
+    corr2 = process.fft_correlate_points(frame_a, frame_b, x, y, thread_count=2)
+
+    assert corr2.shape == corr1.shape
+    assert np.allclose(corr1, corr2)
+
+
+def test_fft_correlate_points_outside() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    x = np.array([100.0, 5.0, frame_a.shape[1] - 2.0, np.nan])
+    y = np.array([100.0, 100.0, 100.0, 100.0])
+
+    corr = process.fft_correlate_points(frame_a, frame_b, x, y)
+
+    u, v, _, _ = process.correlation_to_displacement(corr)
+
+    assert np.all(np.isnan(corr[1:]))
+    assert np.abs(u[0] - shift_u) < 0.1
+    assert np.abs(v[0] - shift_v) < 0.1
+
+    with pytest.raises(ValueError):
+        out = process.fft_correlate_points(frame_a, frame_b, x, y[:2])
@@ -2,3 +2,272 @@ import numpy as np
 import pytest
 
 from openpiv_cxx import tools
+
+
+def test_load_frames(tmp_path) -> None:
+    from imageio import mimwrite
+
+    frames = (np.arange(3 * 20 * 30).reshape(3, 20, 30) * 7).astype("uint16")
+
+    np.save(tmp_path / "frames.npy", frames)
+    frames.tofile(tmp_path / "frames.raw")
+    mimwrite(tmp_path / "frames.tif", list(frames))
+
+    for stack in [
+        tools.load_frames(tmp_path / "frames.npy"),
+        tools.load_frames(tmp_path / "frames.raw", shape=(20, 30), dtype="uint16"),
+        tools.load_frames(tmp_path / "frames.tif"),
+    ]:
+        assert stack.shape == (3, 20, 30)
+        assert np.array_equal(stack, frames)
+
+    with pytest.raises(ValueError):
+        tools.load_frames(tmp_path / "frames.raw")
+
+    with pytest.raises(ValueError):
+        tools.load_frames(tmp_path / "frames.raw", shape=(7, 11))
+
+
+def test_load_frames_sample_format(tmp_path) -> None:
+    import struct
+
+    frame = np.arange(6, dtype="<u2").reshape(2, 3)
+
+    def write_tiff(filename, sample_format):
+        # a single uncompressed page, its 9 entries are followed by the pixels
+        tags = [
+            (256, 3, 3),
+            (257, 3, 2),
+            (258, 3, 16),
+            (259, 3, 1),
+            (273, 4, 8 + 2 + 12 * 9 + 4),
+            (277, 3, 1),
+            (278, 3, 2),
+            (279, 4, frame.nbytes),
+            (339, 3, sample_format),
+        ]
+
+        with open(filename, "wb") as f:
+            f.write(b"II" + struct.pack("<HI", 42, 8))
+            f.write(struct.pack("<H", len(tags)))
+
+            for tag, field_type, value in tags:
+                code = "H2x" if field_type == 3 else "I"
+                f.write(struct.pack("<HHI" + code, tag, field_type, 1, value))
+
+            f.write(struct.pack("<I", 0))
+            f.write(frame.tobytes())
+
+    write_tiff(tmp_path / "frame.tif", 1)
+
+    assert np.array_equal(tools.load_frames(tmp_path / "frame.tif")[0], frame)
+
+    # void and complex samples
+    for sample_format in [4, 6]:
+        write_tiff(tmp_path / "frame.tif", sample_format)
+
+        with pytest.raises(ValueError):
+            tools.load_frames(tmp_path / "frame.tif")
+
+        with pytest.raises(ValueError):
+            tools.read_frames(tmp_path / "frame.tif")
+
+
+def test_read_frames(tmp_path) -> None:
+    from imageio import imread, imwrite, mimwrite
+
+    frames = (np.arange(3 * 21 * 30).reshape(3, 21, 30) * 7).astype("uint16")
+
+    with open(tmp_path / "frames.raw", "wb") as f:
+        f.write(b"header")
+        frames.astype(">u2").tofile(f)
+
+    mimwrite(tmp_path / "frames.tif", list(frames))
+
+    for thread_count in [1, 4]:
+        for stack in [
+            tools.read_frames(tmp_path / "frames.tif", thread_count=thread_count),
+            tools.read_frames(
+                tmp_path / "frames.raw",
+                shape=(21, 30),
+                raw_dtype=">u2",
+                offset=6,
+                thread_count=thread_count,
+            ),
+        ]:
+            assert stack.dtype == "float32"
+            assert stack.shape == (3, 21, 30)
+            assert np.array_equal(stack, frames)
+
+    out = np.zeros((3, 21, 30), dtype="uint16")
+    stack = tools.read_frames(tmp_path / "frames.tif", dtype="uint16", out=out)
+
+    assert stack is out
+    assert np.array_equal(out, frames)
+
+    # bottom-up 8-bit BMP with padded rows
+    imwrite(tmp_path / "frame.bmp", (frames[0] % 256).astype("uint8"))
+    frame = tools.read_frames(tmp_path / "frame.bmp", dtype="uint16", thread_count=4)
+
+    assert frame.shape == (1, 21, 30)
+    assert np.array_equal(frame[0], imread(tmp_path / "frame.bmp"))
+
+    with pytest.raises(ValueError):
+        tools.read_frames(tmp_path / "frames.tif", dtype="float64")
+
+    with pytest.raises(ValueError):
+        tools.read_frames(tmp_path / "frames.tif", out=np.zeros((3, 21, 30)))
+
+
+def test_open_field_store(tmp_path) -> None:
+    u = np.random.rand(5, 6).astype("float32")
+
+    store = tools.open_field_store(
+        tmp_path / "fields.npy", "w+", n_frames=4, shape=u.shape
+    )
+    store["u"][2] = u
+    store.flush()
+    del store
+
+    store = tools.open_field_store(tmp_path / "fields.npy")
+
+    assert store.shape == (4, 5, 6)
+    assert store.dtype.names == ("x", "y", "u", "v", "s2n", "mask")
+    assert np.array_equal(store["u"][2], u)
+
+    with pytest.raises(ValueError):
+        tools.open_field_store(tmp_path / "other.npy", "w+")
+
+
+def test_save_fields(tmp_path) -> None:
+    filename = tmp_path / "fields.npz"
+    x, y = np.meshgrid(np.arange(6), np.arange(5))
+    u = np.random.rand(5, 6)
+    v = np.ma.masked_array(np.random.rand(5, 6), mask=u > 0.5)
+
+    with tools.FieldWriter(filename, metadata={"window_size": 32}) as writer:
+        writer.append(x=x, y=y, u=u, v=v, metadata={"file": "a.bmp"})
+        writer.append(x=x, y=y, u=2 * u, v=v)
+
+    assert tools.save_fields(filename, append=True, compress=False, u=3 * u) == 2
+
+    with tools.load_fields(filename) as reader:
+        assert len(reader) == 3
+        assert reader.metadata == {"window_size": 32}
+        assert reader.frame_metadata(0) == {"file": "a.bmp"}
+        assert reader.frame_metadata(-1) == {}
+        assert reader.fields(0) == ["x", "y", "u", "v"]
+        assert np.array_equal(reader.read(1, "u"), 2 * u)
+        assert np.array_equal(reader[-1]["u"], 3 * u)
+        assert np.isnan(reader[0]["v"][u > 0.5]).all()
+
+        with pytest.raises(IndexError):
+            reader.read(3, "u")
+
+    # readable with numpy
+    with np.load(filename) as npz:
+        assert np.array_equal(npz["frame_000000/x"], x)
+
+    tools.save(str(tmp_path / "single.npz"), x=x, y=y, u=u)
+
+    with tools.load_fields(tmp_path / "single.npz") as reader:
+        assert len(reader) == 1
+        assert np.array_equal(reader.read(0, "u"), u)
+
+
+def test_field_stack(tmp_path) -> None:
+    u = np.random.rand(7, 5, 6)
+
+    for compress in [True, False]:
+        filename = tmp_path / f"fields_{compress}.npz"
+
+        with tools.FieldWriter(filename, compress=compress) as writer:
+            for frame in u:
+                writer.append(u=frame, v=-frame)
+
+        with tools.load_fields(filename) as reader:
+            stack = reader.stack("u")
+
+            assert stack.shape == (7, 5, 6)
+            assert len(stack) == 7
+            assert isinstance(reader.read(0, "u"), np.memmap) == (compress == False)
+
+            assert np.array_equal(stack[3], u[3])
+            assert np.array_equal(stack[1:6:2, 2, :], u[1:6:2, 2, :])
+            assert np.array_equal(stack[[0, 6]], u[[0, 6]])
+            assert np.array_equal(np.asarray(stack), u)
+
+            chunks = list(stack.chunks(3))
+
+            assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+            assert np.allclose(sum(c.sum(axis=0) for c in chunks) / 7, u.mean(axis=0))
+
+
+def test_field_statistics() -> None:
+    rng = np.random.default_rng(0)
+    u = 1e4 + rng.normal(size=(50, 4, 5))
+    v = 0.5 * u + rng.normal(size=(50, 4, 5))
+    u[3, 1, 1] = np.nan
+
+    stats = tools.FieldStatistics()
+
+    for frame_u, frame_v in zip(u, v):
+        stats.update(frame_u, frame_v)
+
+    valid = np.isfinite(u)
+    u_valid = np.ma.masked_array(u, mask=~valid)
+    v_valid = np.ma.masked_array(v, mask=~valid)
+
+    assert stats.count[1, 1] == 49
+    assert np.allclose(stats.mean_u, u_valid.mean(axis=0))
+    assert np.allclose(stats.var_u, u_valid.var(axis=0))
+    assert np.allclose(stats.var_v, v_valid.var(axis=0))
+    assert np.allclose(
+        stats.reynolds_stress,
+        ((u_valid - u_valid.mean(axis=0)) * (v_valid - v_valid.mean(axis=0))).mean(axis=0),
+    )
+    assert np.allclose(stats.min_u, np.nanmin(u, axis=0))
+    assert np.allclose(stats.max_v, np.nanmax(v, axis=0))
+
+    # chunks of parallel workers
+    first = tools.FieldStatistics().update(u[:20], v[:20])
+    second = tools.FieldStatistics((4, 5)).update(u[20:], v[20:])
+    merged = tools.FieldStatistics().merge(first).merge(second)
+
+    assert np.array_equal(merged.count, stats.count)
+    assert np.allclose(merged.mean_v, stats.mean_v)
+    assert np.allclose(merged.rms_u, stats.rms_u)
+    assert np.allclose(merged.reynolds_stress, stats.reynolds_stress)
+
+    with pytest.raises(ValueError):
+        stats.update(u[0, :2], v[0, :2])
+
+
+def test_imread_dtype(tmp_path) -> None:
+    from imageio import imwrite, mimwrite
+
+    rgb = np.random.default_rng(0).integers(0, 256, (21, 30, 3), dtype="uint8")
+    gray = rgb @ np.array([0.299, 0.587, 0.114])
+
+    assert np.allclose(tools.rgb2gray(rgb), gray)
+    assert np.allclose(tools.rgb2gray(rgb, dtype="float32"), gray, atol=1e-3)
+    assert np.array_equal(tools.rgb2gray(rgb, dtype="uint8"), np.rint(gray))
+
+    imwrite(tmp_path / "rgb.png", rgb)
+    imwrite(tmp_path / "rgb.bmp", rgb)
+    mimwrite(tmp_path / "frames.tif", [rgb[..., 0], rgb[..., 1]])
+
+    for dtype in ["uint8", "uint16", "float32", "float64"]:
+        for image in ["rgb.png", "rgb.bmp"]:
+            frame = tools.imread(tmp_path / image, dtype=dtype)
+
+            assert frame.dtype == dtype
+            assert np.allclose(frame, gray, atol=0.5)
+
+        # first page of greyscale files
+        frame = tools.imread(tmp_path / "frames.tif", dtype=dtype)
+
+        assert frame.dtype == dtype
+        assert np.array_equal(frame, rgb[..., 0])
+
+    assert tools.imread(tmp_path / "frames.tif").dtype == "uint8"
@@ -0,0 +1,468 @@
+import numpy as np
+import pytest
+
+from os.path import join
+from openpiv_cxx.tools import imread
+from openpiv_cxx import windef
+
+
+Frame_a = imread(join(__file__, '..', '..', 'synthetic_tests', 'vel_magnitude', 'vel_48a.bmp'))
+Frame_b = imread(join(__file__, '..', '..', 'synthetic_tests', 'vel_magnitude', 'vel_48b.bmp'))
+
+shift_u = 0.0
+shift_v = 1.5
+
+
+def test_deform_windows() -> None:
+    from openpiv_cxx.interpolate import taylor_expansion2D
+    from openpiv_cxx.process import get_rect_coordinates
+
+    frame_a, frame_b = Frame_a.astype("float64"), Frame_b.astype("float64")
+
+    x, y = get_rect_coordinates(frame_a.shape, 32, 16)
+    u = np.full(x.shape, shift_u)
+    v = np.full(x.shape, shift_v)
+
+    def_a, def_b = windef.deform_windows(
+        frame_a, frame_b, x, y, u, v,
+        deformation_method="taylor expansions",
+        order=3,
+        deformation_order=2,
+    )
+
+    x_new, y_new, ut, vt = windef.create_deformation_field(frame_a, x, y, u, v)
+
+    assert np.allclose(
+        def_a, taylor_expansion2D(frame_a, y_new - vt / 2, x_new - ut / 2, 3)
+    )
+    assert np.allclose(
+        def_b, taylor_expansion2D(frame_b, y_new + vt / 2, x_new + ut / 2, 3)
+    )
+
+    with pytest.raises(ValueError):
+        windef.deform_windows(
+            frame_a, frame_b, x, y, u, v,
+            deformation_method="taylor expansions",
+            order=2,
+        )
+
+
+def test_deform_windows_threaded() -> None:
+    from openpiv_cxx.process import get_rect_coordinates
+
+    frame_a, frame_b = Frame_a.astype("float64"), Frame_b.astype("float64")
+
+    x, y = get_rect_coordinates(frame_a.shape, 32, 16)
+    u = np.sin(x / 64.0)
+    v = np.cos(y / 64.0)
+
+    for deformation_order in [1, 2]:
+        def_a, def_b = windef.deform_windows(
+            frame_a, frame_b, x, y, u, v,
+            deformation_method="whittaker-shanon",
+            radius=3,
+            deformation_order=deformation_order,
+        )
+        def_a_t, def_b_t = windef.deform_windows(
+            frame_a, frame_b, x, y, u, v,
+            deformation_method="whittaker-shanon",
+            radius=3,
+            deformation_order=deformation_order,
+            thread_count=3,
+        )
+
+        assert np.array_equal(def_a, def_a_t)
+        assert np.array_equal(def_b, def_b_t)
+
+
+def test_deform_windows_odd_window() -> None:
+    from openpiv_cxx.interpolate import taylor_expansion2D
+    from openpiv_cxx.process import get_rect_coordinates
+
+    frame_a, frame_b = Frame_a.astype("float64"), Frame_b.astype("float64")
+
+    # odd window sizes have window centres at half pixels
+    x, y = get_rect_coordinates(frame_a.shape, 33, 17)
+    u = np.sin(x / 16.0)
+    v = np.cos(y / 16.0)
+
+    assert np.any(x % 1.0 != 0.0)
+
+    def_a, def_b = windef.deform_windows(
+        frame_a, frame_b, x, y, u, v,
+        deformation_method="taylor expansions",
+        order=3,
+        deformation_order=2,
+    )
+
+    # bilinear displacement of every pixel, clamped to the grid
+    rows, cols = np.arange(frame_a.shape[0]), np.arange(frame_a.shape[1])
+
+    def per_pixel(comp):
+        along_x = np.array([np.interp(cols, x[0, :], row) for row in comp])
+        return np.array([np.interp(rows, y[:, 0], col) for col in along_x.T]).T
+
+    ut, vt = per_pixel(u), per_pixel(v)
+    x_new, y_new = np.meshgrid(cols, rows)
+
+    assert np.allclose(
+        def_a, taylor_expansion2D(frame_a, y_new - vt / 2, x_new - ut / 2, 3)
+    )
+    assert np.allclose(
+        def_b, taylor_expansion2D(frame_b, y_new + vt / 2, x_new + ut / 2, 3)
+    )
+
+
+def test_multipass_img_deform() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    x, y, u, v, s2n = windef.first_pass(frame_a, frame_b, 32, 16)
+    x, y, u, v, s2n = windef.multipass_img_deform(
+        frame_a, frame_b, x, y, u, v, 16, 8
+    )
+
+    assert np.nanmean(np.abs(u - shift_u)) < 0.1
+    assert np.nanmean(np.abs(v - shift_v)) < 0.1
+
+
+def test_multipass_img_deform_adaptive() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    x_old, y_old, u_old, v_old, s2n_old = windef.first_pass(frame_a, frame_b, 32, 16)
+
+    # flag a (replaced) vector as invalid
+    validation_mask = np.zeros(u_old.shape, dtype=int)
+    validation_mask[2, 2] = 1
+
+    x, y, u, v, s2n = windef.multipass_img_deform(
+        frame_a, frame_b, x_old, y_old, u_old, v_old, 16, 8,
+        validation_mask=validation_mask,
+    )
+
+    refined = ~np.isnan(s2n)
+
+    assert np.any(refined)
+    assert not np.all(refined)
+    assert np.nanmean(np.abs(u[refined] - shift_u)) < 0.1
+    assert np.nanmean(np.abs(v[refined] - shift_v)) < 0.1
+
+    # windows that are not recorrelated keep the signal to noise ratio of the last pass
+    x, y, u_s2n, v_s2n, s2n_kept = windef.multipass_img_deform(
+        frame_a, frame_b, x_old, y_old, u_old, v_old, 16, 8,
+        validation_mask=validation_mask,
+        s2n_old=s2n_old,
+    )
+
+    assert np.array_equal(u, u_s2n)
+    assert np.array_equal(v, v_s2n)
+    assert np.array_equal(s2n_kept[refined], s2n[refined])
+    assert not np.any(np.isnan(s2n_kept))
+    assert np.all(s2n_kept[~refined] >= np.min(s2n_old))
+    assert np.all(s2n_kept[~refined] <= np.max(s2n_old))
+
+    # nothing invalid and a smooth predictor: nothing is recorrelated
+    x, y, u, v, s2n = windef.multipass_img_deform(
+        frame_a, frame_b, x_old, y_old, u_old, v_old, 16, 8,
+        validation_mask=np.zeros(u_old.shape, dtype=int),
+        gradient_threshold=0.5,
+    )
+
+    assert np.all(np.isnan(s2n))
+
+
+def test_multipass_img_deform_adaptive_odd_window(monkeypatch) -> None:
+    from openpiv_cxx import process
+    from openpiv_cxx.interpolate import bilinear2D
+
+    frame_a, frame_b = Frame_a.astype("float64"), Frame_b.astype("float64")
+    window_size, overlap = 33, 17
+
+    x_old, y_old, u_old, v_old, _ = windef.first_pass(frame_a, frame_b, 32, 16)
+
+    validation_mask = np.zeros(u_old.shape, dtype=int)
+    validation_mask[6, 6] = 1
+
+    # record the windows of the deformed region instead of correlating them
+    windows = []
+
+    def correlate_points(region_a, region_b, x, y, window_size, *args, **kwargs):
+        for xc, yc in zip(x, y):
+            left = int(np.floor(xc - window_size / 2 + 0.5))
+            bottom = int(np.floor(yc - window_size / 2 + 0.5))
+            windows.append(
+                region_b[bottom : bottom + window_size, left : left + window_size]
+            )
+
+        i, j = np.mgrid[:window_size, :window_size] - window_size // 2
+        peak = np.exp(-(i**2 + j**2) / 2.0)
+
+        return np.repeat(peak[np.newaxis], len(x), axis=0)
+
+    monkeypatch.setattr(process, "fft_correlate_points", correlate_points)
+
+    # the deformed region starts inside the frame, so its grid has negative, half-pixel centres
+    x, y, u, v, s2n = windef.multipass_img_deform(
+        frame_a, frame_b, x_old, y_old, u_old, v_old, window_size, overlap,
+        validation_mask=validation_mask,
+    )
+
+    u_pre = bilinear2D(x_old[0, :], y_old[:, 0], u_old, x[0, :], y[:, 0])
+    v_pre = bilinear2D(x_old[0, :], y_old[:, 0], v_old, x[0, :], y[:, 0])
+
+    _, def_b = windef.deform_windows(
+        frame_a, frame_b, x, y, u_pre, v_pre,
+        deformation_method="taylor expansions",
+        deformation_order=2,
+    )
+
+    refined = bilinear2D(
+        x_old[0, :], y_old[:, 0], validation_mask.astype("float64"), x[0, :], y[:, 0]
+    ) > 0.0
+
+    assert np.any(refined)
+    assert len(windows) == np.sum(refined)
+
+    for window, xc, yc in zip(windows, x[refined], y[refined]):
+        left = int(np.floor(xc - window_size / 2 + 0.5))
+        bottom = int(np.floor(yc - window_size / 2 + 0.5))
+
+        assert np.allclose(
+            window, def_b[bottom : bottom + window_size, left : left + window_size]
+        )
+
+
+def test_pyramid_pass() -> None:
+    # synthetic particle image with a displacement too large for 32 px windows
+    rng = np.random.default_rng(0)
+    frame_a = rng.random((256, 256)) ** 8.0
+    frame_b = np.roll(frame_a, (6, 22), axis=(0, 1))
+
+    x, y, u, v = windef.pyramid_pass(frame_a, frame_b, 32, 16, levels=2)
+
+    x_full, y_full = windef.first_pass(frame_a, frame_b, 32, 16)[:2]
+
+    assert np.allclose(x, x_full)
+    assert np.allclose(y, y_full)
+    assert np.all(np.abs(u - 22.0) < 1.0)
+    assert np.all(np.abs(v - 6.0) < 1.0)
+
+    x, y, u, v, s2n = windef.multipass_img_deform(
+        frame_a, frame_b, x, y, u, v, 32, 16
+    )
+
+    assert np.nanmean(np.abs(u - 22.0)) < 0.1
+    assert np.nanmean(np.abs(v - 6.0)) < 0.1
+
+
+def test_sequence_pass() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    results = list(
+        windef.sequence_pass(
+            [(frame_a, frame_b)] * 3, passes=[(32, 16), (16, 8)]
+        )
+    )
+
+    assert len(results) == 3
+    assert [reused for *_, reused in results] == [False, True, True]
+
+    for x, y, u, v, s2n, reused in results:
+        assert np.mean(np.abs(u - shift_u)) < 0.1
+        assert np.mean(np.abs(v - shift_v)) < 0.1
+
+
+def test_run_multipass() -> None:
+    rng = np.random.default_rng(0)
+    frame_a = rng.random((256, 256)) ** 8.0
+    frame_b = np.roll(frame_a, (3, 5), axis=(0, 1))
+
+    x, y, u, v, s2n, mask, _ = windef.run_multipass(
+        frame_a, frame_b, passes=[(64, 32), (32, 16), (16, 8)], thread_count=2
+    )
+
+    x_ref, y_ref = windef.first_pass(frame_a, frame_b, 16, 8)[:2]
+
+    assert np.allclose(x, x_ref)
+    assert np.allclose(y, y_ref)
+    assert u.shape == x.shape
+    assert np.mean(np.abs(u - 5.0)) < 0.05
+    assert np.mean(np.abs(v - 3.0)) < 0.05
+
+    x, y, u, v, s2n, mask, _ = windef.run_multipass(
+        frame_a,
+        frame_b,
+        passes=[(64, 32), (32, 16)],
+        deformation_method="second image",
+        deformation_algorithm="whittaker-shanon",
+        radius=3,
+    )
+
+    assert np.mean(np.abs(u - 5.0)) < 0.05
+    assert np.mean(np.abs(v - 3.0)) < 0.05
+
+
+def test_run_multipass_masked() -> None:
+    rng = np.random.default_rng(0)
+    frame_a = rng.random((256, 256)) ** 8.0
+    frame_b = np.roll(frame_a, (3, 5), axis=(0, 1))
+
+    image_mask = np.zeros(frame_a.shape, dtype=bool)
+    image_mask[:, :100] = True
+
+    x, y, u, v, s2n, mask, _ = windef.run_multipass(
+        frame_a, frame_b, passes=[(64, 32), (32, 16)], mask=image_mask
+    )
+
+    fully_masked = x + 16 <= 100
+
+    assert np.all(np.isnan(u[fully_masked]))
+    assert np.nanmean(np.abs(u[~fully_masked] - 5.0)) < 0.05
+
+
+def test_run_multipass_convergence() -> None:
+    rng = np.random.default_rng(0)
+    frame_a = rng.random((256, 256)) ** 8.0
+    frame_b = np.roll(frame_a, (3, 5), axis=(0, 1))
+
+    x, y, u, v, s2n, mask, iterations = windef.run_multipass(
+        frame_a,
+        frame_b,
+        passes=[(64, 32), (32, 16)],
+        max_iterations=5,
+        tolerance=0.01,
+    )
+
+    # converged passes stop before the maximum number of iterations
+    assert len(iterations) == 2
+    assert all(1 < it < 5 for it in iterations)
+    assert np.allclose(u[1:-1, 1:-1], 5.0, atol=0.1)
+    assert np.allclose(v[1:-1, 1:-1], 3.0, atol=0.1)
+
+    *_, iterations = windef.run_multipass(
+        frame_a, frame_b, passes=[(64, 32), (32, 16)], max_iterations=3, tolerance=0.0
+    )
+
+    assert iterations == [3, 3]
+
+
+def test_run_multipass_reuse() -> None:
+    frame_a, frame_b = Frame_a.copy(), Frame_b.copy()
+
+    options = dict(
+        passes=[(32, 16), (16, 8), (16, 8)], max_iterations=2, tolerance=0.0
+    )
+
+    x, y, u1, v1, s2n, mask, _ = windef.run_multipass(frame_a, frame_b, **options)
+
+    for deform_per_window in [False, True]:
+        x, y, u2, v2, s2n, mask, _ = windef.run_multipass(
+            frame_a,
+            frame_b,
+            reuse_tolerance=0.01,
+            deform_per_window=deform_per_window,
+            **options,
+        )
+
+        assert np.allclose(u1, u2, atol=0.05)
+        assert np.allclose(v1, v2, atol=0.05)
+
+
+def test_run_multipass_reuse_uniform() -> None:
+    # Gaussian particles shifted by a uniform subpixel displacement
+    rng = np.random.default_rng(0)
+    xp = rng.uniform(0, 256, 2000)
+    yp = rng.uniform(0, 256, 2000)
+
+    def particles(dx, dy):
+        gx = np.exp(-((np.arange(256) - (xp[:, None] + dx)) ** 2) / 2.0)
+        gy = np.exp(-((np.arange(256) - (yp[:, None] + dy)) ** 2) / 2.0)
+        return gy.T @ gx
+
+    frame_a, frame_b = particles(0.0, 0.0), particles(4.6, 2.3)
+
+    options = dict(passes=[(64, 32), (32, 16)], max_iterations=8, tolerance=0.01)
+
+    for deform_per_window in [False, True]:
+        x, y, u1, v1, s2n, mask, iterations1 = windef.run_multipass(
+            frame_a, frame_b, deform_per_window=deform_per_window, **options
+        )
+        x, y, u2, v2, s2n, mask, iterations2 = windef.run_multipass(
+            frame_a,
+            frame_b,
+            reuse_tolerance=0.003,
+            deform_per_window=deform_per_window,
+            **options,
+        )
+
+        assert iterations1 == iterations2
+        assert np.allclose(u1, u2, atol=1e-3)
+        assert np.allclose(v1, v2, atol=1e-3)
+
+
+def test_run_multipass_tiled(tmp_path) -> None:
+    np.save(tmp_path / "frame_a.npy", Frame_a)
+    np.save(tmp_path / "frame_b.npy", Frame_b)
+
+    # tiles are read from memory-mapped frames
+    frame_a = np.load(tmp_path / "frame_a.npy", mmap_mode="r")
+    frame_b = np.load(tmp_path / "frame_b.npy", mmap_mode="r")
+
+    x1, y1, u1, v1, *_ = windef.run_multipass(
+        Frame_a, Frame_b, passes=[(32, 16), (16, 8)]
+    )
+    x2, y2, u2, v2, s2n, mask = windef.run_multipass_tiled(
+        frame_a, frame_b, passes=[(32, 16), (16, 8)], tile_size=64, max_displacement=4
+    )
+
+    assert np.array_equal(x1, x2)
+    assert np.array_equal(y1, y2)
+    assert not np.any(np.isnan(u2))
+    assert np.mean(np.abs(u2 - shift_u)) < 0.1
+    assert np.mean(np.abs(v2 - shift_v)) < 0.1
+    assert np.allclose(u1, u2, atol=0.1)
+    assert np.allclose(v1, v2, atol=0.1)
+
+
+def test_run_multipass_wrong_inputs() -> None:
+    frame_a = np.random.rand(64, 64)
+    frame_b = np.random.rand(64, 64)
+
+    with pytest.raises(ValueError):
+        # no passes
+        out = windef.run_multipass(frame_a, frame_b, passes=[])
+
+    with pytest.raises(ValueError):
+        # unsupported deformation method
+        out = windef.run_multipass(frame_a, frame_b, deformation_method="wrong")
+
+    with pytest.raises(RuntimeError):  # error raised by wrapper
+        # overlap larger than window size
+        out = windef.run_multipass(frame_a, frame_b, passes=[(32, 48)])
+
+
+def test_run_multipass_per_window() -> None:
+    rng = np.random.default_rng(0)
+    frame_a = rng.random((256, 256)) ** 8.0
+    frame_b = np.roll(frame_a, (3, 5), axis=(0, 1))
+
+    for deformation_method in ["symmetric", "second image"]:
+        x, y, u1, v1, s2n, mask, _ = windef.run_multipass(
+            frame_a,
+            frame_b,
+            passes=[(64, 32), (32, 16)],
+            deformation_method=deformation_method,
+            order=3,
+        )
+
+        x, y, u2, v2, s2n, mask, _ = windef.run_multipass(
+            frame_a,
+            frame_b,
+            passes=[(64, 32), (32, 16)],
+            deformation_method=deformation_method,
+            order=3,
+            deform_per_window=True,
+            thread_count=2,
+        )
+
+        assert np.allclose(u1, u2)
+        assert np.allclose(v1, v2)